@@ -0,0 +1,109 @@
+"""
+bench_drill_responses.py
+Throughput of drill list responses: per-request encoding vs catalog fragments.
+
+For a page of `--page-size` synthetic drills it renders the body of a
+/public/drills/search response two ways and reports pages/s and MB/s:
+
+    dicts:      build_drill_response per drill, then jsonable_encoder and
+                JSONResponse, as FastAPI does for a returned dict
+    fragments:  the catalog snapshot's pre-encoded drills spliced into a
+                FragmentJSONResponse (utils/json_fragments.py)
+
+Database time is not included, so the numbers isolate response building.
+With --url it also measures a running server end to end, requesting
+{url}/public/drills/search?limit=100 and reporting bytes/s as received.
+
+Run from the project root:
+    python -m benchmarks.bench_drill_responses [--page-size 100] [--runs 2000]
+    python -m benchmarks.bench_drill_responses --url http://localhost:8000
+"""
+
+import argparse
+import time
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from services.drill_catalog import DrillCatalogSnapshot
+from utils.json_fragments import FragmentJSONResponse, JSONFragments
+from benchmarks.synthetic_catalog import build_synthetic_catalog
+
+
+def page_envelope(items, size: int) -> dict:
+    return {
+        "items": items,
+        "total": size,
+        "page": 1,
+        "page_size": size,
+        "total_pages": 1,
+        "has_next_page": False,
+    }
+
+
+def render_dicts(drills) -> bytes:
+    payload = page_envelope([drill.response() for drill in drills], len(drills))
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def render_fragments(snapshot: DrillCatalogSnapshot, drills) -> bytes:
+    fragments = JSONFragments(snapshot.fragment(drill.uuid) for drill in drills)
+    return FragmentJSONResponse(page_envelope(fragments, len(drills))).body
+
+
+def measure(render, runs: int):
+    body = render()
+    started = time.perf_counter()
+    for _ in range(runs):
+        render()
+    elapsed = time.perf_counter() - started
+    return len(body), runs / elapsed, len(body) * runs / elapsed / 1e6
+
+
+def bench_in_process(args):
+    drills = build_synthetic_catalog(args.page_size)
+    snapshot = DrillCatalogSnapshot(version=0, drills=drills)
+    snapshot.response_fragments  # encoded once per snapshot, like DrillCatalog.load
+
+    print(f"\n{args.page_size} drills per page, {args.runs} renders")
+    print(f"  {'path':12}{'bytes':>10}{'pages/s':>12}{'MB/s':>10}")
+    results = {}
+    for name, render in (("dicts", lambda: render_dicts(drills)),
+                         ("fragments", lambda: render_fragments(snapshot, drills))):
+        size, pages, mb = measure(render, args.runs)
+        results[name] = pages
+        print(f"  {name:12}{size:>10}{pages:>12.0f}{mb:>10.1f}")
+    print(f"  fragments are {results['fragments'] / results['dicts']:.1f}x faster")
+
+
+def bench_server(args):
+    url = f"{args.url.rstrip('/')}/public/drills/search?limit=100"
+    with httpx.Client(timeout=30) as client:
+        client.get(url).raise_for_status()  # warm up the catalog
+        received = 0
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            response = client.get(url)
+            response.raise_for_status()
+            received += len(response.content)
+        elapsed = time.perf_counter() - started
+    print(f"\n{url}: {args.requests} requests, {received / args.requests:.0f} bytes each")
+    print(f"  {args.requests / elapsed:.1f} req/s, {received / elapsed / 1e6:.2f} MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--url", help="Base URL of a running server to measure end to end")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    bench_in_process(args)
+    if args.url:
+        bench_server(args)
+
+
+if __name__ == "__main__":
+    main()
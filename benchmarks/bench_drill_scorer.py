@@ -0,0 +1,32 @@
+"""
+bench_drill_scorer.py
+Micro-benchmark of per-drill scoring cost in DrillScorer.score_drill.
+
+Run from the project root:
+    python -m benchmarks.bench_drill_scorer [--drills 400] [--repeat 5]
+"""
+
+import argparse
+import timeit
+
+from models import SessionPreferences
+from utils.drill_scorer import DrillScorer
+from benchmarks.synthetic_catalog import PROFILES, build_synthetic_catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drills", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    drills = build_synthetic_catalog(args.drills)
+    print(f"Scoring {len(drills)} drills, best of {args.repeat} runs")
+    for name, profile in PROFILES.items():
+        scorer = DrillScorer(SessionPreferences(**profile))
+        best = min(timeit.repeat(lambda: [scorer.score_drill(d) for d in drills], number=1, repeat=args.repeat))
+        print(f"  {name:22} {best / len(drills) * 1e6:7.2f} us/drill   {best * 1e3:7.2f} ms total")
+
+
+if __name__ == "__main__":
+    main()
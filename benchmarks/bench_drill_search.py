@@ -0,0 +1,137 @@
+"""
+bench_drill_search.py
+Benchmark of full-text drill search against the ilike baseline on PostgreSQL.
+
+A temporary table shaped like drills (title, description, instructions, tips)
+is filled with synthetic drills and given the same generated search_vector
+column and GIN index that migrate_database.py adds to drills and custom_drills
+(services/drill_search.search_vector_ddl). For each query it then times what a
+search page costs both ways, the count plus the first page of 20:
+
+    ilike:     title ILIKE '%q%' OR description ILIKE '%q%'    (sequential scan)
+    full-text: search_vector @@ to_tsquery('q:*') ORDER BY ts_rank
+
+and reports p50/p95 latency and the number of matches. Nothing is written to
+the real tables; the temporary table is dropped with the connection.
+
+Needs DATABASE_URL pointing at a PostgreSQL database. Run from the project root:
+    python -m benchmarks.bench_drill_search [--sizes 1000 10000 100000] [--runs 30]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+from db import SQLALCHEMY_DATABASE_URL
+from services.drill_search import SEARCH_CONFIG, prefix_query, search_vector_ddl
+
+TABLE = "bench_drills"
+PAGE_SIZE = 20
+QUERIES = ["dribbling", "drib", "pass", "first touch", "wall passes", "cone weave", "goalkeeper dive", "zzz"]
+SEED = 20240501
+
+SKILLS = ["dribbling", "passing", "shooting", "first touch", "defending", "goalkeeping", "fitness"]
+WORDS = [
+    "cone", "weave", "wall", "passes", "volley", "sprint", "ladder", "turn", "receive", "control",
+    "finish", "header", "tackle", "press", "dive", "save", "juggling", "crossing", "agility", "balance",
+    "inside", "outside", "foot", "sole", "rhythm", "speed", "target", "corner", "box", "touch",
+]
+
+
+def synthetic_rows(size: int, rng: random.Random):
+    for idx in range(size):
+        skill = rng.choice(SKILLS)
+        yield {
+            "title": f"{rng.choice(WORDS).title()} {skill.title()} Drill {idx}",
+            "description": " ".join(rng.choices(WORDS, k=12)),
+            "instructions": json.dumps([" ".join(rng.choices(WORDS, k=6)) for _ in range(3)]),
+            "tips": json.dumps([" ".join(rng.choices(WORDS, k=5))]),
+        }
+
+
+def create_table(conn, size: int):
+    conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    conn.execute(text(
+        f"CREATE TEMPORARY TABLE {TABLE} (id serial PRIMARY KEY, title varchar, description varchar, "
+        f"instructions json, tips json)"
+    ))
+    conn.execute(
+        text(f"INSERT INTO {TABLE} (title, description, instructions, tips) "
+             f"VALUES (:title, :description, CAST(:instructions AS json), CAST(:tips AS json))"),
+        list(synthetic_rows(size, random.Random(SEED)))
+    )
+    for statement in search_vector_ddl(TABLE):
+        conn.execute(text(statement))
+    conn.execute(text(f"ANALYZE {TABLE}"))
+
+
+def ilike_page(conn, query: str):
+    params = {"pattern": f"%{query}%", "limit": PAGE_SIZE}
+    where = "title ILIKE :pattern OR description ILIKE :pattern"
+    total = conn.execute(text(f"SELECT count(*) FROM {TABLE} WHERE {where}"), params).scalar()
+    conn.execute(text(f"SELECT id, title FROM {TABLE} WHERE {where} ORDER BY title LIMIT :limit"), params).all()
+    return total
+
+
+def full_text_page(conn, query: str):
+    params = {"terms": prefix_query(query), "limit": PAGE_SIZE}
+    tsquery = f"to_tsquery('{SEARCH_CONFIG}', :terms)"
+    where = f"search_vector @@ {tsquery}"
+    total = conn.execute(text(f"SELECT count(*) FROM {TABLE} WHERE {where}"), params).scalar()
+    conn.execute(text(
+        f"SELECT id, title FROM {TABLE} WHERE {where} "
+        f"ORDER BY ts_rank(search_vector, {tsquery}) DESC, id LIMIT :limit"
+    ), params).all()
+    return total
+
+
+def time_search(conn, search, query: str, runs: int):
+    total = search(conn, query)  # warm up
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        search(conn, query)
+        samples.append((time.perf_counter() - started) * 1e3)
+    return total, np.percentile(samples, 50), np.percentile(samples, 95)
+
+
+def run(args):
+    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    if engine.dialect.name != "postgresql":
+        print(f"Full-text search needs PostgreSQL; DATABASE_URL uses {engine.dialect.name}")
+        sys.exit(2)
+
+    with engine.connect() as conn:
+        for size in args.sizes:
+            started = time.perf_counter()
+            create_table(conn, size)
+            print(f"\n{size} drills (table built in {time.perf_counter() - started:.1f}s), {args.runs} runs per query")
+            print(f"  {'query':18}{'ilike':>24}{'full-text':>24}{'speedup':>10}")
+            for query in args.queries:
+                ilike_total, ilike_p50, ilike_p95 = time_search(conn, ilike_page, query, args.runs)
+                fts_total, fts_p50, fts_p95 = time_search(conn, full_text_page, query, args.runs)
+                print(
+                    f"  {query:18}"
+                    f"{ilike_p50:9.2f}/{ilike_p95:<8.2f}{ilike_total:>6}"
+                    f"{fts_p50:9.2f}/{fts_p95:<8.2f}{fts_total:>6}"
+                    f"{ilike_p50 / fts_p50 if fts_p50 else float('inf'):9.1f}x"
+                )
+        conn.rollback()
+    print("\n(ms p50/p95 for count + first page, then matches)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--queries", nargs="+", default=QUERIES)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
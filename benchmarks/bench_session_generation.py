@@ -0,0 +1,133 @@
+"""
+bench_session_generation.py
+End-to-end benchmark of session generation over synthetic catalogs.
+
+For every catalog size and preference profile it runs seeded generations through
+SessionGenerator and reports p50/p95 latency per stage (catalog, score, select,
+balance, adjust) plus the total. Persistence is not measured: sessions are built
+with generate_ephemeral_session, which runs the same pipeline without a database.
+
+Each seeded session is also fingerprinted (drill UUIDs and durations) and compared
+with benchmarks/session_generation_baseline.json, so changes that alter generated
+sessions are caught alongside performance changes. The exit status is 1 if any
+fingerprint differs.
+
+Run from the project root:
+    python -m benchmarks.bench_session_generation [--sizes 500 5000 50000] [--runs 30]
+    python -m benchmarks.bench_session_generation --update-baseline
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from models import SessionPreferences
+from services.drill_catalog import DrillCatalog, DrillCatalogSnapshot
+from services.score_cache import ScoreCache
+from services.session_generator import SessionGenerator
+from benchmarks.synthetic_catalog import PROFILES, build_synthetic_catalog
+
+BASELINE_PATH = Path(__file__).with_name("session_generation_baseline.json")
+STAGES = ("catalog", "score", "select", "balance", "adjust")
+SEED = 20240501
+
+
+def session_fingerprint(session) -> str:
+    """Stable hash of the drills (and their durations) in a generated session"""
+    drills = [(str(osd.drill_uuid), osd.duration) for osd in session.ordered_drills]
+    return hashlib.sha1(json.dumps(drills).encode()).hexdigest()[:16]
+
+
+def build_catalog(size: int) -> DrillCatalog:
+    catalog = DrillCatalog(version_check_interval=float("inf"))
+    snapshot = DrillCatalogSnapshot(version=0, drills=build_synthetic_catalog(size))
+    snapshot.index  # encode and index up front, like DrillCatalog.load
+    catalog.set_snapshot(snapshot)
+    return catalog
+
+
+async def generate(catalog: DrillCatalog, profile: dict, seed, cache: ScoreCache):
+    generator = SessionGenerator(db=None, catalog=catalog, cache=cache, rng=seed)
+    started = time.perf_counter()
+    session = await generator.generate_ephemeral_session(SessionPreferences(**profile))
+    timings = dict(generator.metrics.stages, total=time.perf_counter() - started)
+    return session, timings
+
+
+async def run(args) -> dict:
+    fingerprints = {}
+    for size in args.sizes:
+        started = time.perf_counter()
+        catalog = build_catalog(size)
+        print(f"\n{size} drills (catalog built in {time.perf_counter() - started:.1f}s), {args.runs} runs per profile")
+        print(f"  {'profile':26}" + "".join(f"{stage:>17}" for stage in STAGES + ("total",)))
+        for name, profile in PROFILES.items():
+            # Without --cache every run misses the score cache, so scoring is measured
+            cache = ScoreCache() if args.cache else ScoreCache(max_entries=0)
+
+            first, _ = await generate(catalog, profile, SEED, cache)
+            again, _ = await generate(catalog, profile, SEED, cache)
+            fingerprint = session_fingerprint(first)
+            if session_fingerprint(again) != fingerprint:
+                print(f"  {name}: seeded generation is not deterministic")
+                fingerprint = "nondeterministic"
+            fingerprints[f"{size}/{name}"] = fingerprint
+
+            samples = {stage: [] for stage in STAGES + ("total",)}
+            for run_idx in range(args.runs):
+                _, timings = await generate(catalog, profile, run_idx, cache)
+                for stage in samples:
+                    samples[stage].append(timings.get(stage, 0.0) * 1e3)
+            cells = "".join(
+                f"{np.percentile(values, 50):8.2f}/{np.percentile(values, 95):<8.2f}"
+                for values in samples.values()
+            )
+            print(f"  {name:26}{cells}")
+    print("\n(ms, p50/p95)")
+    return fingerprints
+
+
+def check_baseline(fingerprints: dict, update: bool) -> bool:
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    if update:
+        baseline.update(fingerprints)
+        BASELINE_PATH.write_text(json.dumps(dict(sorted(baseline.items())), indent=2) + "\n")
+        print(f"Updated {BASELINE_PATH.name} with {len(fingerprints)} fingerprints")
+        return True
+
+    changed = [key for key, value in fingerprints.items() if key in baseline and baseline[key] != value]
+    missing = [key for key in fingerprints if key not in baseline]
+    for key in changed:
+        print(f"CHANGED  {key}: {baseline[key]} -> {fingerprints[key]}")
+    if missing:
+        print(f"No baseline for: {', '.join(missing)} (run with --update-baseline)")
+    if not changed:
+        print(f"Seeded output matches baseline ({len(fingerprints) - len(missing)} sessions checked)")
+    return not changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 5000, 50000])
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--cache", action="store_true", help="Keep the score cache enabled between runs")
+    parser.add_argument("--update-baseline", action="store_true", help="Record the seeded session fingerprints")
+    args = parser.parse_args()
+
+    # Generation logs and per-session metrics records would swamp the report
+    logging.getLogger("services.session_generator").setLevel(logging.ERROR)
+    logging.getLogger("services.generation_metrics").setLevel(logging.ERROR)
+    fingerprints = asyncio.run(run(args))
+    if not check_baseline(fingerprints, args.update_baseline):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+synthetic_catalog.py
+Builds synthetic drill catalogs for benchmarks without touching the database.
+
+Drills are assembled with utils.drill_factory.DrillBuilder from the enums in
+models.py and converted to the same CatalogDrill objects the in-memory drill
+catalog serves, so benchmarks exercise exactly what SessionGenerator scores.
+"""
+
+import random
+import uuid
+from typing import List
+
+from models import (
+    DrillType, TrainingLocation, TrainingStyle, Difficulty, Equipment,
+    SkillCategory, PassingSubSkill, ShootingSubSkill, DribblingSubSkill,
+    FirstTouchSubSkill, DefendingSubSkill, GoalkeepingSubSkill, FitnessSubSkill
+)
+from services.drill_catalog import CatalogDrill, CatalogSkillFocus
+from utils.drill_factory import DrillBuilder
+
+SUB_SKILLS = {
+    SkillCategory.PASSING: PassingSubSkill,
+    SkillCategory.SHOOTING: ShootingSubSkill,
+    SkillCategory.DRIBBLING: DribblingSubSkill,
+    SkillCategory.FIRST_TOUCH: FirstTouchSubSkill,
+    SkillCategory.DEFENDING: DefendingSubSkill,
+    SkillCategory.GOALKEEPING: GoalkeepingSubSkill,
+    SkillCategory.FITNESS: FitnessSubSkill,
+}
+INTENSITIES = ["low", "medium", "high"]
+
+# Preference profiles shared by the benchmarks
+PROFILES = {
+    "beginner_backyard": dict(
+        duration=30, available_equipment=["ball", "cones"], training_style="low_intensity",
+        training_location="backyard", difficulty="beginner",
+        target_skills=[{"category": "passing", "sub_skills": ["short_passing", "wall_passing"]},
+                       {"category": "first_touch", "sub_skills": ["ground_control"]}]),
+    "intermediate_small_field": dict(
+        duration=45, available_equipment=["ball", "cones", "wall"], training_style="medium_intensity",
+        training_location="small_field", difficulty="intermediate",
+        target_skills=[{"category": "dribbling", "sub_skills": ["close_control", "ball_mastery"]}]),
+    "advanced_full_field": dict(
+        duration=90, available_equipment=["ball", "cones", "goals", "wall"], training_style="high_intensity",
+        training_location="full_field", difficulty="advanced",
+        target_skills=[{"category": "shooting", "sub_skills": ["power", "finishing", "volleys"]},
+                       {"category": "dribbling", "sub_skills": ["1v1_moves", "speed_dribbling"]},
+                       {"category": "fitness", "sub_skills": ["speed"]}]),
+    "ball_only_no_targets": dict(
+        duration=15, available_equipment=["ball"], training_style="medium_intensity",
+        training_location="small_room", difficulty="beginner", target_skills=[]),
+}
+DURATIONS = [3, 5, 5, 8, 10, 10, 12, 15, 20, 25, 30]
+
+
+def build_drill(rng: random.Random, idx: int) -> dict:
+    """Build one random drill dict with DrillBuilder"""
+    category = rng.choice(list(SUB_SKILLS))
+    builder = (
+        DrillBuilder(f"Synthetic {category.value} drill {idx}")
+        .with_description(f"Synthetic drill {idx} for benchmarking")
+        .with_type(rng.choice(list(DrillType)).value)
+        .with_duration(rng.choice(DURATIONS))
+        .with_equipment(*rng.sample([eq.value for eq in Equipment], rng.randint(1, 3)))
+        .with_suitable_locations(*rng.sample([loc.value for loc in TrainingLocation], rng.randint(1, 3)))
+        .with_intensity(rng.choice(INTENSITIES))
+        .with_training_styles(*rng.sample([style.value for style in TrainingStyle], rng.randint(1, 2)))
+        .with_difficulty(rng.choice(list(Difficulty)).value)
+        .with_primary_skill(category, rng.choice(list(SUB_SKILLS[category])).value)
+        .with_instructions("Set up", "Perform the drill", "Recover")
+        .with_tips("Stay on your toes")
+    )
+    for _ in range(rng.randint(0, 2)):
+        secondary = rng.choice(list(SUB_SKILLS))
+        builder.with_secondary_skill(secondary, rng.choice(list(SUB_SKILLS[secondary])).value)
+    return builder.build()
+
+
+def to_catalog_drill(data: dict, idx: int) -> CatalogDrill:
+    return CatalogDrill(
+        id=idx,
+        uuid=uuid.UUID(int=idx + 1),
+        title=data["title"],
+        description=data["description"],
+        category_id=None,
+        category_name=next(f["category"] for f in data["skill_focus"] if f["is_primary"]),
+        duration=data["duration"],
+        intensity=data["intensity"],
+        training_styles=data["training_styles"],
+        type=data["type"],
+        sets=data["sets"],
+        reps=data["reps"],
+        rest=data["rest"],
+        equipment=data["equipment"],
+        suitable_locations=data["suitable_locations"],
+        difficulty=data["difficulty"],
+        instructions=data["instructions"],
+        tips=data["tips"],
+        common_mistakes=data["common_mistakes"],
+        progression_steps=data["progression_steps"],
+        variations=data["variations"],
+        video_url=data["video_url"],
+        thumbnail_url=data["thumbnail_url"],
+        skill_focus=tuple(
+            CatalogSkillFocus(f["category"], f["sub_skill"], f["is_primary"]) for f in data["skill_focus"]
+        )
+    )
+
+
+def build_synthetic_catalog(size: int, seed: int = 0) -> List[CatalogDrill]:
+    """Return `size` reproducible synthetic catalog drills"""
+    rng = random.Random(seed)
+    return [to_catalog_drill(build_drill(rng, idx), idx) for idx in range(size)]
@@ -23,6 +23,10 @@ logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
 # Set LOGGER_DEBUG=true for testing, false for production
 LOGGER_DEBUG = os.getenv("LOGGER_DEBUG", "false").lower() == "true"
 
+# Set SESSION_DEBUG_HEADERS=true to return session generation timings and counts
+# in the X-Session-Generation-Metrics response header
+SESSION_DEBUG_HEADERS = os.getenv("SESSION_DEBUG_HEADERS", "false").lower() == "true"
+
 def get_logger(name=None):
     """Get a logger with the specified name, using the centralized config."""
     return logging.getLogger(name)
@@ -7,6 +7,7 @@ from sqlalchemy import create_engine, inspect
 from sqlalchemy.orm import sessionmaker
 import models
 from db import SQLALCHEMY_DATABASE_URL
+from services.drill_catalog import bump_catalog_version
 from config import get_logger
 
 logger = get_logger(__name__)
@@ -29,7 +30,6 @@ def create_mental_training_tables():
         if existing_quotes > 0:
             logger.info(f"Clearing {existing_quotes} existing mental training quotes...")
             db.query(models.MentalTrainingQuote).delete()
-            db.commit()
             logger.info("✅ Cleared existing quotes")
         
         # Seed with motivational quotes
@@ -132,6 +132,9 @@ def create_mental_training_tables():
             quote = models.MentalTrainingQuote(**quote_data)
             db.add(quote)
         
+        # Quote responses are cached and ETagged by catalog version; the clear and
+        # reseed commit together with the bump so clients never revalidate stale quotes
+        bump_catalog_version(db)
         db.commit()
         logger.info(f"✅ Successfully created mental training tables and seeded {len(quotes)} quotes")
         
@@ -17,6 +17,8 @@ from sqlalchemy.orm import Session
 from models import DrillCategory, Drill, DrillSkillFocus
 from db import SessionLocal, engine
 from config import get_logger
+from services.drill_catalog import bump_catalog_version
+from services.drill_changes import drill_state, record_drill_changes
 
 logger = get_logger(__name__)
 
@@ -72,6 +74,7 @@ def upload_drills_to_db(drills_data: List[Dict[str, Any]], db: Session):
         drills_added = 0
         drills_updated = 0
         drills_skipped = 0
+        changed_uuids = []  # drills whose cached copy clients must replace
         
         for drill_data in drills_data:
             # Get or create category
@@ -97,6 +100,8 @@ def upload_drills_to_db(drills_data: List[Dict[str, Any]], db: Session):
             existing_drill = db.query(Drill).filter_by(title=drill_data["title"]).first()
             
             if existing_drill:
+                before = drill_state(existing_drill)
+
                 # Update existing drill
                 existing_drill.description = drill_data["description"]
                 existing_drill.duration = drill_data["duration"]
@@ -155,6 +160,11 @@ def upload_drills_to_db(drills_data: List[Dict[str, Any]], db: Session):
                         )
                         db.add(secondary_skill_focus)
                 
+                db.flush()
+                db.expire(existing_drill, ["skill_focus"])
+                if drill_state(existing_drill) != before:
+                    changed_uuids.append(existing_drill.uuid)
+
                 logger.info(f"Updated existing drill: '{drill_data['title']}'")
                 drills_updated += 1
             else:
@@ -186,6 +196,7 @@ def upload_drills_to_db(drills_data: List[Dict[str, Any]], db: Session):
                 db.flush()
                 logger.info(f"Added new drill: '{drill_data['title']}'")
                 drills_added += 1
+                changed_uuids.append(drill.uuid)
 
                 # Add primary skill focus
                 primary_skill_focus = DrillSkillFocus(
@@ -218,12 +229,17 @@ def upload_drills_to_db(drills_data: List[Dict[str, Any]], db: Session):
                         )
                         db.add(secondary_skill_focus)
 
+        # Let running API servers know their drill catalog snapshot is stale
+        catalog_version = bump_catalog_version(db)
+        # ...and which drills the delta feed should send to clients on that version
+        record_drill_changes(db, catalog_version, changed=changed_uuids)
         db.commit()
         logger.info(f"\nImport Summary:")
         logger.info(f"- Drills added: {drills_added}")
         logger.info(f"- Drills updated: {drills_updated}")
         logger.info(f"- Drills skipped: {drills_skipped}")
         logger.info(f"- Total drills processed: {drills_added + drills_updated + drills_skipped}")
+        logger.info(f"- Drill catalog version: {catalog_version} ({len(changed_uuids)} drills changed)")
         
     except Exception as e:
         db.rollback()
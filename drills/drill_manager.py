@@ -16,6 +16,8 @@ import json
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from models import Drill, DrillCategory, DrillSkillFocus
+from services.drill_catalog import bump_catalog_version
+from services.drill_changes import record_drill_changes
 
 # Database import
 from db import SessionLocal
@@ -167,6 +169,8 @@ class DrillUpdateManager:
                 update.fields_to_update.get("secondary_skills", drill.secondary_skills)
             )
         
+        version = bump_catalog_version(self.db)
+        record_drill_changes(self.db, version, changed=[drill.uuid])
         self.db.commit()
         logger.info(f"Updated drill: {update.title}")
 
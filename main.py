@@ -3,11 +3,19 @@ main.py
 Main entry point of application that initializes the FastAPI app and includes all endpoints
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from routers import login, delete_account, onboarding, drills, session, drill_groups, data_sync_updates, saved_filters, profile, mental_training, custom_drills, friends, leaderboard
+from routers import login, delete_account, onboarding, drills, session, drill_groups, data_sync_updates, saved_filters, profile, mental_training, custom_drills, store, friends, leaderboard
+from services.drill_catalog import warm_drill_catalog
+
+# Load the in-memory drill catalog once so the first session generation doesn't pay for it
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_drill_catalog()
+    yield
 
 # Initialize FastAPI app and router for endpoints
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Include routers for endpoints in FastAPI app
 app.include_router(login.router)
@@ -16,6 +16,8 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 import models
 from db import SQLALCHEMY_DATABASE_URL
+from services.drill_search import SEARCH_TABLES, search_vector_ddl
+from services.drill_pagination import KEYSET_INDEX_DDL
 from config import get_logger
 
 logger = get_logger(__name__)
@@ -126,6 +128,37 @@ class DatabaseMigrator:
             except Exception as e:
                 logger.error(f"❌ Failed to create indexes: {e}")
     
+    def create_search_vectors(self):
+        """Add the generated full-text search column and GIN index to drills and custom_drills (PostgreSQL only)"""
+        if self.engine.dialect.name != "postgresql":
+            logger.info("Skipping full-text search columns (not PostgreSQL)")
+            return
+        
+        existing_tables = self.get_existing_tables()
+        for table_name in SEARCH_TABLES:
+            if table_name not in existing_tables:
+                continue
+            try:
+                # Adding a stored generated column rewrites the table once
+                with self.engine.begin() as conn:
+                    for statement in search_vector_ddl(table_name):
+                        conn.execute(text(statement))
+                logger.info(f"✅ Full-text search column and index ready on {table_name}")
+            except Exception as e:
+                logger.error(f"❌ Failed to create full-text search column on {table_name}: {e}")
+    
+    def create_keyset_indexes(self):
+        """Create the (title, uuid) indexes used by cursor pagination of drills (PostgreSQL only)"""
+        if self.engine.dialect.name != "postgresql":
+            return
+        try:
+            with self.engine.begin() as conn:
+                for statement in KEYSET_INDEX_DDL:
+                    conn.execute(text(statement))
+            logger.info("✅ Drill pagination indexes ready")
+        except Exception as e:
+            logger.error(f"❌ Failed to create drill pagination indexes: {e}")
+    
     def check_foreign_keys(self):
         """Check and create missing foreign key constraints"""
         logger.info("Checking foreign key constraints...")
@@ -172,6 +205,8 @@ class DatabaseMigrator:
             # Step 3: Create missing indexes
             logger.info("Step 3: Creating missing indexes...")
             self.create_missing_indexes()
+            self.create_search_vectors()
+            self.create_keyset_indexes()
             
             # Step 4: Check foreign keys
             logger.info("Step 4: Checking foreign keys...")
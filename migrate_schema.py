@@ -35,6 +35,8 @@ from sqlalchemy.sql import func
 import models
 from db import SQLALCHEMY_DATABASE_URL
 from config import get_logger
+from services.drill_catalog import bump_catalog_version
+from services.drill_changes import record_drill_changes
 from datetime import datetime
 
 logger = get_logger(__name__)
@@ -328,6 +330,8 @@ class SchemaMigrator:
                     for quote in new_quotes:
                         db.add(quote)
                     
+                    # Quotes are served with catalog-version ETags, so clients need a new version
+                    bump_catalog_version(db)
                     db.commit()
                     logger.info(f"✅ Seeded {len(new_quotes)} mental training quotes")
                     self.changes_applied.append(f"Seeded {len(new_quotes)} mental training quotes")
@@ -384,6 +388,7 @@ class SchemaMigrator:
                             logger.info(f"✅ Created drill category: {category_name}")
                     
                     synced_count = 0
+                    synced_drills = []
                     for drill_data in drills_data:
                         # Create a unique identifier for the drill (title + category)
                         drill_title = drill_data.get('title', '').strip()
@@ -401,6 +406,7 @@ class SchemaMigrator:
                             updated = self._update_drill_from_data(existing_drill, drill_data, dry_run)
                             if updated:
                                 synced_count += 1
+                                synced_drills.append(existing_drill)
                         else:
                             # ✅ CREATE: Add new drill
                             if dry_run:
@@ -410,8 +416,13 @@ class SchemaMigrator:
                                 new_drill = self._create_drill_from_data(drill_data, category.id, db)
                                 if new_drill:
                                     synced_count += 1
+                                    synced_drills.append(new_drill)
                     
                     if not dry_run and synced_count > 0:
+                        # Let running API servers know their drill catalog snapshot is stale,
+                        # and the delta feed which drills changed (the bump flushes, so new drills have UUIDs)
+                        catalog_version = bump_catalog_version(db)
+                        record_drill_changes(db, catalog_version, changed=[drill.uuid for drill in synced_drills])
                         db.commit()
                     
                     logger.info(f"✅ Synced {synced_count} drills for {category_name}")
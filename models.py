@@ -235,6 +235,7 @@ class SessionPreferences(Base):
     training_location = Column(String)
     difficulty = Column(String)
     target_skills = Column(JSONB, default=list)  # List of {category: str, sub_skills: List[str]}
+    recent_drill_uuids = Column(JSON, nullable=True)  # Ring of recently completed drill UUIDs, oldest first (see services/recent_drills.py)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
 
@@ -380,6 +381,25 @@ class Drill(Base):
     skill_focus = relationship("DrillSkillFocus", foreign_keys="DrillSkillFocus.drill_uuid", primaryjoin="Drill.uuid == DrillSkillFocus.drill_uuid", backref="drill")  # Relationship to skill focus
 
 
+class DrillCatalogVersion(Base):
+    """Single-row counter bumped whenever the default drill catalog changes"""
+    __tablename__ = "drill_catalog_version"
+
+    id = Column(Integer, primary_key=True, index=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class DrillCatalogChange(Base):
+    """Catalog version at which a default drill was last added, changed or removed (delta feed)"""
+    __tablename__ = "drill_catalog_changes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    drill_uuid = Column(PG_UUID(as_uuid=True), unique=True, index=True, nullable=False)  # no FK: outlives removed drills
+    version = Column(Integer, nullable=False, index=True)
+    removed = Column(Boolean, nullable=False, default=False)
+
+
 class CustomDrill(Base):
     __tablename__ = "custom_drills"
 
@@ -440,6 +460,7 @@ class TrainingSession(Base):
     focus_areas = Column(JSON)  # List of skill areas
     created_at = Column(DateTime, server_default=func.now())
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Optional user association
+    plan_day = Column(Integer, nullable=True)  # Day within the user's training plan; NULL for the current session
 
     user = relationship("User", backref="training_sessions")
 
@@ -4,6 +4,7 @@ from typing import List
 from models import User, CustomDrill, CustomDrillCreate, CustomDrillResponse
 from db import get_db
 from auth import get_current_user
+from services.drill_typeahead import custom_drill_typeahead
 import logging
 
 router = APIRouter()
@@ -44,6 +45,7 @@ async def create_custom_drill(
         db.add(custom_drill)
         db.commit()
         db.refresh(custom_drill)
+        custom_drill_typeahead.invalidate(current_user.id)
         
         # Convert to response format
         response = CustomDrillResponse(
@@ -230,6 +232,7 @@ async def update_custom_drill(
         
         db.commit()
         db.refresh(custom_drill)
+        custom_drill_typeahead.invalidate(current_user.id)
         
         # Convert to response format
         response = CustomDrillResponse(
@@ -335,6 +338,7 @@ async def delete_custom_drill(
         
         db.delete(custom_drill)
         db.commit()
+        custom_drill_typeahead.invalidate(current_user.id)
         
         return {"message": "Custom drill deleted successfully"}
         
@@ -17,6 +17,7 @@ from schemas import (
     ProgressHistoryResponse
 )
 from services.treat_reward_service import TreatRewardService
+from services.recent_drills import record_completed_drills
 from db import get_db
 from auth import get_current_user
 from collections import Counter
@@ -233,7 +234,8 @@ async def get_ordered_session_drills(
     try:
         # Join OrderedSessionDrill with TrainingSession to filter by user
         ordered_drills = db.query(OrderedSessionDrill).join(OrderedSessionDrill.session).filter(
-            TrainingSession.user_id == current_user.id
+            TrainingSession.user_id == current_user.id,
+            TrainingSession.plan_day.is_(None)  # Plan sessions are not the current session
         ).order_by(OrderedSessionDrill.position).all()
 
         # Include the associated drill data for each ordered drill
@@ -316,7 +318,10 @@ async def sync_ordered_session_drills(
     """
     try:
         # Get or create the user's training session
-        user_session = db.query(TrainingSession).filter(TrainingSession.user_id == current_user.id).first()
+        user_session = db.query(TrainingSession).filter(
+            TrainingSession.user_id == current_user.id,
+            TrainingSession.plan_day.is_(None)
+        ).order_by(TrainingSession.id).first()
         if not user_session:
             # Create a new training session for the user
             user_session = TrainingSession(
@@ -472,6 +477,11 @@ def create_completed_session(session: CompletedSessionCreate,
                 duration_minutes=session.duration_minutes
             )
             db.add(db_session)
+            # Remember the completed drills so the next sessions favor other drills
+            if session.drills:
+                record_completed_drills(
+                    db, current_user.id, [drill.drill.uuid for drill in session.drills if drill.isCompleted]
+                )
             db.commit()
             db.refresh(db_session)
             # Initialize treats - will be set below based on whether already completed today
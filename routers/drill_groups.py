@@ -5,7 +5,7 @@ from models import User, DrillGroup, DrillResponse, DrillGroupRequest, DrillGrou
 from db import get_db
 from auth import get_current_user
 import logging
-from routers.router_utils import drill_to_response, any_drill_to_response
+from routers.router_utils import drills_to_response
 
 router = APIRouter()
 
@@ -62,6 +62,13 @@ def find_drill_by_uuid(db: Session, drill_uuid: str, user_id: int = None, is_cus
         return None, False
 
 
+def groups_to_response(drill_groups, db: Session) -> List[List[dict]]:
+    """Drill responses for each group, converting the drills of all groups in one batch"""
+    group_drills = [group.drills for group in drill_groups]
+    responses = iter(drills_to_response([drill for drills in group_drills for drill in drills], db))
+    return [[next(responses) for _ in drills] for drills in group_drills]
+
+
 # Get all drill groups for the current user
 @router.get("/api/drill-groups/", response_model=List[DrillGroupResponse])
 async def get_user_drill_groups(
@@ -76,15 +83,7 @@ async def get_user_drill_groups(
         
         # Convert to response format with drills array
         result = []
-        for group in drill_groups:
-            # ✅ UPDATED: Convert drills to response format handling both Drill and CustomDrill objects
-            drills_data = []
-            for drill in group.drills:
-                # Check if this is a CustomDrill or regular Drill
-                is_custom_drill = hasattr(drill, 'user_id') and hasattr(drill, 'primary_skill')
-                drill_response = any_drill_to_response(drill, is_custom_drill, db)
-                drills_data.append(drill_response)
-            
+        for group, drills_data in zip(drill_groups, groups_to_response(drill_groups, db)):
             # Create a copy of the group with drills added
             group_dict = {
                 "id": group.id,
@@ -119,7 +118,7 @@ async def get_drill_group(
         raise HTTPException(status_code=404, detail="Drill group not found")
     
     # Convert to response format with drills array
-    drills_data = [drill_to_response(drill, db) for drill in drill_group.drills]
+    drills_data = drills_to_response(drill_group.drills, db)
     
     # Create response dict
     response = {
@@ -185,12 +184,7 @@ async def create_drill_group(
         db.refresh(new_group)
         
         # ✅ UPDATED: Convert to response format handling both Drill and CustomDrill objects
-        drills_data = []
-        for drill in new_group.drills:
-            # Check if this is a CustomDrill or regular Drill
-            is_custom_drill = hasattr(drill, 'user_id') and hasattr(drill, 'primary_skill')
-            drill_response = any_drill_to_response(drill, is_custom_drill, db)
-            drills_data.append(drill_response)
+        drills_data = drills_to_response(new_group.drills, db)
         
         # Create response dict
         response = {
@@ -270,12 +264,7 @@ async def update_drill_group(
         db.refresh(existing_group)
         
         # ✅ UPDATED: Convert to response format handling both Drill and CustomDrill objects
-        drills_data = []
-        for drill in existing_group.drills:
-            # Check if this is a CustomDrill or regular Drill
-            is_custom_drill = hasattr(drill, 'user_id') and hasattr(drill, 'primary_skill')
-            drill_response = any_drill_to_response(drill, is_custom_drill, db)
-            drills_data.append(drill_response)
+        drills_data = drills_to_response(existing_group.drills, db)
         
         # Create response dict
         response = {
@@ -462,7 +451,7 @@ async def get_liked_drills_group(
             db.refresh(liked_group)
         
         # Convert to response format
-        drills_data = [drill_to_response(drill, db) for drill in liked_group.drills]
+        drills_data = drills_to_response(liked_group.drills, db)
         
         # Create response dict
         response = {
@@ -667,10 +656,7 @@ async def get_public_drill_groups(
         
         # Convert to response format with drills array
         result = []
-        for group in drill_groups:
-            # Convert SQLAlchemy objects to DrillResponse format
-            drills_data = [drill_to_response(drill, db) for drill in group.drills]
-            
+        for group, drills_data in zip(drill_groups, groups_to_response(drill_groups, db)):
             # Create a copy of the group with drills added
             group_dict = {
                 "id": group.id,
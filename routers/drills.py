@@ -3,31 +3,68 @@ drills.py
 API endpoints for obtaining drills and recommendations
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from sqlalchemy.dialects.postgresql import JSONB
 from db import get_db
 from models import Drill, DrillCategory, DrillResponse, User
 from typing import List, Optional
-from sqlalchemy import or_
 import logging
 from auth import get_current_user
-from routers.router_utils import drill_to_response
+from routers.router_utils import (
+    drills_to_response, drills_to_fragments, custom_drill_to_response, build_drill_response, load_skill_focus,
+    catalog_response
+)
+from services.drill_typeahead import DEFAULT_LIMIT, autocomplete
+from utils.json_fragments import FragmentJSONResponse
+from services.drill_pagination import InvalidCursor, decode_cursor, keyset_page
+from services.drill_changes import changes_since, current_snapshot, encode_changes
+from services.drill_facets import count_catalog_drills, custom_drill_facets, default_drill_facets, facet_key
+from utils.skill_mapper import map_frontend_category_to_backend
+from utils.guest_showcase import FEATURED_CATEGORIES
+from services.drill_catalog import drill_catalog
+from services.drill_search import apply_text_search, merged_search, order_by_rank, supports_full_text
 
 
 router = APIRouter()
 
+
+def parse_cursor(cursor: str):
+    """Decode a pagination cursor, rejecting malformed ones with a 400"""
+    try:
+        return decode_cursor(cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/drills/")
 def get_drills(
+    request: Request,
     category: Optional[str] = None,
     difficulty: Optional[str] = None,
     equipment: Optional[List[str]] = None,
     page: int = 1,
     limit: int = 20,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Get drills with optional filtering and pagination"""
+    """
+    Get drills with optional filtering and pagination.
+    Pass `cursor` (empty for the first page, then metadata.next_cursor) for keyset
+    pagination by title; `page` keeps working for older app versions.
+    Responses carry an ETag for the catalog version; If-None-Match gets a 304.
+    """
+    return catalog_response(request, db, lambda: list_drills(
+        db, category, difficulty, equipment, page, limit, cursor, include_total
+    ))
+
+
+def list_drills(db: Session, category: Optional[str], difficulty: Optional[str], equipment: Optional[List[str]],
+                page: int, limit: int, cursor: Optional[str], include_total: bool) -> dict:
+    """Body of GET /drills/"""
     query = db.query(Drill)
 
     # Apply filters if provided
@@ -47,11 +84,26 @@ def get_drills(
             )
         )
 
-    # Get total count before pagination
-    total = query.count()
-    
-    # Apply pagination
-    drills = query.offset((page - 1) * limit).limit(limit).all()
+    if cursor is not None:
+        # Keyset pagination: no offset scan, and the count only when asked for
+        result = keyset_page(db, [(query, Drill)], parse_cursor(cursor), limit)
+        drills = result.rows
+        metadata = {"limit": limit, "next_cursor": result.next_cursor, "has_next": result.has_next}
+        if include_total:
+            metadata["total"] = query.count()
+    else:
+        # Get total count before pagination
+        total = query.count()
+        
+        # Apply pagination (in id order, so a page is the same for a given catalog version)
+        drills = query.order_by(Drill.id).offset((page - 1) * limit).limit(limit).all()
+        metadata = {
+            "total": total,
+            "page": page,
+            "pages": (total + limit - 1) // limit,
+            "has_next": page * limit < total,
+            "has_prev": page > 1
+        }
 
     return {
         "drills": [
@@ -68,20 +120,19 @@ def get_drills(
                 "is_custom": drill.is_custom  # ✅ Add is_custom field
             } for drill in drills
         ],
-        "metadata": {
-            "total": total,
-            "page": page,
-            "pages": (total + limit - 1) // limit,
-            "has_next": page * limit < total,
-            "has_prev": page > 1
-        }
+        "metadata": metadata
     }
 
 # API endpoint for obtaining all drill categories
 @router.get("/drill-categories/")
-def get_categories(db: Session = Depends(get_db)):
-    """Get all drill categories"""
-    categories = db.query(DrillCategory).all()
+def get_categories(request: Request, db: Session = Depends(get_db)):
+    """Get all drill categories (ETag per catalog version; If-None-Match gets a 304)"""
+    return catalog_response(request, db, lambda: list_categories(db))
+
+
+def list_categories(db: Session) -> dict:
+    """Body of GET /drill-categories/"""
+    categories = db.query(DrillCategory).order_by(DrillCategory.id).all()
     return {
         "categories": [
             {
@@ -101,6 +152,9 @@ async def search_drills(
     difficulty: Optional[str] = None,
     page: int = 1,
     limit: int = 20,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    include_facets: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -108,23 +162,21 @@ async def search_drills(
     Search for drills based on various criteria.
     Used when users want to find drills to add to their groups.
     Includes both default drills and user's custom drills.
+    With `cursor` (empty for the first page), results are paged by (title, uuid)
+    across both sets; `page` keeps working for older app versions.
+    `include_facets` adds category/difficulty/equipment counts over all results.
     """
     try:
         from models import CustomDrill
-        from sqlalchemy import union_all, select, literal_column
         
         # ✅ UPDATED: Search both default drills and user's custom drills
         # Start with default drills query
         default_drill_query = db.query(Drill)
+        full_text = supports_full_text(db)
         
         # Apply text search to default drills if provided
         if query:
-            default_drill_query = default_drill_query.filter(
-                or_(
-                    Drill.title.ilike(f"%{query}%"),
-                    Drill.description.ilike(f"%{query}%")
-                )
-            )
+            default_drill_query = apply_text_search(default_drill_query, Drill, query, full_text)
         
         # Apply category filter to default drills if provided
         if category:
@@ -140,20 +192,12 @@ async def search_drills(
                 func.lower(Drill.difficulty) == difficulty.lower()
             )
         
-        # ✅ FIXED: Get total counts first for proper pagination
-        default_drill_count = default_drill_query.count()
-        
         # Now search custom drills (only for the current user)
         custom_drill_query = db.query(CustomDrill).filter(CustomDrill.user_id == current_user.id)
         
         # Apply text search to custom drills if provided
         if query:
-            custom_drill_query = custom_drill_query.filter(
-                or_(
-                    CustomDrill.title.ilike(f"%{query}%"),
-                    CustomDrill.description.ilike(f"%{query}%")
-                )
-            )
+            custom_drill_query = apply_text_search(custom_drill_query, CustomDrill, query, full_text)
         
         # Apply difficulty filter to custom drills if provided
         if difficulty:
@@ -170,44 +214,36 @@ async def search_drills(
                 func.cast(CustomDrill.primary_skill, JSONB)['category'].astext == backend_category
             )
         
-        # ✅ FIXED: Get custom drill count for pagination
-        custom_drill_count = custom_drill_query.count()
-        total = default_drill_count + custom_drill_count
+        if cursor is not None:
+            # Keyset pagination over the merged default + custom result set
+            result = keyset_page(
+                db, [(default_drill_query, Drill), (custom_drill_query, CustomDrill)], parse_cursor(cursor), limit
+            )
+            response = {
+                "items": drills_to_response(result.rows, db),
+                "page_size": limit,
+                "next_cursor": result.next_cursor,
+                "has_next_page": result.has_next
+            }
+            if include_total:
+                response["total"] = default_drill_query.count() + custom_drill_query.count()
+            if include_facets:
+                response["facets"] = search_facets(db, default_drill_query, custom_drill_query, query, category, difficulty)
+            return response
         
-        # ✅ FIXED: Apply proper database pagination
-        # Calculate offset and limit for this page
+        # One UNION ALL over both tables: ordered, paginated and counted in the database
         offset = (page - 1) * limit
+        rows, total = merged_search(
+            db, default_drill_query, custom_drill_query, query, full_text, offset, limit
+        )
         
-        # Get paginated results from both tables
-        all_drills = []
-        
-        # First, get default drills with pagination
-        remaining_limit = limit
-        if offset < default_drill_count and remaining_limit > 0:
-            default_offset = offset
-            default_limit = min(remaining_limit, default_drill_count - default_offset)
-            default_drills = default_drill_query.offset(default_offset).limit(default_limit).all()
-            
-            for drill in default_drills:
-                drill_response = drill_to_response(drill, db)
-                all_drills.append(drill_response)
-            
-            remaining_limit -= len(default_drills)
-        
-        # Then, get custom drills if we still need more results
-        if remaining_limit > 0 and custom_drill_count > 0:
-            custom_offset = max(0, offset - default_drill_count)
-            custom_drills = custom_drill_query.offset(custom_offset).limit(remaining_limit).all()
-            
-            for custom_drill in custom_drills:
-                from routers.router_utils import custom_drill_to_response
-                drill_response = custom_drill_to_response(custom_drill)
-                all_drills.append(drill_response)
-        
-        # Sort by title for consistent ordering
-        all_drills.sort(key=lambda x: x.get('title', ''))
-        
-        paginated_drills = all_drills
+        # Skill focus for every default drill on the page in one query
+        skill_focus = load_skill_focus(db, [row.uuid for row in rows if row.source == "default"])
+        paginated_drills = [
+            build_drill_response(row, *skill_focus[str(row.uuid)]) if row.source == "default"
+            else custom_drill_to_response(row)
+            for row in rows
+        ]
         
         # ✅ FIXED: Include proper pagination metadata
         total_pages = (total + limit - 1) // limit
@@ -221,87 +257,99 @@ async def search_drills(
             "total_pages": total_pages,
             "has_next_page": has_next_page
         }
+        if include_facets:
+            response["facets"] = search_facets(db, default_drill_query, custom_drill_query, query, category, difficulty)
         
         return response
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error searching drills: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to search drills: {str(e)}")
 
 
-# ✅ UPDATED: Helper function to map frontend category names to backend database category names
-def map_frontend_category_to_backend(frontend_category: str) -> str:
+def search_facets(db: Session, default_query, custom_query, query: str, category: Optional[str],
+                  difficulty: Optional[str]) -> dict:
+    """Facet counts of a search: default drills from the catalog (cached per version), plus custom drills if any"""
+    counts = default_drill_facets(drill_catalog.get_snapshot(db), default_query, facet_key(query, category, difficulty))
+    if custom_query is not None:
+        counts = counts + custom_drill_facets(custom_query)
+    return counts.as_dict()
+
+
+# Lightweight autocomplete for the search box, served from in-memory indexes
+@router.get("/api/drills/autocomplete")
+def autocomplete_drills(
+    query: str = "",
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=25),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """
-    Map frontend category names (with spaces) to backend database category names.
-    Handles multiple variations to ensure consistent searching.
+    Suggest default and custom drills whose title or sub-skill words start with the query words.
+    Returns only uuid, title and category for each suggestion.
     """
-    category_mapping = {
-        "Passing": "passing",
-        "Shooting": "shooting", 
-        "Dribbling": "dribbling",
-        "First Touch": "first_touch",  # ✅ CRITICAL: Map "First Touch" to "first_touch"
-        "Defending": "defending",
-        "Goalkeeping": "goalkeeping",  # ✅ Primary goalkeeping mapping
-        "Goalkeeper": "goalkeeping",   # ✅ Handle goalkeeper variation
-        "Fitness": "fitness",
-    }
-    
-    return category_mapping.get(frontend_category, frontend_category.lower().replace(" ", "_"))
+    try:
+        return [entry.as_dict() for entry in autocomplete(db, current_user.id, query, limit)]
+    except Exception as e:
+        logging.error(f"Error autocompleting drills: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to autocomplete drills: {str(e)}")
 
 
 # ✅ NEW: Guest mode limited drills endpoint
 @router.get("/public/drills/limited")
-async def get_limited_drills_for_guests(db: Session = Depends(get_db)):
+async def get_limited_drills_for_guests(request: Request, db: Session = Depends(get_db)):
     """
     Get a limited, curated set of drills for guest users to try the app.
     Returns 4 drills each from key categories: Passing, Dribbling, Shooting, First Touch, Defending, Goalkeeping, Fitness.
-    No authentication required.
+    No authentication required. Responses carry an ETag for the catalog version; If-None-Match gets a 304.
     """
+    return catalog_response(request, db, lambda: limited_drills_for_guests(db))
+
+
+def limited_drills_for_guests(db: Session) -> FragmentJSONResponse:
+    """Body of GET /public/drills/limited, from the catalog's precomputed guest showcase"""
     try:
         logging.info("Fetching limited drills for guest mode")
         
-        # Define the categories we want to showcase
-        featured_categories = ["Passing", "Dribbling", "Shooting", "First Touch", "Defending", "Goalkeeping", "Fitness"]  # ✅ UPDATED: Add fitness
-        
-        all_guest_drills = []
-        
-        for category_name in featured_categories:
-            # ✅ UPDATED: Map frontend category name to backend database name
-            backend_category = map_frontend_category_to_backend(category_name)
-            
-            # Get drills for this category - limited to 4 per category for guests
-            category_drills = db.query(Drill).join(DrillCategory).filter(
-                DrillCategory.name.ilike(f"%{backend_category}%")
-            ).limit(4).all()
-            
-            # Convert to response format
-            for drill in category_drills:
-                drill_response = drill_to_response(drill, db)
-                all_guest_drills.append(drill_response)
-        
-        # Also add some general drills if we don't have enough (max 28 total - 7 categories * 4 drills)
-        if len(all_guest_drills) < 28:
-            general_drills = db.query(Drill).filter(
-                ~Drill.id.in_([d["backend_id"] for d in all_guest_drills if "backend_id" in d])
-            ).limit(4).all()
-            
-            for drill in general_drills:
-                drill_response = drill_to_response(drill, db)
-                all_guest_drills.append(drill_response)
+        showcase = drill_catalog.get_snapshot(db).guest_showcase
+        all_guest_drills = showcase.limited_fragments
         
         logging.info(f"Returning {len(all_guest_drills)} drills for guest mode")
         
-        return {
+        return FragmentJSONResponse({
             "drills": all_guest_drills,
             "total_count": len(all_guest_drills),
-            "categories_included": featured_categories,
+            "categories_included": FEATURED_CATEGORIES,
             "message": f"Limited drill selection for guest users - {len(all_guest_drills)} drills available (4 per category). Sign up for access to 100+ drills!"
-        }
+        })
         
     except Exception as e:
         logging.error(f"Error fetching limited drills for guests: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch guest drills: {str(e)}")
 
 
+# Delta feed so clients can keep a local copy of the catalog
+@router.get("/public/drills/changes")
+def get_drill_changes(since: Optional[int] = Query(None, ge=0), db: Session = Depends(get_db)):
+    """
+    Drills added, changed or removed since catalog version `since`, streamed in version order.
+    Omit `since` (or pass one newer than the server's) for the whole catalog, flagged `full`.
+    Store the returned `version` and pass it as `since` on the next sync.
+    """
+    try:
+        snapshot = current_snapshot(db)
+        if since is not None and since > snapshot.version:
+            since = None  # the client is ahead of this catalog (e.g. after a restore): resync it fully
+        changes = changes_since(db, snapshot, since)
+    except Exception as e:
+        logging.error(f"Error fetching drill changes: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch drill changes: {str(e)}")
+
+    # Everything is in memory now, so the stream does not need the request's session
+    return StreamingResponse(encode_changes(snapshot, since, changes), media_type="application/json")
+
+
 # ✅ NEW: Guest mode search with limits
 @router.get("/public/drills/search/limited")
 async def search_drills_for_guests(
@@ -310,6 +358,9 @@ async def search_drills_for_guests(
     difficulty: Optional[str] = None,
     page: int = 1,
     limit: int = 20,  # Updated limit for guests  
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    include_facets: bool = False,
     db: Session = Depends(get_db)
 ):
     """
@@ -317,6 +368,9 @@ async def search_drills_for_guests(
     Returns smaller result sets to encourage account creation.
     When limit is high (>30), returns all available guest drills.
     Guests can only search default drills (no custom drills).
+    Below that, `cursor` (empty for the first page) pages by title instead of `page`;
+    the cursor counts drills served so the guest cap still applies.
+    With a high limit, `include_facets` adds category/difficulty/equipment counts of the results.
     """
     try:
         logging.info(f"Guest search: query='{query}', category='{category}', difficulty='{difficulty}', limit={limit}")
@@ -324,52 +378,14 @@ async def search_drills_for_guests(
         # ✅ NEW: If limit is high, return all guest drills (for search page)
         if limit >= 30:
             # ✅ UPDATED: Get only default drills for guests - no custom drills
-            all_guest_drills = []
-            featured_categories = ["Passing", "Dribbling", "Shooting", "First Touch", "Defending", "Goalkeeping", "Fitness"]  # ✅ UPDATED: Add fitness
-            
-            for category_name in featured_categories:
-                # ✅ UPDATED: Map frontend category name to backend database name
-                backend_category = map_frontend_category_to_backend(category_name)
-                
-                category_drills = db.query(Drill).join(DrillCategory).filter(
-                    DrillCategory.name.ilike(f"%{backend_category}%")
-                ).limit(4).all()
-                
-                for drill in category_drills:
-                    drill_response = drill_to_response(drill, db)
-                    all_guest_drills.append(drill_response)
-            
-            # Apply search filters to the full guest catalog
-            filtered_drills = all_guest_drills
-            
-            if query:
-                filtered_drills = [
-                    drill for drill in filtered_drills
-                    if query.lower() in drill.get('title', '').lower() or
-                       query.lower() in drill.get('description', '').lower()
-                ]
-            
-            if category:
-                # ✅ UPDATED: Map frontend category to backend for comparison
-                backend_category = map_frontend_category_to_backend(category)
-                
-                # Find drills that match the category through their primary or secondary skills
-                filtered_drills = [
-                    drill for drill in filtered_drills
-                    if (drill.get('primary_skill', {}).get('category', '').lower() == backend_category.lower() or
-                        any(skill.get('category', '').lower() == backend_category.lower() 
-                            for skill in drill.get('secondary_skills', [])))
-                ]
-            
-            if difficulty:
-                filtered_drills = [
-                    drill for drill in filtered_drills
-                    if drill.get('difficulty', '').lower() == difficulty.lower()
-                ]
+            # Filtered in memory from the catalog's precomputed guest showcase
+            showcase = drill_catalog.get_snapshot(db).guest_showcase
+            results = showcase.search(query, category, difficulty)
+            filtered_drills = showcase.fragments(results)
             
             logging.info(f"Returning {len(filtered_drills)} drills for guest search (all available)")
             
-            return {
+            response = {
                 "items": filtered_drills,
                 "total": len(filtered_drills),
                 "page": 1,
@@ -380,19 +396,18 @@ async def search_drills_for_guests(
                 "guest_mode": True,
                 "message": f"Showing {len(filtered_drills)} of 49 available guest drills. Create an account for access to 100+ drills!"  # ✅ UPDATED: Update message to reflect 49 drills
             }
+            if include_facets:
+                response["facets"] = count_catalog_drills(results).as_dict()
+            return FragmentJSONResponse(response)
         
         # ✅ EXISTING: Standard pagination for smaller limits
         # ✅ UPDATED: Only search default drills - guests cannot access custom drills
         drill_query = db.query(Drill)
+        full_text = supports_full_text(db)
         
         # Apply text search if provided
         if query:
-            drill_query = drill_query.filter(
-                or_(
-                    Drill.title.ilike(f"%{query}%"),
-                    Drill.description.ilike(f"%{query}%")
-                )
-            )
+            drill_query = apply_text_search(drill_query, Drill, query, full_text)
         
         # Apply category filter if provided
         if category:
@@ -408,16 +423,36 @@ async def search_drills_for_guests(
                 func.lower(Drill.difficulty) == difficulty.lower()
             )
         
+        if cursor is not None:
+            position = parse_cursor(cursor)
+            remaining = max(28 - position.served, 0)  # Cap at 28 total results for guests
+            result = keyset_page(db, [(drill_query, Drill)], position, min(limit, remaining))
+            next_cursor = result.next_cursor if position.served + len(result.rows) < 28 else None
+            drill_responses = drills_to_fragments(result.rows, db)
+            response = {
+                "items": drill_responses,
+                "page_size": limit,
+                "next_cursor": next_cursor,
+                "has_next": next_cursor is not None,
+                "has_prev": not position.is_start,
+                "guest_mode": True,
+                "message": f"Showing {len(drill_responses)} drills for guest users. Create an account for access to 100+ drills!"
+            }
+            if include_total:
+                response["total"] = min(drill_query.count(), 28)
+            return FragmentJSONResponse(response)
+        
         # Get total count but limit to guest maximum
         total = min(drill_query.count(), 28)  # Cap at 28 total results for guests
         
+        if query:
+            drill_query = order_by_rank(drill_query, Drill, query, full_text)
+        
         # Apply pagination with guest limits
         drills = drill_query.offset((page - 1) * limit).limit(limit).all()
         
         # Convert to response format
-        drill_responses = []
-        for drill in drills[:limit]:  # Extra safety to ensure limit
-            drill_responses.append(drill_to_response(drill, db))
+        drill_responses = drills_to_fragments(drills[:limit], db)  # Extra safety to ensure limit
         
         # Include pagination metadata with guest messaging
         response = {
@@ -434,8 +469,10 @@ async def search_drills_for_guests(
         
         logging.info(f"Returning {len(drill_responses)} drills for guest search")
         
-        return response
+        return FragmentJSONResponse(response)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error in guest search: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to search drills for guest: {str(e)}")
@@ -449,26 +486,26 @@ async def public_search_drills(
     difficulty: Optional[str] = None,
     page: int = 1,
     limit: int = 20,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    include_facets: bool = False,
     db: Session = Depends(get_db)
 ):
     """
     A public search endpoint for drills that doesn't require authentication.
     Useful for testing and public access to drill information.
     Guests can only search default drills (no custom drills).
+    With `cursor` (empty for the first page), results are paged by (title, uuid).
+    `include_facets` adds category/difficulty/equipment counts over all results.
     """
     try:
         # ✅ UPDATED: Only search default drills - guests cannot access custom drills
         drill_query = db.query(Drill)
+        full_text = supports_full_text(db)
         
         # Apply text search if provided
         if query:
-            # Search in title and description
-            drill_query = drill_query.filter(
-                or_(
-                    Drill.title.ilike(f"%{query}%"),
-                    Drill.description.ilike(f"%{query}%")
-                )
-            )
+            drill_query = apply_text_search(drill_query, Drill, query, full_text)
         
         # Apply category filter if provided
         if category:
@@ -484,16 +521,32 @@ async def public_search_drills(
                 func.lower(Drill.difficulty) == difficulty.lower()
             )
         
+        if cursor is not None:
+            result = keyset_page(db, [(drill_query, Drill)], parse_cursor(cursor), limit)
+            response = {
+                "items": drills_to_fragments(result.rows, db),
+                "page_size": limit,
+                "next_cursor": result.next_cursor,
+                "has_next_page": result.has_next
+            }
+            if include_total:
+                response["total"] = drill_query.count()
+            if include_facets:
+                response["facets"] = search_facets(db, drill_query, None, query, category, difficulty)
+            return FragmentJSONResponse(response)
+        
         # Get total count for pagination
         total = drill_query.count()
+        facets = search_facets(db, drill_query, None, query, category, difficulty) if include_facets else None
+        
+        if query:
+            drill_query = order_by_rank(drill_query, Drill, query, full_text)
         
         # Apply pagination
         drills = drill_query.offset((page - 1) * limit).limit(limit).all()
         
         # Convert to response format
-        drill_responses = []
-        for drill in drills:
-            drill_responses.append(drill_to_response(drill, db))
+        drill_responses = drills_to_fragments(drills, db)
         
         # ✅ FIXED: Include proper pagination metadata
         total_pages = (total + limit - 1) // limit
@@ -507,8 +560,12 @@ async def public_search_drills(
             "total_pages": total_pages,
             "has_next_page": has_next_page
         }
+        if facets is not None:
+            response["facets"] = facets
         
-        return response
+        return FragmentJSONResponse(response)
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error searching drills: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to search drills: {str(e)}") 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
 from models import User, MentalTrainingQuote, MentalTrainingQuoteResponse
@@ -6,6 +6,7 @@ from db import get_db
 import logging
 from sqlalchemy import func
 from datetime import datetime
+from routers.router_utils import catalog_response
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,6 +16,7 @@ router = APIRouter()
 
 @router.get("/api/mental-training/quotes", response_model=List[MentalTrainingQuoteResponse])
 async def get_mental_training_quotes(
+    request: Request,
     limit: int = 50,
     quote_type: str = None,
     db: Session = Depends(get_db)
@@ -23,7 +25,16 @@ async def get_mental_training_quotes(
     Get mental training quotes for the timer display.
     Returns a randomized list of quotes to cycle through during mental training.
     This is a public endpoint that doesn't require authentication for guest mode access.
+    Quotes change only with the catalog version, so responses carry a (weak) ETag and
+    If-None-Match gets a 304; every 200 is a fresh random selection.
     """
+    return catalog_response(
+        request, db, lambda: select_mental_training_quotes(db, limit, quote_type), per_request=True
+    )
+
+
+def select_mental_training_quotes(db: Session, limit: int, quote_type: str = None) -> list:
+    """Body of GET /api/mental-training/quotes"""
     try:
         logger.info(f"Fetching {limit} mental training quotes (public endpoint)")
         
@@ -39,9 +50,8 @@ async def get_mental_training_quotes(
         
         logger.info(f"Found {len(quotes)} mental training quotes")
         
-        return quotes
+        return [MentalTrainingQuoteResponse.model_validate(quote) for quote in quotes]
         
     except Exception as e:
         logger.error(f"Error fetching mental training quotes: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch mental training quotes: {str(e)}")
-
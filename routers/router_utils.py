@@ -1,53 +1,59 @@
-from models import DrillSkillFocus
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from models import CustomDrill, DrillSkillFocus
+from services.drill_catalog import drill_catalog
+from utils.drill_response import build_drill_response
+from utils.http_cache import CATALOG_CACHE_CONTROL, etag_matches, make_etag, request_key
+from utils.json_fragments import JSONFragments, dumps
 
 # Helper function to convert Drill object to DrillResponse dict
 def drill_to_response(drill, db):
-    # Get the primary skill
-    primary_skill = db.query(DrillSkillFocus).filter(
-        DrillSkillFocus.drill_uuid == drill.uuid,
-        DrillSkillFocus.is_primary == True
-    ).first()
-    
-    # Get secondary skills
-    secondary_skills = db.query(DrillSkillFocus).filter(
-        DrillSkillFocus.drill_uuid == drill.uuid,
-        DrillSkillFocus.is_primary == False
-    ).all()
-    
-    return {
-        "uuid": str(drill.uuid),  # Use UUID as primary identifier
-        "title": drill.title,
-        "description": drill.description,
-        "type": drill.type,
-        "duration": drill.duration,
-        "sets": drill.sets,
-        "reps": drill.reps,
-        "rest": drill.rest,
-        "equipment": drill.equipment,
-        "suitable_locations": drill.suitable_locations,
-        "intensity": drill.intensity,
-        "training_styles": drill.training_styles,
-        "difficulty": drill.difficulty,
-        "primary_skill": {
-            "category": primary_skill.category,
-            "sub_skill": primary_skill.sub_skill
-        } if primary_skill else {},
-        "secondary_skills": [
-            {
-                "category": skill.category,
-                "sub_skill": skill.sub_skill
-            }
-            for skill in secondary_skills
-        ],
-        "instructions": drill.instructions,
-        "tips": drill.tips,
-        "common_mistakes": drill.common_mistakes,
-        "progression_steps": drill.progression_steps,
-        "variations": drill.variations,
-        "video_url": drill.video_url,
-        "thumbnail_url": drill.thumbnail_url,
-        "is_custom": drill.is_custom  # ✅ NEW: Custom drill identifier (Boolean)
-    }
+    return drills_to_response([drill], db)[0]
+
+# Convert a list of Drill and/or CustomDrill objects to DrillResponse dicts, in order.
+# Skill focus for all default drills is loaded with a single IN query.
+def drills_to_response(drills, db):
+    drills = list(drills)
+    skill_focus = load_skill_focus(db, [drill.uuid for drill in drills if not isinstance(drill, CustomDrill)])
+    return [
+        custom_drill_to_response(drill) if isinstance(drill, CustomDrill)
+        else build_drill_response(drill, *skill_focus[str(drill.uuid)])
+        for drill in drills
+    ]
+
+# Encoded DrillResponse JSON of default drills, taken from the catalog snapshot.
+# Drills the snapshot does not have yet (added since it loaded) are converted and encoded here.
+def drills_to_fragments(drills, db, catalog=drill_catalog) -> JSONFragments:
+    drills = list(drills)
+    snapshot = catalog.get_snapshot(db)
+    fragments = [snapshot.fragment(drill.uuid) for drill in drills]
+    missing = [drill for drill, fragment in zip(drills, fragments) if fragment is None]
+    if missing:
+        encoded = iter(dumps(response) for response in drills_to_response(missing, db))
+        fragments = [fragment if fragment is not None else next(encoded) for fragment in fragments]
+    return JSONFragments(fragments)
+
+# Load the skill focus of many drills in one query: {str(drill uuid): (primary, [secondary, ...])}
+def load_skill_focus(db, drill_uuids) -> Dict[str, Tuple[Optional[DrillSkillFocus], List[DrillSkillFocus]]]:
+    drill_uuids = list(drill_uuids)
+    skill_focus = {str(drill_uuid): (None, []) for drill_uuid in drill_uuids}
+    if not skill_focus:
+        return skill_focus
+    rows = db.query(DrillSkillFocus).filter(
+        DrillSkillFocus.drill_uuid.in_(drill_uuids)
+    ).order_by(DrillSkillFocus.id).all()
+    for focus in rows:
+        primary, secondary = skill_focus.setdefault(str(focus.drill_uuid), (None, []))
+        if focus.is_primary:
+            if primary is None:
+                skill_focus[str(focus.drill_uuid)] = (focus, secondary)
+        else:
+            secondary.append(focus)
+    return skill_focus
 
 # ✅ ADDED: Helper function to convert CustomDrill object to DrillResponse dict
 def custom_drill_to_response(custom_drill):
@@ -89,4 +95,30 @@ def any_drill_to_response(drill_object, is_custom_drill, db=None):
     if is_custom_drill:
         return custom_drill_to_response(drill_object)
     else:
-        return drill_to_response(drill_object, db)
\ No newline at end of file
+        return drill_to_response(drill_object, db)
+
+# Conditional GET for endpoints whose response only changes with the catalog version.
+# build() returns the response content (a dict/list, or a Response such as FragmentJSONResponse)
+# and only runs when this worker has no body for the request at the current version.
+# A matching If-None-Match gets a 304 from memory; the database is only touched when
+# the catalog's periodic version check is due.
+# With per_request (bodies that vary between requests, e.g. a random order) the ETag is weak
+# and build() runs for every 200 instead of being cached.
+def catalog_response(request: Request, db, build: Callable[[], Any], catalog=drill_catalog,
+                     per_request: bool = False) -> Response:
+    snapshot = catalog.get_snapshot(db)
+    key = request_key(request.url.path, request.query_params.multi_items())
+    etag = make_etag(snapshot.version, key, weak=per_request)
+    headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    body = None if per_request else snapshot.responses.get(key)
+    if body is None:
+        content = build()
+        if not isinstance(content, Response):
+            content = JSONResponse(jsonable_encoder(content))
+        body = content.body
+        if not per_request:
+            snapshot.responses.put(key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
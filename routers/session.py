@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from models import User, SessionPreferences, OnboardingData, SessionResponse, DrillResponse
 from db import get_db
 from auth import get_current_user
 from services.session_generator import SessionGenerator
+from services.drill_catalog import drill_catalog
+from services.generation_metrics import DEBUG_HEADER
+from config import SESSION_DEBUG_HEADERS
 from utils.skill_mapper import map_frontend_to_backend, format_skills_for_session, REVERSE_SKILL_MAP
 from routers.drill_groups import find_drill_by_uuid
 import logging
@@ -71,6 +74,7 @@ async def get_session_preferences(
 @router.put("/api/session/preferences")
 async def update_session_preferences(
     preferences: dict,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -129,6 +133,8 @@ async def update_session_preferences(
                 status_code=500,
                 detail="Failed to generate session with updated preferences"
             )
+        if SESSION_DEBUG_HEADERS:
+            response.headers[DEBUG_HEADER] = session_generator.metrics.header_value()
         
         return {
             "status": "success",
@@ -139,6 +145,32 @@ async def update_session_preferences(
         logger.error(f"Error updating session preferences: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/api/session/plan")
+async def generate_training_plan(
+    days: int = Query(7, ge=1, le=14),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Generate a training plan with one session per day (no drill repeats across days)"""
+    try:
+        preferences = db.query(SessionPreferences).filter(SessionPreferences.user_id == current_user.id).first()
+        if not preferences:
+            preferences = create_default_preferences(db, current_user)
+
+        sessions = await SessionGenerator(db).generate_plan(preferences, days)
+
+        return {
+            "status": "success",
+            "message": f"Training plan generated for {len(sessions)} days",
+            "data": [
+                {"day": session.plan_day, **format_session_for_frontend(session, db, current_user.id)}
+                for session in sessions
+            ]
+        }
+    except Exception as e:
+        logger.error(f"Error generating training plan: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 def create_default_preferences(db: Session, user: User) -> SessionPreferences:
     """Create default preferences for a user based on their onboarding data"""
     try:
@@ -211,12 +243,18 @@ def format_session_for_frontend(session, db: Session, user_id: int) -> Dict[str,
             "drills": []
         }
 
+    # Default drills come from the in-memory catalog; only custom drills (or drills
+    # imported since the snapshot was taken) need a database lookup
+    catalog = drill_catalog.get_snapshot(db)
+
     for osd in sorted(session.ordered_drills, key=lambda x: x.position):
-        # ✅ UPDATED: Use find_drill_by_uuid to get drill from either table
         drill = None
         is_custom = False
         if osd.drill_uuid:
-            drill, is_custom = find_drill_by_uuid(db, str(osd.drill_uuid), user_id)
+            drill = catalog.get(osd.drill_uuid)
+            if drill is None:
+                # ✅ UPDATED: Use find_drill_by_uuid to get drill from either table
+                drill, is_custom = find_drill_by_uuid(db, str(osd.drill_uuid), user_id)
         
         if drill:
             # ✅ UPDATED: Handle skill focus differently for Drill vs CustomDrill
@@ -281,6 +319,7 @@ def format_session_for_frontend(session, db: Session, user_id: int) -> Dict[str,
 @router.post("/public/session/generate")
 async def generate_public_session(
     session_request: dict,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
@@ -341,15 +380,17 @@ async def generate_public_session(
         
         temp_preferences = TempPreferences()
         
-        # Generate session using the session generator
+        # Generate the session in memory: guest sessions are never stored
         session_generator = SessionGenerator(db)
-        session = await session_generator.generate_session(temp_preferences)
+        session = await session_generator.generate_ephemeral_session(temp_preferences)
         
         if not session:
             raise HTTPException(
                 status_code=500,
                 detail="Failed to generate session with provided preferences"
             )
+        if SESSION_DEBUG_HEADERS:
+            response.headers[DEBUG_HEADER] = session_generator.metrics.header_value()
         
         # Format response for frontend
         session_response = format_session_for_frontend(session, db, None) # Pass None for user_id in guest mode
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+pregenerate_sessions.py
+Generate a fresh training session for every user with saved session preferences.
+
+Meant to run nightly so users open the app to a new session. Reports throughput in users/second.
+
+Ex:
+python scripts/pregenerate_sessions.py --workers 4 --chunk-size 500
+python scripts/pregenerate_sessions.py --user-ids 12 15 40
+"""
+
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from db import SessionLocal
+from services.batch_session_generator import BatchSessionGenerator
+from config import get_logger
+
+logger = get_logger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate training sessions in bulk")
+    parser.add_argument("--user-ids", type=int, nargs="+", help="Only generate for these users (default: all users with preferences)")
+    parser.add_argument("--chunk-size", type=int, default=BatchSessionGenerator.CHUNK_SIZE, help="Users per fetch/write chunk")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 1 = no pool)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = BatchSessionGenerator(db, chunk_size=args.chunk_size, workers=args.workers).run(args.user_ids)
+    finally:
+        db.close()
+
+    print(f"Generated {result.users} sessions ({result.drills} drills) in {result.elapsed_seconds:.2f}s "
+          f"- {result.users_per_second:.1f} users/s")
+
+
+if __name__ == "__main__":
+    main()
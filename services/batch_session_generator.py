@@ -0,0 +1,249 @@
+"""
+batch_session_generator.py
+Nightly pre-generation of training sessions for many users at once.
+
+SessionGenerator.generate_session handles one user per call with several
+commits. BatchSessionGenerator streams SessionPreferences rows through a
+server-side cursor, selects drills for each chunk of users in a process pool
+(every worker holds its own copy of the catalog snapshot), and writes each
+chunk's TrainingSession / OrderedSessionDrill rows with bulk statements in a
+single commit.
+
+Usage:
+    result = BatchSessionGenerator(db, workers=4).run()          # every user with preferences
+    result = BatchSessionGenerator(db).run(user_ids=[1, 2, 3])   # selected users
+    logger.info(f"{result.users_per_second:.1f} users/s")
+
+See scripts/pregenerate_sessions.py for the command line entry point.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from models import SessionPreferences, TrainingSession, OrderedSessionDrill
+from services.drill_catalog import DrillCatalog, DrillCatalogSnapshot, drill_catalog
+from services.session_generator import SessionGenerator
+from config import get_logger
+
+logger = get_logger(__name__)
+
+# SessionPreferences columns needed to generate a session
+PREFERENCE_COLUMNS = (
+    "user_id",
+    "duration",
+    "available_equipment",
+    "training_style",
+    "training_location",
+    "difficulty",
+    "target_skills",
+    "recent_drill_uuids",
+)
+
+
+@dataclass
+class SessionPlan:
+    """Drills selected for one user, ready to be written"""
+    user_id: int
+    total_duration: int
+    focus_areas: list
+    drills: List[Dict]  # OrderedSessionDrill column values, session_id filled in when written
+
+
+@dataclass
+class BatchGenerationResult:
+    users: int
+    drills: int
+    chunks: int
+    elapsed_seconds: float
+
+    @property
+    def users_per_second(self) -> float:
+        return self.users / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+# Catalog snapshot of the current worker process (set by _init_worker)
+_worker_snapshot: Optional[DrillCatalogSnapshot] = None
+
+
+def _init_worker(snapshot: DrillCatalogSnapshot):
+    global _worker_snapshot
+    _worker_snapshot = snapshot
+
+
+def _plan_chunk_in_worker(rows: List[Dict]) -> List[SessionPlan]:
+    return plan_sessions(rows, _worker_snapshot)
+
+
+def plan_sessions(rows: Iterable[Dict], snapshot: DrillCatalogSnapshot) -> List[SessionPlan]:
+    """Select drills for each preferences row (a dict of PREFERENCE_COLUMNS) against the snapshot"""
+    generator = SessionGenerator(db=None)
+    plans = []
+    for row in rows:
+        # Transient instance: never added to a session
+        preferences = SessionPreferences(**row)
+        drills, total_duration = generator.select_session_drills(preferences, snapshot)
+        plans.append(SessionPlan(
+            user_id=row["user_id"],
+            total_duration=total_duration,
+            focus_areas=row["target_skills"],
+            drills=generator.ordered_drill_rows(drills)
+        ))
+    return plans
+
+
+class BatchSessionGenerator:
+    """Generates and stores sessions for many users, one chunk of users per transaction"""
+
+    CHUNK_SIZE = 500
+
+    def __init__(self, db: Session, catalog: DrillCatalog = None,
+                 chunk_size: int = CHUNK_SIZE, workers: Optional[int] = None):
+        """
+        Args:
+            db: Session used to write sessions (committed once per chunk)
+            catalog: Drill catalog to read the snapshot from (shared catalog by default)
+            chunk_size: Users fetched, planned and written together
+            workers: Worker processes; defaults to the CPU count, 0 or 1 plans in this process
+        """
+        self.db = db
+        self.catalog = catalog or drill_catalog
+        self.chunk_size = chunk_size
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+
+    def run(self, user_ids: Optional[List[int]] = None) -> BatchGenerationResult:
+        """
+        Generate a fresh session for every user with SessionPreferences,
+        or only for user_ids when given.
+        """
+        started = time.perf_counter()
+        snapshot = self.catalog.get_snapshot(self.db)
+        users = drills = chunks = 0
+
+        executor = None
+        if self.workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(snapshot,)
+            )
+        try:
+            for plans in self._plan_chunks(self._stream_preferences(user_ids), snapshot, executor):
+                drills += self._write_chunk(plans)
+                users += len(plans)
+                chunks += 1
+                logger.info(f"Batch generation: {users} users written ({users / (time.perf_counter() - started):.1f} users/s)")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        result = BatchGenerationResult(users=users, drills=drills, chunks=chunks,
+                                       elapsed_seconds=time.perf_counter() - started)
+        logger.info(f"Generated {result.users} sessions ({result.drills} drills) in "
+                    f"{result.elapsed_seconds:.2f}s: {result.users_per_second:.1f} users/s")
+        return result
+
+    def _stream_preferences(self, user_ids: Optional[List[int]]) -> Iterator[List[Dict]]:
+        """
+        Yield chunks of preferences rows from a server-side cursor.
+
+        The cursor runs on its own connection so the per-chunk commits of the
+        writer session do not close it. If the session is already bound to a
+        single connection (tests), that connection is shared.
+        """
+        columns = [getattr(SessionPreferences, name) for name in PREFERENCE_COLUMNS]
+        query = select(*columns).where(SessionPreferences.user_id.isnot(None)).order_by(SessionPreferences.user_id)
+        if user_ids is not None:
+            query = query.where(SessionPreferences.user_id.in_(user_ids))
+
+        bind = self.db.get_bind()
+        connection = bind.connect() if isinstance(bind, Engine) else bind
+        try:
+            result = connection.execution_options(stream_results=True, yield_per=self.chunk_size).execute(query)
+            seen = set()
+            for partition in result.partitions():
+                rows = []
+                for row in partition:
+                    # One session per user: keep the first preferences row
+                    if row.user_id in seen:
+                        continue
+                    seen.add(row.user_id)
+                    rows.append(dict(row._mapping))
+                if rows:
+                    yield rows
+        finally:
+            if connection is not bind:
+                connection.close()
+
+    def _plan_chunks(self, chunks: Iterator[List[Dict]], snapshot: DrillCatalogSnapshot,
+                     executor: Optional[ProcessPoolExecutor]) -> Iterator[List[SessionPlan]]:
+        if executor is None:
+            for rows in chunks:
+                yield plan_sessions(rows, snapshot)
+            return
+
+        for rows in chunks:
+            # Split the chunk across the workers and keep the users' order
+            step = max(1, -(-len(rows) // self.workers))
+            parts = [rows[i:i + step] for i in range(0, len(rows), step)]
+            plans = []
+            for part in executor.map(_plan_chunk_in_worker, parts):
+                plans.extend(part)
+            yield plans
+
+    def _write_chunk(self, plans: List[SessionPlan]) -> int:
+        """
+        Replace the sessions of a chunk of users with bulk statements in one transaction.
+        Returns the number of OrderedSessionDrill rows written.
+        """
+        if not plans:
+            return 0
+        db = self.db
+        user_ids = [plan.user_id for plan in plans]
+
+        # Reuse each user's existing session (generate_session keeps one per user)
+        session_ids: Dict[int, int] = {}
+        existing = db.execute(
+            select(TrainingSession.user_id, TrainingSession.id)
+            .where(TrainingSession.user_id.in_(user_ids), TrainingSession.plan_day.is_(None))
+            .order_by(TrainingSession.id)
+        )
+        for user_id, session_id in existing:
+            session_ids.setdefault(user_id, session_id)
+
+        if session_ids:
+            db.execute(
+                update(TrainingSession),
+                [
+                    {"id": session_ids[plan.user_id], "total_duration": plan.total_duration, "focus_areas": plan.focus_areas}
+                    for plan in plans if plan.user_id in session_ids
+                ]
+            )
+            db.query(OrderedSessionDrill).filter(
+                OrderedSessionDrill.session_id.in_(list(session_ids.values()))
+            ).delete(synchronize_session=False)
+
+        new_plans = [plan for plan in plans if plan.user_id not in session_ids]
+        if new_plans:
+            created = db.execute(
+                insert(TrainingSession).returning(TrainingSession.id, sort_by_parameter_order=True),
+                [
+                    {"user_id": plan.user_id, "total_duration": plan.total_duration, "focus_areas": plan.focus_areas}
+                    for plan in new_plans
+                ]
+            ).scalars().all()
+            session_ids.update(zip((plan.user_id for plan in new_plans), created))
+
+        drill_rows = [
+            {**drill, "session_id": session_ids[plan.user_id]}
+            for plan in plans
+            for drill in plan.drills
+        ]
+        if drill_rows:
+            db.execute(insert(OrderedSessionDrill), drill_rows)
+        db.commit()
+        return len(drill_rows)
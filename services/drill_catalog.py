@@ -0,0 +1,312 @@
+"""
+drill_catalog.py
+Process-wide, read-only snapshot of the default drill catalog.
+
+Default drills only change when drills/drill_importer.py runs, so instead of
+querying every Drill (and lazily loading each drill's skill focus) on every
+session generation, the catalog is loaded once with skill focus attached and
+shared by all requests. The snapshot is reloaded when the catalog version
+stored in the database changes; the version row is checked at most once per
+VERSION_CHECK_INTERVAL seconds so generation itself issues no catalog queries.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from models import Drill, DrillCatalogVersion
+from utils.vectorized_scorer import DrillFeatureMatrix
+from utils.drill_attributes import EQUIPMENT_BITS, LOCATION_BITS, STYLE_BITS, encode
+from utils.drill_index import DrillAttributeIndex
+from utils.typeahead import TypeaheadEntry, TypeaheadIndex
+from utils.drill_response import build_drill_response
+from utils.json_fragments import dumps
+from utils.http_cache import ResponseCache
+from utils.guest_showcase import GuestShowcase
+from utils.facets import FacetCache
+from config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class CatalogSkillFocus:
+    """Detached copy of a DrillSkillFocus row"""
+    category: Optional[str]
+    sub_skill: Optional[str]
+    is_primary: bool
+
+
+@dataclass
+class CatalogDrill:
+    """
+    Detached copy of a Drill row with its skill focus attached.
+
+    Exposes the same attribute names as the Drill model so DrillScorer and
+    SessionGenerator can use either. Instances are shared between requests and
+    must be treated as read-only; SessionGenerator annotates copies.
+
+    equipment_bits, location_bits and style_bits are the canonical bitmasks of
+    equipment, suitable_locations and training_styles (utils/drill_attributes.py),
+    encoded once when the drill is created. Scoring reads only the bits, but the
+    lists stay: drill responses and the session routes return them as they are
+    stored, and facet counts need the names of equipment that has no bit. The
+    three ints add a few dozen bytes per drill to the snapshot.
+    """
+    id: int
+    uuid: object
+    title: Optional[str]
+    description: Optional[str]
+    category_id: Optional[int]
+    category_name: Optional[str]
+    duration: Optional[int]
+    intensity: Optional[str]
+    training_styles: Optional[List[str]]
+    type: Optional[str]
+    sets: Optional[int]
+    reps: Optional[int]
+    rest: Optional[int]
+    equipment: Optional[List[str]]
+    suitable_locations: Optional[List[str]]
+    difficulty: Optional[str]
+    instructions: Optional[List[str]]
+    tips: Optional[List[str]]
+    common_mistakes: Optional[List[str]]
+    progression_steps: Optional[List[str]]
+    variations: Optional[List[str]]
+    video_url: Optional[str]
+    thumbnail_url: Optional[str]
+    is_custom: bool = False
+    skill_focus: Tuple[CatalogSkillFocus, ...] = field(default_factory=tuple)
+    equipment_bits: Optional[int] = None
+    location_bits: Optional[int] = None
+    style_bits: Optional[int] = None
+
+    def __post_init__(self):
+        if self.equipment_bits is None:
+            self.equipment_bits = encode(self.equipment, EQUIPMENT_BITS)
+        if self.location_bits is None:
+            self.location_bits = encode(self.suitable_locations, LOCATION_BITS)
+        if self.style_bits is None:
+            self.style_bits = encode(self.training_styles, STYLE_BITS)
+
+    @classmethod
+    def from_model(cls, drill: Drill) -> "CatalogDrill":
+        return cls(
+            id=drill.id,
+            uuid=drill.uuid,
+            title=drill.title,
+            description=drill.description,
+            category_id=drill.category_id,
+            category_name=drill.category.name if drill.category else None,
+            duration=drill.duration,
+            intensity=drill.intensity,
+            training_styles=drill.training_styles,
+            type=drill.type,
+            sets=drill.sets,
+            reps=drill.reps,
+            rest=drill.rest,
+            equipment=drill.equipment,
+            suitable_locations=drill.suitable_locations,
+            difficulty=drill.difficulty,
+            instructions=drill.instructions,
+            tips=drill.tips,
+            common_mistakes=drill.common_mistakes,
+            progression_steps=drill.progression_steps,
+            variations=drill.variations,
+            video_url=drill.video_url,
+            thumbnail_url=drill.thumbnail_url,
+            is_custom=bool(drill.is_custom),
+            skill_focus=tuple(
+                CatalogSkillFocus(
+                    category=focus.category,
+                    sub_skill=focus.sub_skill,
+                    is_primary=bool(focus.is_primary)
+                )
+                for focus in drill.skill_focus
+            )
+        )
+
+    @property
+    def primary_category(self) -> Optional[str]:
+        """Category of the primary skill focus, falling back to the drill category"""
+        for focus in self.skill_focus:
+            if focus.is_primary and focus.category:
+                return focus.category
+        return self.category_name
+
+    def response(self) -> dict:
+        """DrillResponse dict, the same as router_utils.drill_to_response gives for the Drill row"""
+        primary = next((focus for focus in self.skill_focus if focus.is_primary), None)
+        secondary = [focus for focus in self.skill_focus if not focus.is_primary]
+        return build_drill_response(self, primary, secondary)
+
+    def typeahead_entry(self) -> TypeaheadEntry:
+        return TypeaheadEntry(
+            uuid=str(self.uuid),
+            title=self.title,
+            category=self.primary_category,
+            sub_skills=tuple(focus.sub_skill for focus in self.skill_focus if focus.sub_skill)
+        )
+
+
+class DrillCatalogSnapshot:
+    """Immutable view of the catalog at one version"""
+
+    def __init__(self, version: int, drills: List[CatalogDrill]):
+        self.version = version
+        self.drills = tuple(drills)
+        self.by_uuid: Dict[str, CatalogDrill] = {str(drill.uuid): drill for drill in self.drills}
+
+    def __len__(self):
+        return len(self.drills)
+
+    def get(self, drill_uuid) -> Optional[CatalogDrill]:
+        """Look up a drill by UUID (str or uuid.UUID)"""
+        return self.by_uuid.get(str(drill_uuid))
+
+    @cached_property
+    def features(self) -> DrillFeatureMatrix:
+        """Array encoding of the catalog used by VectorizedDrillScorer, built once per snapshot"""
+        return DrillFeatureMatrix(self.drills)
+
+    @cached_property
+    def index(self) -> DrillAttributeIndex:
+        """Inverted attribute indexes used to prefilter drills before scoring"""
+        return DrillAttributeIndex(self.features)
+
+    @cached_property
+    def response_fragments(self) -> Dict[str, bytes]:
+        """Each drill's DrillResponse encoded as JSON bytes, by UUID string, for splicing into responses"""
+        return {key: dumps(drill.response()) for key, drill in self.by_uuid.items()}
+
+    def fragment(self, drill_uuid) -> Optional[bytes]:
+        """Encoded DrillResponse of a drill (str or uuid.UUID), or None if it is not in this snapshot"""
+        return self.response_fragments.get(str(drill_uuid))
+
+    @cached_property
+    def guest_showcase(self) -> GuestShowcase:
+        """Drills shown to guests, picked from this catalog version"""
+        return GuestShowcase(self.drills, self.response_fragments)
+
+    @cached_property
+    def responses(self) -> ResponseCache:
+        """Encoded bodies of catalog endpoint responses at this version (see catalog_response)"""
+        return ResponseCache()
+
+    @cached_property
+    def facets(self) -> FacetCache:
+        """Facet counts of default drill searches at this version (see services/drill_facets.py)"""
+        return FacetCache()
+
+    @cached_property
+    def typeahead(self) -> TypeaheadIndex:
+        """Prefix index over drill titles and sub-skills used by autocomplete"""
+        return TypeaheadIndex(drill.typeahead_entry() for drill in self.drills)
+
+
+def read_catalog_version(db: Session) -> int:
+    """Return the current catalog version (0 if it has never been bumped)"""
+    row = db.query(DrillCatalogVersion.version).order_by(DrillCatalogVersion.id).first()
+    return row[0] if row else 0
+
+
+def bump_catalog_version(db: Session) -> int:
+    """
+    Increment the catalog version in the caller's transaction.
+    Call this from anything that writes default drills so running servers reload their snapshot.
+    """
+    row = db.query(DrillCatalogVersion).order_by(DrillCatalogVersion.id).with_for_update().first()
+    if row is None:
+        row = DrillCatalogVersion(version=1)
+        db.add(row)
+    else:
+        row.version = (row.version or 0) + 1
+    db.flush()
+    return row.version
+
+
+class DrillCatalog:
+    """Holds the current DrillCatalogSnapshot and reloads it when the version changes"""
+
+    VERSION_CHECK_INTERVAL = 30  # seconds between catalog version checks
+
+    def __init__(self, version_check_interval: float = VERSION_CHECK_INTERVAL):
+        self.version_check_interval = version_check_interval
+        self._snapshot: Optional[DrillCatalogSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot is not None
+
+    def load(self, db: Session) -> DrillCatalogSnapshot:
+        """Load every default drill with its skill focus and category in a fixed number of queries"""
+        version = read_catalog_version(db)
+        drills = (
+            db.query(Drill)
+            .options(selectinload(Drill.skill_focus), joinedload(Drill.category))
+            .order_by(Drill.id)
+            .all()
+        )
+        snapshot = DrillCatalogSnapshot(version, [CatalogDrill.from_model(drill) for drill in drills])
+        snapshot.index  # encode and index for scoring now rather than on the first request
+        snapshot.typeahead
+        snapshot.response_fragments
+        snapshot.guest_showcase
+        with self._lock:
+            self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+        logger.info(f"Loaded drill catalog version {version} with {len(snapshot)} drills")
+        return snapshot
+
+    def set_snapshot(self, snapshot: DrillCatalogSnapshot):
+        """Install a prebuilt snapshot (e.g. a synthetic catalog in benchmarks)"""
+        with self._lock:
+            self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+
+    def get_snapshot(self, db: Session) -> DrillCatalogSnapshot:
+        """
+        Return the current snapshot, loading it on first use and reloading it
+        if the stored catalog version has changed since the last check.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.load(db)
+
+        if time.monotonic() - self._checked_at < self.version_check_interval:
+            return snapshot
+
+        with self._lock:
+            self._checked_at = time.monotonic()
+        if read_catalog_version(db) != snapshot.version:
+            return self.load(db)
+        return snapshot
+
+    def invalidate(self):
+        """Drop the snapshot so the next access reloads it"""
+        with self._lock:
+            self._snapshot = None
+            self._checked_at = 0.0
+
+
+# Shared catalog used by the API process
+drill_catalog = DrillCatalog()
+
+
+def warm_drill_catalog():
+    """Load the catalog at startup; failures are logged and loading falls back to first use"""
+    from db import SessionLocal
+    db = SessionLocal()
+    try:
+        drill_catalog.load(db)
+    except Exception as e:
+        logger.warning(f"Could not preload drill catalog, it will load on first use: {str(e)}")
+    finally:
+        db.close()
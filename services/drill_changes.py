@@ -0,0 +1,129 @@
+"""
+drill_changes.py
+Per-drill change versions behind the drill catalog delta feed.
+
+Whatever writes default drills (drills/drill_importer.py, DrillManager,
+migrate_schema.py) bumps the catalog version and then records the drills it
+actually added, changed or removed at that version with
+record_drill_changes(). Each drill keeps one DrillCatalogChange row holding
+its latest version; removed drills keep theirs as a tombstone. A client that
+stores the catalog version it last synced can then ask for only the drills
+that changed since (GET /public/drills/changes) instead of downloading the
+whole catalog.
+
+Drills that predate change tracking have no row and count as version 0, so
+they only appear in a full sync.
+"""
+
+import uuid as uuid_module
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from models import Drill, DrillCatalogChange
+from services.drill_catalog import DrillCatalog, DrillCatalogSnapshot, drill_catalog, read_catalog_version
+from utils.json_fragments import dumps
+
+STREAM_CHUNK_SIZE = 100  # feed entries per chunk of the streamed body
+
+# Drill columns that are part of what clients cache
+STATE_COLUMNS = tuple(column.key for column in Drill.__table__.columns if column.key not in ("id", "uuid"))
+
+
+@dataclass(frozen=True)
+class DrillChange:
+    """One entry of the delta feed"""
+    version: int
+    uuid: str
+    removed: bool = False
+
+
+def drill_state(drill: Drill) -> tuple:
+    """Everything about a drill a client caches, for telling whether an import changed it"""
+    skill_focus = sorted(
+        (focus.category or "", focus.sub_skill or "", bool(focus.is_primary)) for focus in drill.skill_focus
+    )
+    return tuple(getattr(drill, name) for name in STATE_COLUMNS) + (tuple(skill_focus),)
+
+
+def record_drill_changes(db: Session, version: int, changed: Iterable = (), removed: Iterable = ()) -> int:
+    """
+    Mark drills (UUIDs, str or uuid.UUID) as changed or removed at a catalog version,
+    in the caller's transaction. Call it with the version bump_catalog_version returned.
+    Returns the number of drills recorded.
+    """
+    marks = {uuid_module.UUID(str(drill_uuid)): False for drill_uuid in changed}
+    marks.update({uuid_module.UUID(str(drill_uuid)): True for drill_uuid in removed})
+    if not marks:
+        return 0
+
+    existing = {
+        row.drill_uuid: row
+        for row in db.query(DrillCatalogChange).filter(DrillCatalogChange.drill_uuid.in_(list(marks)))
+    }
+    for drill_uuid, is_removed in marks.items():
+        row = existing.get(drill_uuid)
+        if row is None:
+            db.add(DrillCatalogChange(drill_uuid=drill_uuid, version=version, removed=is_removed))
+        else:
+            row.version = version
+            row.removed = is_removed
+    db.flush()
+    return len(marks)
+
+
+def current_snapshot(db: Session, catalog: DrillCatalog = drill_catalog) -> DrillCatalogSnapshot:
+    """The catalog snapshot, reloaded now if the stored version has moved past it"""
+    snapshot = catalog.get_snapshot(db)
+    if read_catalog_version(db) != snapshot.version:
+        snapshot = catalog.load(db)
+    return snapshot
+
+
+def changes_since(db: Session, snapshot: DrillCatalogSnapshot, since: Optional[int]) -> List[DrillChange]:
+    """
+    Drills changed after version `since` up to the snapshot's version, in (version, uuid) order.
+    With since None every drill in the snapshot is returned (a full sync) and removals are left out.
+    """
+    if since is None:
+        versions = {
+            str(drill_uuid): version
+            for drill_uuid, version in db.query(DrillCatalogChange.drill_uuid, DrillCatalogChange.version)
+            .filter(DrillCatalogChange.removed.is_(False))
+        }
+        changes = [DrillChange(versions.get(key, 0), key) for key in snapshot.by_uuid]
+        return sorted(changes, key=lambda change: (change.version, change.uuid))
+
+    # UUIDs order the same as their canonical strings, so this matches the full sync order
+    rows = (
+        db.query(DrillCatalogChange.version, DrillCatalogChange.drill_uuid, DrillCatalogChange.removed)
+        .filter(DrillCatalogChange.version > since, DrillCatalogChange.version <= snapshot.version)
+        .order_by(DrillCatalogChange.version, DrillCatalogChange.drill_uuid)
+        .all()
+    )
+    return [DrillChange(version, str(drill_uuid), bool(removed)) for version, drill_uuid, removed in rows]
+
+
+def encode_changes(snapshot: DrillCatalogSnapshot, since: Optional[int], changes: List[DrillChange],
+                   chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    The delta feed body as JSON chunks:
+    {"version", "since", "full", "count", "changes": [{"uuid", "version", "removed", "drill"}, ...]}.
+    Changed drills carry the snapshot's pre-encoded DrillResponse; removed ones have "drill": null.
+    """
+    entries = []
+    for change in changes:
+        head = dumps({"uuid": change.uuid, "version": change.version, "removed": change.removed})[:-1]
+        if change.removed:
+            entries.append(head + b',"drill":null}')
+            continue
+        fragment = snapshot.fragment(change.uuid)
+        if fragment is not None:  # skip change rows for drills the snapshot does not have
+            entries.append(head + b',"drill":' + fragment + b"}")
+
+    header = {"version": snapshot.version, "since": since, "full": since is None, "count": len(entries)}
+    yield dumps(header)[:-1] + b',"changes":['
+    for start in range(0, len(entries), chunk_size):
+        yield (b"," if start else b"") + b",".join(entries[start:start + chunk_size])
+    yield b"]}"
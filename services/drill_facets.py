@@ -0,0 +1,60 @@
+"""
+drill_facets.py
+Facet counts for the drill search endpoints (include_facets=true).
+
+Counts cover every result of the search, not just the current page. Default
+drills are counted from the catalog snapshot: one query returns the UUIDs
+matching the search and the tally runs over the in-memory drills. The result
+is cached on the snapshot per (query, category, difficulty), so repeated
+searches cost no SQL until the catalog version changes. A user's custom
+drills change outside the catalog version, so they are counted on every
+request, from a single query that reads only the facet columns.
+"""
+
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Query
+
+from models import CustomDrill, Drill
+from services.drill_catalog import DrillCatalogSnapshot
+from utils.facets import FacetCounts
+from utils.skill_mapper import map_frontend_category_to_backend
+
+
+def facet_key(query: str, category: Optional[str], difficulty: Optional[str]) -> Tuple:
+    """Cache key of a search; text and difficulty match case-insensitively, so they are normalised"""
+    return (
+        " ".join((query or "").lower().split()),
+        map_frontend_category_to_backend(category) if category else None,
+        difficulty.lower() if difficulty else None,
+    )
+
+
+def count_catalog_drills(drills: Iterable) -> FacetCounts:
+    counts = FacetCounts()
+    for drill in drills:
+        counts.add_catalog_drill(drill)
+    return counts
+
+
+def default_drill_facets(snapshot: DrillCatalogSnapshot, default_query: Query, key: Tuple) -> FacetCounts:
+    """
+    Facet counts of the default drills a filtered Drill query matches, cached on the snapshot.
+    Drills added since the snapshot loaded are not counted until it reloads.
+    """
+    counts = snapshot.facets.get(key)
+    if counts is None:
+        uuids = [drill_uuid for (drill_uuid,) in default_query.with_entities(Drill.uuid)]
+        counts = count_catalog_drills(filter(None, (snapshot.get(drill_uuid) for drill_uuid in uuids)))
+        snapshot.facets.put(key, counts)
+    return counts
+
+
+def custom_drill_facets(custom_query: Query) -> FacetCounts:
+    """Facet counts of the custom drills a filtered CustomDrill query matches (category is the primary skill's)"""
+    counts = FacetCounts()
+    rows = custom_query.with_entities(CustomDrill.primary_skill, CustomDrill.difficulty, CustomDrill.equipment)
+    for primary_skill, difficulty, equipment in rows:
+        category = primary_skill.get("category") if isinstance(primary_skill, dict) else None
+        counts.add(category, difficulty, equipment)
+    return counts
@@ -0,0 +1,117 @@
+"""
+drill_pagination.py
+Keyset (cursor) pagination for drill listing and search.
+
+Offset pagination re-reads and discards every row before the requested page
+and needs a full count for the page total. Keyset pagination orders rows by
+(title, uuid) and asks only for rows after the last one served, so every page
+costs the same. The position is returned to clients as an opaque cursor
+(url-safe base64 JSON); pass it back unchanged to get the next page.
+
+Several queries (default drills and a user's custom drills) can be paged as one
+result set: each is read past the cursor with the same key and the rows are
+merged in Python. Titles are compared bytewise (COLLATE "C" on PostgreSQL, the
+SQLite default), which matches Python string ordering, and UUIDs compare the
+same as their canonical strings, so the merge agrees with the database order.
+"""
+
+import base64
+import json
+import uuid as uuid_module
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, literal, tuple_
+from sqlalchemy.orm import Query, Session
+
+
+# Indexes matching the keyset order, so each page is an index range scan (PostgreSQL)
+KEYSET_INDEX_DDL = [
+    'CREATE INDEX IF NOT EXISTS idx_drills_title_uuid ON drills ((coalesce(title, \'\') COLLATE "C"), uuid)',
+    'CREATE INDEX IF NOT EXISTS idx_custom_drills_user_title_uuid '
+    'ON custom_drills (user_id, (coalesce(title, \'\') COLLATE "C"), uuid)',
+]
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor was not produced by encode_cursor"""
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position after the last row served: its (title, uuid) key and the rows served so far"""
+    title: str = ""
+    uuid: Optional[str] = None
+    served: int = 0
+
+    @property
+    def is_start(self) -> bool:
+        return self.uuid is None
+
+
+@dataclass
+class KeysetPage:
+    rows: list
+    next_cursor: Optional[str]  # None on the last page
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+def sort_key(row) -> Tuple[str, str]:
+    return row.title or "", str(row.uuid)
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    payload = json.dumps([cursor.title, cursor.uuid, cursor.served], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(value: Optional[str]) -> Cursor:
+    """Cursor for an encoded value; an empty value is the start of the result set"""
+    if not value:
+        return Cursor()
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        title, drill_uuid, served = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return Cursor(title=str(title), uuid=str(uuid_module.UUID(drill_uuid)), served=max(int(served), 0))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {value}") from e
+
+
+def title_order(title_column, db: Session):
+    """Bytewise, NULL-safe sort expression for a title column"""
+    title = func.coalesce(title_column, "")
+    if db.get_bind().dialect.name == "postgresql":
+        return title.collate("C")
+    return title
+
+
+def after_cursor(query: Query, model, db: Session, cursor: Cursor) -> Query:
+    """Order query by (title, uuid) and keep only rows after the cursor"""
+    title = title_order(model.title, db)
+    if not cursor.is_start:
+        drill_uuid = uuid_module.UUID(cursor.uuid)
+        # Row comparison, so PostgreSQL can start an index range scan at the cursor
+        position = tuple_(literal(cursor.title), literal(drill_uuid, model.uuid.type))
+        query = query.filter(tuple_(title, model.uuid) > position)
+    return query.order_by(title, model.uuid)
+
+
+def keyset_page(db: Session, queries: Sequence[Tuple[Query, object]], cursor: Cursor, limit: int) -> KeysetPage:
+    """
+    Next `limit` rows after cursor across (query, model) pairs merged by (title, uuid).
+    Reads at most limit + 1 rows from each query.
+    """
+    rows: List = []
+    for query, model in queries:
+        rows.extend(after_cursor(query, model, db, cursor).limit(limit + 1).all())
+    rows.sort(key=sort_key)
+
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and page:
+        title, last_uuid = sort_key(page[-1])
+        next_cursor = encode_cursor(Cursor(title=title, uuid=last_uuid, served=cursor.served + len(page)))
+    return KeysetPage(rows=page, next_cursor=next_cursor)
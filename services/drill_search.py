@@ -0,0 +1,173 @@
+"""
+drill_search.py
+Full-text search over drill and custom drill text.
+
+On PostgreSQL, drills and custom_drills carry a generated `search_vector`
+tsvector column (title weighted A, description B, instructions and tips C)
+with a GIN index, created by migrate_database.py from search_vector_ddl(). The
+column lives only in the database, not in models.py, so SQLite test schemas
+are unaffected. Searches match every word of the query as a prefix
+("drib pass" finds "Dribbling ... passes") and rank results by ts_rank.
+
+Where the column is missing (SQLite, or PostgreSQL before the migration ran)
+the same helpers fall back to the previous ilike match on title and
+description, unranked.
+
+merged_search pages default drills and a user's custom drills together as
+one UNION ALL, so ordering, pagination and the total all happen in one
+statement.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import JSON, String, cast, desc, func, inspect, literal, literal_column, null, or_, select, union_all
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Query, Session
+
+from models import CustomDrill, Drill
+from services.drill_pagination import title_order
+from config import get_logger
+
+logger = get_logger(__name__)
+
+SEARCH_CONFIG = "english"
+SEARCH_COLUMN = "search_vector"
+SEARCH_TABLES = ("drills", "custom_drills")
+
+# instructions and tips are JSON lists; their text form is close enough for matching
+SEARCH_VECTOR_EXPRESSION = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+    f"coalesce(instructions::text, '') || ' ' || coalesce(tips::text, '')), 'C')"
+)
+
+# Columns Drill and CustomDrill share, projected by merged_search
+MERGED_COLUMNS = (
+    "uuid", "title", "description", "type", "duration", "sets", "reps", "rest", "equipment",
+    "suitable_locations", "intensity", "training_styles", "difficulty", "instructions", "tips",
+    "common_mistakes", "progression_steps", "variations", "video_url", "thumbnail_url", "is_custom",
+)
+
+# Engines already checked for the search_vector column: {engine url: has column}
+_full_text_support = {}
+
+
+def search_vector_ddl(table: str) -> List[str]:
+    """Statements adding the generated search column and its GIN index to a table"""
+    return [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {SEARCH_COLUMN} tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED",
+        f"CREATE INDEX IF NOT EXISTS idx_{table}_{SEARCH_COLUMN} ON {table} USING GIN ({SEARCH_COLUMN})",
+    ]
+
+
+def prefix_query(text: str) -> Optional[str]:
+    """
+    to_tsquery input matching every word of text as a prefix, e.g. "drib pass" -> "drib:* & pass:*".
+    None if text has no words.
+    """
+    words = re.findall(r"\w+", (text or "").lower())
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def supports_full_text(db: Session) -> bool:
+    """True if the database is PostgreSQL and drills already has the search column"""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return False
+    key = str(bind.engine.url)
+    if key not in _full_text_support:
+        try:
+            columns = {column["name"] for column in inspect(bind).get_columns("drills")}
+            _full_text_support[key] = SEARCH_COLUMN in columns
+        except Exception as e:
+            logger.warning(f"Could not inspect drills for full-text search: {e}")
+            return False
+        if not _full_text_support[key]:
+            logger.warning("drills.search_vector is missing; run migrate_database.py. Falling back to ilike search")
+    return _full_text_support[key]
+
+
+def _search_vector(model):
+    return literal_column(f"{model.__tablename__}.{SEARCH_COLUMN}", type_=TSVECTOR)
+
+
+def _ts_query(terms: str):
+    return func.to_tsquery(SEARCH_CONFIG, terms)
+
+
+def apply_text_search(query: Query, model, text: str, full_text: bool) -> Query:
+    """
+    Filter query (over Drill or CustomDrill) to rows matching text.
+    With full_text the match uses the search column; results are not ordered (see order_by_rank).
+    """
+    terms = prefix_query(text) if full_text else None
+    if terms is None:
+        return query.filter(or_(model.title.ilike(f"%{text}%"), model.description.ilike(f"%{text}%")))
+    return query.filter(_search_vector(model).op("@@")(_ts_query(terms)))
+
+
+def rank_expression(model, text: str, full_text: bool):
+    """ts_rank of model rows for text, or None when results cannot be ranked"""
+    terms = prefix_query(text) if full_text and text else None
+    if terms is None:
+        return None
+    return func.ts_rank(_search_vector(model), _ts_query(terms))
+
+
+def order_by_rank(query: Query, model, text: str, full_text: bool) -> Query:
+    """
+    Order a query filtered by apply_text_search by relevance, best first (ties by id).
+    Left unchanged when full-text search is not available.
+    """
+    rank = rank_expression(model, text, full_text)
+    if rank is None:
+        return query
+    return query.order_by(desc(rank), model.id)
+
+
+def _projection(model, source: str, primary_skill, rank) -> list:
+    columns = [cast(literal(source), String).label("source")]
+    columns += [getattr(model, name).label(name) for name in MERGED_COLUMNS]
+    columns.append(primary_skill.label("primary_skill"))
+    if rank is not None:
+        columns.append(rank.label("rank"))
+    return columns
+
+
+def merged_search(db: Session, default_query: Query, custom_query: Query, text: str, full_text: bool,
+                  offset: int, limit: int) -> Tuple[list, int]:
+    """
+    One page of filtered Drill and CustomDrill queries as a single UNION ALL.
+
+    Rows carry the MERGED_COLUMNS plus `source` ("default" or "custom") and
+    `primary_skill` (custom drills only). They are ordered in the database by
+    relevance when full-text search is available, then by (title, uuid), and
+    the total comes from a window count in the same statement. Returns
+    (rows, total); only a page past the end needs a separate count.
+    """
+    default_rank = rank_expression(Drill, text, full_text)
+    custom_rank = rank_expression(CustomDrill, text, full_text)
+    merged = union_all(
+        default_query.with_entities(*_projection(Drill, "default", cast(null(), JSON), default_rank)).statement,
+        custom_query.with_entities(
+            *_projection(CustomDrill, "custom", CustomDrill.primary_skill, custom_rank)
+        ).statement,
+    ).subquery("merged")
+
+    order = [merged.c.rank.desc()] if default_rank is not None else []
+    order += [title_order(merged.c.title, db), merged.c.uuid]
+    rows = db.execute(
+        select(merged, func.count().over().label("total_count"))
+        .order_by(*order)
+        .offset(offset)
+        .limit(limit)
+    ).all()
+    if rows:
+        return rows, rows[0].total_count
+    total = db.execute(select(func.count()).select_from(merged)).scalar() if offset else 0
+    return rows, total
@@ -0,0 +1,100 @@
+"""
+drill_typeahead.py
+Autocomplete over the drill catalog merged with a user's custom drills.
+
+Default drills are served from the catalog snapshot's prefix index
+(DrillCatalogSnapshot.typeahead), built when the catalog loads. Custom drills
+belong to one user and change through the custom drill endpoints, so each
+user's titles are indexed on first use and kept in a bounded LRU.
+Create/update/delete call invalidate(); entries also expire after
+CustomDrillTypeahead.TTL seconds so other worker processes pick up changes. A
+keystroke therefore only queries the database when the user's custom drills
+are not cached.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Tuple
+
+from sqlalchemy.orm import Session
+
+from models import CustomDrill
+from services.drill_catalog import DrillCatalog, drill_catalog
+from utils.typeahead import TypeaheadEntry, TypeaheadIndex, search_indexes
+from config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_LIMIT = 10
+
+
+def custom_drill_entry(uuid, title, primary_skill) -> TypeaheadEntry:
+    skill = primary_skill if isinstance(primary_skill, dict) else {}
+    return TypeaheadEntry(
+        uuid=str(uuid),
+        title=title,
+        category=skill.get("category"),
+        is_custom=True,
+        sub_skills=(skill["sub_skill"],) if skill.get("sub_skill") else ()
+    )
+
+
+class CustomDrillTypeahead:
+    """Thread-safe LRU of per-user TypeaheadIndex over custom drill titles"""
+
+    MAX_USERS = 1000
+    TTL = 300  # seconds before a user's index is rebuilt even without invalidation
+
+    def __init__(self, max_users: int = MAX_USERS, ttl: float = TTL):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[float, TypeaheadIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, db: Session, user_id: int) -> TypeaheadIndex:
+        """Return the user's custom drill index, loading it from the database if needed"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(user_id)
+            if cached is not None and now - cached[0] < self.ttl:
+                self._entries.move_to_end(user_id)
+                return cached[1]
+
+        rows = (
+            db.query(CustomDrill.uuid, CustomDrill.title, CustomDrill.primary_skill)
+            .filter(CustomDrill.user_id == user_id)
+            .all()
+        )
+        index = TypeaheadIndex(custom_drill_entry(*row) for row in rows)
+
+        with self._lock:
+            self._entries[user_id] = (now, index)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+        return index
+
+    def invalidate(self, user_id: int):
+        """Drop a user's index after their custom drills change"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared per-user index cache used by the API process
+custom_drill_typeahead = CustomDrillTypeahead()
+
+
+def autocomplete(db: Session, user_id: int, query: str, limit: int = DEFAULT_LIMIT,
+                 catalog: DrillCatalog = drill_catalog,
+                 custom: CustomDrillTypeahead = custom_drill_typeahead) -> List[TypeaheadEntry]:
+    """Best `limit` default and custom drills matching query, best first"""
+    indexes = [catalog.get_snapshot(db).typeahead, custom.get(db, user_id)]
+    return search_indexes(indexes, query, limit)
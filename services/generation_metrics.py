@@ -0,0 +1,137 @@
+"""
+generation_metrics.py
+Structured per-generation timing and counts for SessionGenerator.
+
+Every generated session produces one GenerationMetrics record: seconds spent per
+stage (catalog, score, select, balance, adjust, persist) and counts such as drills
+scored, pool size, queries issued and rows written. Records are handed to a
+metrics sink (logged by default) and can be echoed in a response debug header
+(see SESSION_DEBUG_HEADERS in config.py).
+"""
+
+import json
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import get_logger
+
+logger = get_logger(__name__)
+
+# Response header carrying GenerationMetrics.header_value()
+DEBUG_HEADER = "X-Session-Generation-Metrics"
+
+
+@dataclass
+class GenerationMetrics:
+    """Timing and counts for one session generation"""
+    mode: str = "persisted"                 # "persisted" or "ephemeral"
+    stages: Dict[str, float] = field(default_factory=dict)  # seconds per stage, in pipeline order
+    total_seconds: float = 0.0
+    catalog_size: int = 0
+    drills_scored: int = 0                  # 0 when the scores came from the score cache
+    score_cache_hit: bool = False
+    pool_size: int = 0
+    drills_selected: int = 0
+    drills_in_session: int = 0
+    queries: int = 0
+    rows_written: int = 0
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+    def header_value(self) -> str:
+        """Compact "key=value;..." form for a response header (times in ms)"""
+        parts = [f"{stage}={seconds * 1e3:.2f}ms" for stage, seconds in self.stages.items()]
+        parts.append(f"total={self.total_seconds * 1e3:.2f}ms")
+        parts += [
+            f"drills_scored={self.drills_scored}",
+            f"cache_hit={int(self.score_cache_hit)}",
+            f"pool={self.pool_size}",
+            f"queries={self.queries}",
+            f"rows_written={self.rows_written}",
+        ]
+        return ";".join(parts)
+
+    def __str__(self):
+        return json.dumps(self.as_dict(), separators=(",", ":"))
+
+
+class MetricsSink(ABC):
+    """Receives one GenerationMetrics record per generated session"""
+
+    @abstractmethod
+    def emit(self, metrics: GenerationMetrics):
+        ...
+
+
+class LoggingMetricsSink(MetricsSink):
+    """Logs each record as one JSON line (formatted only if INFO is enabled)"""
+
+    def emit(self, metrics: GenerationMetrics):
+        logger.info("session_generation %s", metrics)
+
+
+class InMemoryMetricsSink(MetricsSink):
+    """Keeps the most recent records, e.g. for tests or a debug view"""
+
+    def __init__(self, max_records: int = 1000):
+        self._records: Deque[GenerationMetrics] = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    def emit(self, metrics: GenerationMetrics):
+        with self._lock:
+            self._records.append(metrics)
+
+    @property
+    def records(self) -> List[GenerationMetrics]:
+        with self._lock:
+            return list(self._records)
+
+
+# Sink used by SessionGenerator unless one is passed in
+metrics_sink: MetricsSink = LoggingMetricsSink()
+
+
+class QueryCounter:
+    """Number of statements executed on one connection"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+@contextmanager
+def count_queries(db: Optional[Session]):
+    """
+    Count statements the session executes inside the block.
+    Listens on each connection the session uses, including ones it checks out
+    again after a commit, so other requests are not counted.
+    """
+    counter = QueryCounter()
+    if db is None:
+        yield counter
+        return
+    connections = []
+
+    def attach(session, transaction, connection):
+        if connection not in connections:
+            event.listen(connection, "before_cursor_execute", counter)
+            connections.append(connection)
+
+    attach(db, None, db.connection())
+    event.listen(db, "after_begin", attach)
+    try:
+        yield counter
+    finally:
+        event.remove(db, "after_begin", attach)
+        for connection in connections:
+            event.remove(connection, "before_cursor_execute", counter)
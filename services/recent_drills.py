@@ -0,0 +1,52 @@
+"""
+recent_drills.py
+Per-user ring of recently completed drills.
+
+Completed sessions keep their drills inside the CompletedSession.drills JSON,
+which cannot be read without scanning a user's whole history. Instead, every
+completed session pushes the UUIDs of its completed drills into a bounded ring
+stored on the user's SessionPreferences row (recent_drill_uuids, oldest first).
+Generation already loads that row, so the ring costs no extra query there:
+CompiledPreferences turns it into a set and DrillScorer subtracts a penalty
+from the score of any drill in it.
+"""
+
+from typing import Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from models import SessionPreferences
+from config import get_logger
+
+logger = get_logger(__name__)
+
+# Most recent completed drills remembered per user
+RECENT_DRILLS_LIMIT = 30
+
+
+def push_recent_drills(ring: Optional[List[str]], drill_uuids: Iterable[str],
+                       limit: int = RECENT_DRILLS_LIMIT) -> List[str]:
+    """
+    Return the ring with drill_uuids appended as the most recent entries.
+    A drill already in the ring moves to the end; the oldest entries fall off past limit.
+    """
+    added = list(dict.fromkeys(str(uuid) for uuid in drill_uuids if uuid))
+    if not added:
+        return list(ring or [])
+    seen = set(added)
+    kept = [uuid for uuid in ring or [] if uuid not in seen]
+    return (kept + added)[-limit:]
+
+
+def record_completed_drills(db: Session, user_id: int, drill_uuids: Iterable[str]) -> Optional[List[str]]:
+    """
+    Push completed drills into the user's ring in the caller's transaction.
+    Users without session preferences have no ring yet; nothing is recorded for them.
+    """
+    preferences = db.query(SessionPreferences).filter(SessionPreferences.user_id == user_id).first()
+    if preferences is None:
+        return None
+    ring = push_recent_drills(preferences.recent_drill_uuids, drill_uuids)
+    if ring != (preferences.recent_drill_uuids or []):
+        preferences.recent_drill_uuids = ring
+    return ring
@@ -0,0 +1,116 @@
+"""
+score_cache.py
+Bounded LRU of pre-jitter drill scores keyed by preference fingerprint.
+
+Many users share the same preferences (especially right after onboarding), and
+scores before jitter depend only on the preferences and the catalog. The cache
+keeps the candidate feature matrix and the weighted component scores for recent
+fingerprints so repeated generations skip prefiltering and scoring; jitter and
+skill balancing still run per request, so sessions keep varying. Entries belong
+to one catalog snapshot and are dropped as soon as a different snapshot is used.
+
+An entry's size grows with the number of candidate drills it covers (up to the
+whole catalog), so the cache is bounded by the total candidate rows it holds as
+well as by entry count; see ScoreCache.MAX_ROWS.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Optional
+
+import numpy as np
+
+from utils.vectorized_scorer import DrillFeatureMatrix
+from config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedScores:
+    """Candidate drills and their weighted (pre-jitter) component scores"""
+    features: DrillFeatureMatrix
+    components: Dict[str, np.ndarray]
+
+
+class ScoreCache:
+    """Thread-safe LRU of CachedScores with hit/miss counters"""
+
+    MAX_ENTRIES = 256
+    # A candidate row costs about 150 bytes (its feature columns plus one float64 per
+    # score component), so the row budget keeps a worker's cache near 15 MB: 10
+    # full-catalog entries at 10,000 drills, many more once prefiltering narrows them.
+    MAX_ROWS = 100_000
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_rows: int = MAX_ROWS):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, CachedScores]" = OrderedDict()
+        self._rows = 0
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, snapshot, fingerprint: Hashable, compute: Callable[[], CachedScores]) -> CachedScores:
+        """
+        Return the cached scores for fingerprint under this catalog snapshot,
+        calling compute() and storing the result on a miss.
+        """
+        with self._lock:
+            if snapshot is not self._snapshot:
+                # Catalog changed: every cached score is stale
+                self._entries.clear()
+                self._rows = 0
+                self._snapshot = snapshot
+            entry = self._entries.get(fingerprint)
+            if entry is not None:
+                self._entries.move_to_end(fingerprint)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = compute()
+
+        with self._lock:
+            if snapshot is self._snapshot and entry.features.size <= self.max_rows:
+                previous = self._entries.pop(fingerprint, None)
+                if previous is not None:
+                    self._rows -= previous.features.size
+                self._entries[fingerprint] = entry
+                self._rows += entry.features.size
+                while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._rows -= evicted.features.size
+        return entry
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+            self._snapshot = None
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """Hit/miss counters, current size and rows held"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "rows": self._rows,
+                "max_rows": self.max_rows,
+            }
+
+
+# Shared cache used by the API process
+score_cache = ScoreCache()
@@ -7,13 +7,18 @@ equipment availability, and skill level.
 
 Key features:
 - Smart drill selection based on multiple criteria
-- Duration adjustment to fit session constraints
+- Drill and duration fitting within the session length
 - Equipment availability validation
 - Skill relevance scoring
 - Intensity modification based on player level
 """
 
+import copy
+import time
+import numpy as np
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from models import (
     Drill, 
     TrainingSession, 
@@ -23,8 +28,12 @@ from models import (
     Difficulty,
     OrderedSessionDrill
 )
-from typing import List, Dict
-from utils.drill_scorer import DrillScorer
+from typing import List, Dict, Optional, Tuple, Union
+from utils.vectorized_scorer import VectorizedDrillScorer
+from utils.duration_fitter import DrillSlot, fit_durations
+from services.drill_catalog import DrillCatalog, DrillCatalogSnapshot, drill_catalog
+from services.score_cache import CachedScores, ScoreCache, score_cache
+from services.generation_metrics import GenerationMetrics, MetricsSink, count_queries, metrics_sink as default_metrics_sink
 from config import get_logger
 
 logger = get_logger(__name__)
@@ -49,9 +58,25 @@ class SessionGenerator:
         120: 7,
     }
 
-    def __init__(self, db: Session):
-        """Initialize the session generator with a database connection."""
+    def __init__(self, db: Session, catalog: DrillCatalog = None, cache: ScoreCache = None,
+                 rng: Union[int, np.random.Generator, None] = None, metrics_sink: MetricsSink = None):
+        """
+        Initialize the session generator with a database connection.
+
+        Drills are read from the shared in-memory catalog (services.drill_catalog)
+        and scores are memoized in the shared services.score_cache, unless a
+        different catalog or cache is passed in. Pass a seed (or numpy Generator)
+        as rng to make score jitter, and therefore generated sessions, reproducible.
+        A GenerationMetrics record of every generation goes to metrics_sink
+        (services.generation_metrics.metrics_sink by default).
+        """
         self.db = db
+        self.catalog = catalog or drill_catalog
+        self.score_cache = cache if cache is not None else score_cache
+        self.rng = np.random.default_rng(rng)
+        self.metrics_sink = metrics_sink or default_metrics_sink
+        # Timings and counts of the last generation
+        self.metrics = GenerationMetrics()
         self.ADAPTABLE_EQUIPMENT = {"CONES", "WALL"}  # Can use household items instead
         self.CRITICAL_EQUIPMENT = {"GOALS", "BALL"}   # Essential equipment
         self.BASIC_SKILLS = {"passing", "shooting", "first_touch", "dribbling", "defending", "goalkeeping", "fitness"}  # Core skills including goalkeeping and fitness
@@ -67,138 +92,351 @@ class SessionGenerator:
             A TrainingSession object containing selected and adjusted drills.
             
         The generation process involves:
-        1. Retrieving and scoring all available drills
+        1. Scoring all drills in the in-memory catalog
         2. Creating a larger pool of top-ranked drills
         3. Balancing drill selection to match user's skill preferences proportionally
-        4. Adjusting drill durations to fit session constraints
-        5. Normalizing the overall session duration
+        4. Choosing which drills to keep and their durations in one pass (_fit_session,
+           utils/duration_fitter.fit_durations), for the best total score within the session duration
+        5. Saving the session and its drills in a single transaction
         """
-        # Get and rank all available drills
-        all_drills = self.db.query(Drill).all()
-        logger.info(f"\nFound {len(all_drills)} total drills")
+        generation_started = time.perf_counter()
+        self.metrics = GenerationMetrics(mode="persisted")
+        with count_queries(self.db) as queries:
+            # Get all available drills from the catalog snapshot (no per-request drill queries)
+            catalog = self.catalog.get_snapshot(self.db)
+            started = self._record_stage("catalog", generation_started)
+            suitable_drills, current_duration = self.select_session_drills(preferences, catalog)
 
-        scorer = DrillScorer(preferences)
-        ranked_drills = scorer.rank_drills(all_drills)
-        
-        # Determine max drills for this session duration
-        max_drills = self.DURATION_TO_MAX_DRILLS.get(preferences.duration, 4)
-        
-        # Create a larger pool for skill balancing (4-5x the target number)
-        pool_size = min(len(ranked_drills), max_drills * 5)
-        drill_pool = ranked_drills[:pool_size]
-        
-        logger.info(f"Created drill pool of {pool_size} drills from {len(ranked_drills)} total ranked drills")
-        
-        # Balance drill selection based on user's skill preferences
-        selected_drills = self._balance_drill_selection_by_skills(drill_pool, max_drills, preferences)
-        
-        logger.info(f"Selected {len(selected_drills)} balanced drills for session")
+            # Replace the user's current session in a single transaction
+            started = time.perf_counter()
+            session = self._save_session(preferences, suitable_drills, current_duration)
+            self._record_stage("persist", started)
 
-        suitable_drills = []
-        current_duration = 0
-        has_limited_equipment = len(preferences.available_equipment) <= 1
+        self._emit_metrics(generation_started, queries.count)
+        # Return the session with all per-session drill data attached
+        return session
 
-        # Process the balanced selection of drills
-        for ranked_drill in selected_drills:
-            drill = ranked_drill['drill']
-            scores = ranked_drill['scores']
-            
-            logger.info(f"\nProcessing drill: {drill.title}")
-            logger.info(f"Score: {ranked_drill['total_score']:.2f}")
-            logger.info(f"Primary skill: {self._get_drill_primary_skill(drill)}")
-
-            # Adjust drill duration based on session constraints
-            adjusted_duration = self._adjust_drill_duration(
-                drill, 
-                preferences.duration,
-                current_duration,
-                len(suitable_drills),
-                has_limited_equipment
+    def _save_session(self, preferences: SessionPreferences, drills: List, total_duration: int) -> TrainingSession:
+        """
+        Persist a generated session in one transaction.
+
+        The user's existing session (if any) is updated in place with UPDATE ... RETURNING,
+        its old OrderedSessionDrill rows are removed with one bulk DELETE, and the new rows
+        are written with one multi-row INSERT ... RETURNING, so an existing user costs three
+        statements and a single commit. Without a user_id a standalone session is created.
+        """
+        session = None
+        if preferences.user_id:
+            # At most one session per user is reused (the oldest, as before)
+            current_session_id = (
+                select(func.min(TrainingSession.id))
+                .where(TrainingSession.user_id == preferences.user_id, TrainingSession.plan_day.is_(None))
+                .scalar_subquery()
             )
+            session = self.db.scalars(
+                update(TrainingSession)
+                .where(TrainingSession.id == current_session_id)
+                .values(total_duration=total_duration, focus_areas=preferences.target_skills)
+                .returning(TrainingSession)
+                .execution_options(synchronize_session=False)
+            ).one_or_none()
 
-            logger.info(f"Original duration: {drill.duration} minutes")
-            logger.info(f"Adjusted duration: {adjusted_duration} minutes")
+        if session is not None:
+            logger.info(f"Updating existing session for user: {preferences.user_id}")
+            # Remove old OrderedSessionDrills for this session (so we can add the new ones)
+            self.db.execute(
+                delete(OrderedSessionDrill)
+                .where(OrderedSessionDrill.session_id == session.id)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            if preferences.user_id:
+                logger.info(f"Creating new session for user: {preferences.user_id}")
+            session = TrainingSession(
+                total_duration=total_duration,
+                focus_areas=preferences.target_skills,
+                user_id=preferences.user_id
+            )
+            self.db.add(session)
+            self.db.flush()
 
-            # Store drill adjustments
-            drill.adjusted_duration = adjusted_duration
-            drill.intensity_modifier = self._calculate_intensity_modifier(preferences.difficulty, drill.difficulty)
-            drill.original_duration = drill.duration if drill.duration is not None else adjusted_duration
+        ordered_drills = []
+        rows = self.ordered_drill_rows(drills, session.id)
+        if rows:
+            ordered_drills = self.db.scalars(insert(OrderedSessionDrill).returning(OrderedSessionDrill), rows).all()
+            ordered_drills = sorted(ordered_drills, key=lambda osd: osd.position)
+        # Attach the ordered drills to the session without another flush
+        set_committed_value(session, "ordered_drills", ordered_drills)
+        self.metrics.rows_written = 1 + len(rows)
 
-            suitable_drills.append(drill)
-            current_duration += adjusted_duration
+        self.db.commit()
+        return session
 
-        # If total duration > session time, drop drills from the end until it fits
-        while sum(drill.adjusted_duration for drill in suitable_drills) > preferences.duration and len(suitable_drills) > 1:
-            removed = suitable_drills.pop()
-            logger.warning(f"Removed drill '{removed.title}' to fit session duration constraint.")
+    async def generate_plan(self, preferences: SessionPreferences, days: int = 7) -> List[TrainingSession]:
+        """
+        Generate a training plan: one session per day for the next `days` days.
 
-        logger.info(f"\nFound {len(suitable_drills)} suitable drills")
+        The catalog is fetched and scored once and every day draws distinct,
+        skill-balanced drills from the shared ranked pool (see select_plan_drills).
+        The sessions are stored with plan_day 0..days-1 next to the user's current
+        session, replacing any previous plan, in a single transaction.
+        """
+        generation_started = time.perf_counter()
+        self.metrics = GenerationMetrics(mode="plan")
+        with count_queries(self.db) as queries:
+            catalog = self.catalog.get_snapshot(self.db)
+            self._record_stage("catalog", generation_started)
+            plan = self.select_plan_drills(preferences, catalog, days)
 
-        # Normalize durations to fit within target time
-        if suitable_drills:
-            suitable_drills = self._normalize_session_duration(suitable_drills, preferences.duration)
-            current_duration = sum(drill.adjusted_duration for drill in suitable_drills)
+            started = time.perf_counter()
+            sessions = self._save_plan(preferences, plan)
+            self._record_stage("persist", started)
 
-        # --- SESSION CREATION/UPDATE LOGIC ---
-        # At this point, we have a list of suitable drills with per-session adjustments (duration, etc.)
-        # We now create or update a TrainingSession and persist the per-session drill data in OrderedSessionDrill
-        session = None
+        self._emit_metrics(generation_started, queries.count)
+        return sessions
+
+    def _save_plan(self, preferences: SessionPreferences, plan: List[Tuple[List, int]]) -> List[TrainingSession]:
+        """
+        Persist the sessions of a plan in one transaction: the user's previous plan
+        is deleted with two bulk DELETEs, then the sessions and all their drills are
+        written with one multi-row INSERT ... RETURNING each.
+        """
+        db = self.db
         if preferences.user_id:
-            # Try to find an existing session for this user
-            session = self.db.query(TrainingSession).filter(TrainingSession.user_id == preferences.user_id).first()
-            if session:
-                logger.info(f"Updating existing session for user: {preferences.user_id}")
-                session.total_duration = current_duration
-                session.focus_areas = preferences.target_skills
-                # Remove old OrderedSessionDrills for this session (so we can add the new ones)
-                self.db.query(OrderedSessionDrill).filter(OrderedSessionDrill.session_id == session.id).delete()
-                self.db.commit()
-            else:
-                logger.info(f"Creating new session for user: {preferences.user_id}")
-                session = TrainingSession(
-                    total_duration=current_duration,
-                    focus_areas=preferences.target_skills,
-                    user_id=preferences.user_id
-                )
-                self.db.add(session)
-                self.db.commit()
-                self.db.refresh(session)
-        else:
-            # If no user_id, just create a session object (not persisted to a user)
-            session = TrainingSession(
-                total_duration=current_duration,
-                focus_areas=preferences.target_skills
+            previous_plan = (
+                select(TrainingSession.id)
+                .where(TrainingSession.user_id == preferences.user_id, TrainingSession.plan_day.isnot(None))
+                .scalar_subquery()
+            )
+            db.execute(
+                delete(OrderedSessionDrill)
+                .where(OrderedSessionDrill.session_id.in_(previous_plan))
+                .execution_options(synchronize_session=False)
+            )
+            db.execute(
+                delete(TrainingSession)
+                .where(TrainingSession.user_id == preferences.user_id, TrainingSession.plan_day.isnot(None))
+                .execution_options(synchronize_session=False)
             )
-            self.db.add(session)
-            self.db.commit()
-            self.db.refresh(session)
 
-        # --- CREATE ORDEREDSESSIONDRILL RECORDS ---
-        # For each drill in the generated session, create an OrderedSessionDrill record
-        # This stores the per-session, per-drill customizations (sets, reps, rest, duration, etc.)
-        # and links to the static Drill for default info
-        ordered_drills = []
-        for idx, drill in enumerate(suitable_drills):
-            osd = OrderedSessionDrill(
-                session_id=session.id,  # Link to the session
-                drill_uuid=drill.uuid,  # ✅ CHANGED: Use UUID instead of drill_id
-                position=idx,           # Order in the session
-                sets=getattr(drill, 'sets', None),
-                reps=getattr(drill, 'reps', None),
-                rest=getattr(drill, 'rest', None),
-                duration=getattr(drill, 'adjusted_duration', drill.duration),
-                is_completed=False
+        sessions = db.scalars(
+            insert(TrainingSession).returning(TrainingSession),
+            [
+                {
+                    "user_id": preferences.user_id,
+                    "plan_day": day,
+                    "total_duration": total_duration,
+                    "focus_areas": preferences.target_skills,
+                }
+                for day, (_, total_duration) in enumerate(plan)
+            ]
+        ).all()
+        sessions = sorted(sessions, key=lambda session: session.plan_day)
+
+        rows = []
+        for session, (drills, _) in zip(sessions, plan):
+            rows.extend(self.ordered_drill_rows(drills, session.id))
+        ordered_drills: Dict[int, List[OrderedSessionDrill]] = {session.id: [] for session in sessions}
+        if rows:
+            for osd in db.scalars(insert(OrderedSessionDrill).returning(OrderedSessionDrill), rows):
+                ordered_drills[osd.session_id].append(osd)
+        for session in sessions:
+            set_committed_value(
+                session, "ordered_drills", sorted(ordered_drills[session.id], key=lambda osd: osd.position)
             )
-            self.db.add(osd)
-            ordered_drills.append(osd)
-        self.db.commit()
-        # Attach the ordered drills to the session
-        session.ordered_drills = ordered_drills
-        self.db.commit()
-        self.db.refresh(session)
-        # Return the session with all per-session drill data attached
+        self.metrics.rows_written = len(sessions) + len(rows)
+
+        db.commit()
+        return sessions
+
+    async def generate_ephemeral_session(self, preferences: SessionPreferences) -> TrainingSession:
+        """
+        Generate a session in memory without any database writes (guest mode).
+
+        Returns a transient TrainingSession (session id None) whose ordered_drills are
+        transient OrderedSessionDrill objects; nothing is added to the db session.
+        """
+        generation_started = time.perf_counter()
+        self.metrics = GenerationMetrics(mode="ephemeral")
+        with count_queries(self.db) as queries:
+            catalog = self.catalog.get_snapshot(self.db)
+            self._record_stage("catalog", generation_started)
+            suitable_drills, current_duration = self.select_session_drills(preferences, catalog)
+
+        session = TrainingSession(
+            total_duration=current_duration,
+            focus_areas=preferences.target_skills
+        )
+        session.ordered_drills = self._build_ordered_drills(suitable_drills)
+        self._emit_metrics(generation_started, queries.count)
         return session
 
+    def _emit_metrics(self, generation_started: float, queries: int):
+        """Complete the metrics record of this generation and hand it to the sink"""
+        self.metrics.total_seconds = time.perf_counter() - generation_started
+        self.metrics.queries = queries
+        try:
+            self.metrics_sink.emit(self.metrics)
+        except Exception as e:
+            # Metrics must never fail a generation
+            logger.warning("Could not emit session generation metrics: %s", e)
+
+    def ordered_drill_rows(self, drills: List, session_id: Optional[int] = None) -> List[Dict]:
+        """
+        OrderedSessionDrill column values for the generated drills. These store the per-session,
+        per-drill customizations (sets, reps, rest, duration, etc.) and link to the static Drill by UUID.
+        """
+        return [
+            {
+                "session_id": session_id,  # Link to the session
+                "drill_uuid": drill.uuid,  # ✅ CHANGED: Use UUID instead of drill_id
+                "position": idx,           # Order in the session
+                "sets": getattr(drill, 'sets', None),
+                "reps": getattr(drill, 'reps', None),
+                "rest": getattr(drill, 'rest', None),
+                "duration": getattr(drill, 'adjusted_duration', drill.duration),
+                "is_completed": False
+            }
+            for idx, drill in enumerate(drills)
+        ]
+
+    def _build_ordered_drills(self, drills: List, session_id: Optional[int] = None) -> List[OrderedSessionDrill]:
+        """Transient OrderedSessionDrill objects for the generated drills"""
+        return [OrderedSessionDrill(**row) for row in self.ordered_drill_rows(drills, session_id)]
+
+    def select_session_drills(self, preferences: SessionPreferences, catalog: DrillCatalogSnapshot) -> Tuple[List, int]:
+        """
+        Pick and adjust the drills for one session without touching the database.
+
+        Returns (drills, total_duration) where drills are per-session copies of
+        catalog drills annotated with adjusted_duration, intensity_modifier and
+        original_duration. Used by generate_session and by batch generation.
+        """
+        return self.select_plan_drills(preferences, catalog, days=1)[0]
+
+    def select_plan_drills(self, preferences: SessionPreferences, catalog: DrillCatalogSnapshot,
+                           days: int) -> List[Tuple[List, int]]:
+        """
+        Pick and adjust the drills for `days` sessions from one scoring pass.
+
+        The catalog is scored (and jittered) once; each day is then balanced from
+        what is left of the shared ranked pool, so no drill appears on two days.
+        Returns one (drills, total_duration) pair per day, like select_session_drills.
+        """
+        metrics = self.metrics
+        metrics.catalog_size = len(catalog)
+        metrics.drills_selected = metrics.drills_in_session = 0
+        logger.info("Found %d total drills", len(catalog))
+        started = time.perf_counter()
+
+        # Score the catalog against its pre-built feature arrays
+        scorer = VectorizedDrillScorer(preferences, rng=self.rng)
+        
+        # Determine max drills for this session duration
+        max_drills = self.DURATION_TO_MAX_DRILLS.get(preferences.duration, 4)
+        
+        # Pre-jitter scores only depend on the preferences and the catalog, so users with
+        # the same preferences reuse them; jitter is still applied per session below.
+        # Plans need enough candidates for every day, so they are cached separately.
+        cache_key = scorer.compiled.fingerprint if days == 1 else (scorer.compiled.fingerprint, days)
+        metrics.score_cache_hit = True
+        metrics.drills_scored = 0
+        cached = self.score_cache.get_or_compute(
+            catalog,
+            cache_key,
+            lambda: self._score_candidates(catalog, scorer, max_drills * days)
+        )
+        features = cached.features
+        started = self._record_stage("score", started)
+        
+        # Select a larger pool for skill balancing (4-5x the target number per day) plus
+        # the best drills of each target skill, without sorting the whole catalog
+        pool_size = min(features.size, max_drills * 5 * days)
+        skill_limits = {
+            skill: target * days for skill, target in self._skill_drill_targets(preferences, max_drills).items()
+        }
+        drill_pool, drills_by_skill = scorer.select_drills(features, pool_size, skill_limits, cached.components)
+        
+        metrics.pool_size = pool_size
+        logger.info("Created drill pool of %d drills from %d total ranked drills", pool_size, features.size)
+        started = self._record_stage("select", started)
+
+        sessions = []
+        used_drill_ids = set()
+        balance_seconds = adjust_seconds = 0.0
+        for day in range(days):
+            day_started = time.perf_counter()
+            if used_drill_ids:
+                drill_pool = [entry for entry in drill_pool if entry['drill'].id not in used_drill_ids]
+                drills_by_skill = {
+                    skill: [entry for entry in entries if entry['drill'].id not in used_drill_ids]
+                    for skill, entries in drills_by_skill.items()
+                }
+
+            # Balance drill selection based on user's skill preferences
+            selected_drills = self._balance_drill_selection_by_skills(drill_pool, max_drills, preferences, drills_by_skill)
+            metrics.drills_selected += len(selected_drills)
+            logger.info("Selected %d balanced drills for session", len(selected_drills))
+            fit_started = time.perf_counter()
+            balance_seconds += fit_started - day_started
+
+            suitable_drills, current_duration = self._fit_session(selected_drills, preferences)
+            used_drill_ids.update(drill.id for drill in suitable_drills)
+            metrics.drills_in_session += len(suitable_drills)
+            sessions.append((suitable_drills, current_duration))
+            adjust_seconds += time.perf_counter() - fit_started
+
+        metrics.stages["balance"] = balance_seconds
+        metrics.stages["adjust"] = adjust_seconds
+        return sessions
+
+    def _fit_session(self, selected_drills: List[Dict], preferences: SessionPreferences) -> Tuple[List, int]:
+        """Choose drills and durations together: best total score that fits the session"""
+        has_limited_equipment = len(preferences.available_equipment) <= 1
+        drills = [copy.copy(ranked_drill['drill']) for ranked_drill in selected_drills]  # catalog drills are shared
+        slots = [
+            self._duration_slot(drill, ranked_drill['total_score'], preferences.duration, has_limited_equipment)
+            for drill, ranked_drill in zip(drills, selected_drills)
+        ]
+        fit = fit_durations(slots, preferences.duration)
+        if not fit.complete:
+            logger.warning("Duration fitting hit its time budget; later drills were left out")
+
+        suitable_drills = []
+        for drill, duration in zip(drills, fit.durations):
+            if duration is None:
+                logger.debug("Left out drill '%s' to fit session duration", drill.title)
+                continue
+            logger.debug("Drill '%s': %s minutes, fitted to %s minutes", drill.title, drill.duration, duration)
+            # Store drill adjustments
+            drill.adjusted_duration = duration
+            drill.intensity_modifier = self._calculate_intensity_modifier(preferences.difficulty, drill.difficulty)
+            drill.original_duration = drill.duration if drill.duration is not None else duration
+            suitable_drills.append(drill)
+
+        logger.info("Found %d suitable drills", len(suitable_drills))
+        return suitable_drills, fit.total_duration
+
+    def _record_stage(self, stage: str, started: float) -> float:
+        """Store the seconds spent in a generation stage and return the start of the next one"""
+        now = time.perf_counter()
+        self.metrics.stages[stage] = now - started
+        return now
+
+    def _score_candidates(self, catalog: DrillCatalogSnapshot, scorer: VectorizedDrillScorer, max_drills: int) -> CachedScores:
+        """
+        Score only drills that can fit this user (skill, critical equipment, location,
+        difficulty); the index widens the filters if too few drills are left.
+        """
+        candidate_rows = catalog.index.candidates(scorer.compiled, max_drills)
+        features = catalog.features
+        if len(candidate_rows) < len(catalog):
+            features = features.take(candidate_rows)
+        logger.info("Scoring %d candidate drills", features.size)
+        self.metrics.score_cache_hit = False
+        self.metrics.drills_scored = features.size
+        return CachedScores(features=features, components=scorer.score_components(features))
+
     def _should_stop_adding_drills(self, has_limited_equipment: bool, suitable_drills: List[Drill], 
                                  current_duration: int, target_duration: int) -> bool:
         """
@@ -211,44 +449,21 @@ class SessionGenerator:
             return False
         return current_duration > target_duration * 1.2
 
-    def _adjust_drill_duration(self, drill: Drill, target_session_duration: int,
-                             current_session_duration: int, num_drills_so_far: int,
-                             has_limited_equipment: bool) -> int:
+    def _duration_slot(self, drill: Drill, score: float, target_session_duration: int,
+                       has_limited_equipment: bool) -> DrillSlot:
         """
-        Adjust drill duration to fit session constraints.
-        
-        Args:
-            drill: The drill to adjust
-            target_session_duration: Desired total session duration
-            current_session_duration: Current accumulated session duration
-            num_drills_so_far: Number of drills already added
-            has_limited_equipment: Whether the user has limited equipment
-            
-        Returns:
-            Adjusted duration in minutes
-            
-        The adjustment considers:
-        - Minimum effective duration (3-5 minutes)
-        - First drill gets 30% of session time
-        - Remaining drills are scaled based on available time
+        Score and duration range of a drill for the duration fitter.
+
+        A drill runs for at most its own duration (10 minutes if unset) and can be
+        shortened down to a minimum effective duration: 3-5 minutes, or a share of
+        its duration that shrinks for short sessions (cut by up to 80% for 30
+        minutes or less, 70% up to 45 minutes, 60% above).
         """
         min_duration = 3 if has_limited_equipment else 5
-        
-        # Handle null duration with a default value
-        drill_duration = drill.duration if drill.duration is not None else 10  # Default to 10 minutes if None
-        
-        if num_drills_so_far == 0:
-            target_first_drill = target_session_duration * 0.3
-            return max(int(min(drill_duration, target_first_drill)), min_duration)
-
-        remaining_time = target_session_duration - current_session_duration
-        if remaining_time > drill_duration * 1.5:
-            return drill_duration
-
-        min_effective_duration = max(min_duration, int(drill_duration * 0.6))
-        scaled_duration = min(drill_duration, int(remaining_time * 0.7))
-        
-        return max(min_effective_duration, scaled_duration)
+        drill_duration = max(drill.duration if drill.duration is not None else 10, 1)
+        max_reduction_pct = 0.8 if target_session_duration <= 30 else 0.7 if target_session_duration <= 45 else 0.6
+        shortest = max(min_duration, int(drill_duration * (1 - max_reduction_pct)))
+        return DrillSlot(score=score, min_duration=min(shortest, drill_duration), max_duration=drill_duration)
 
     def _calculate_intensity_modifier(self, player_difficulty: str, drill_difficulty: str) -> float:
         """
@@ -282,82 +497,24 @@ class SessionGenerator:
         else:
             return 0.8  # Decrease intensity for less experienced players
 
-    def _normalize_session_duration(self, drills: List[Drill], target_duration: int) -> List[Drill]:
+    def _skill_drill_targets(self, preferences: SessionPreferences, max_drills: int) -> Dict[str, int]:
         """
-        Normalize drill durations to fit within target session duration.
-        
-        Uses a two-pass approach:
-        1. Proportionally reduce all drill durations
-        2. If still over target, reduce longer drills more aggressively
-        
-        Args:
-            drills: List of drills to normalize
-            target_duration: Target session duration in minutes
-            
-        Returns:
-            List of drills with adjusted durations
+        Number of drills each target skill category should get, proportional to
+        how many of its sub-skills the user selected (at least 1 per category).
         """
-        # Ensure all drills have an adjusted_duration attribute
-        for drill in drills:
-            if not hasattr(drill, 'adjusted_duration') or drill.adjusted_duration is None:
-                # Default to original duration or 10 minutes if None
-                drill.adjusted_duration = drill.duration if drill.duration is not None else 10
-                
-        current_duration = sum(drill.adjusted_duration for drill in drills)
-        if current_duration <= target_duration:
-            return drills
-        
-        base_min_duration = max(3, min(5, target_duration // 10))
-        reduction_ratio = target_duration / current_duration
-        
-        # First pass: proportional reduction
-        total_adjusted = 0
-        for drill in drills:
-            new_duration = max(base_min_duration, int(drill.adjusted_duration * reduction_ratio))
-            drill.adjusted_duration = new_duration
-            total_adjusted += new_duration
-        
-        # Second pass: reduce longer drills if needed
-        if total_adjusted > target_duration:
-            self._reduce_longer_drills(drills, total_adjusted - target_duration, base_min_duration, target_duration)
-        
-        return drills
-
-    def _reduce_longer_drills(self, drills: List[Drill], excess_time: int, base_min_duration: int, target_duration: int):
-        """
-        Helper method to reduce duration of longer drills.
-        
-        Longer sessions allow less aggressive reductions to maintain drill effectiveness.
-        
-        Args:
-            drills: List of drills to adjust
-            excess_time: Amount of time to reduce
-            base_min_duration: Minimum allowed duration
-            target_duration: Target session duration
-        """
-        drills_by_duration = sorted(drills, key=lambda x: x.adjusted_duration, reverse=True)
-        # Shorter sessions allow more aggressive reduction
-        max_reduction_pct = 0.8 if target_duration <= 30 else 0.7 if target_duration <= 45 else 0.6
-        
-        for drill in drills_by_duration:
-            if excess_time <= 0:
-                break
-                
-            current_duration = drill.adjusted_duration
-            # Handle null original_duration
-            original_duration = getattr(drill, 'original_duration', drill.duration)
-            if original_duration is None:
-                original_duration = current_duration  # Use current if original is None
-                
-            min_duration = max(base_min_duration, int(original_duration * (1 - max_reduction_pct)))
-            potential_reduction = current_duration - min_duration
-            
-            if potential_reduction > 0:
-                actual_reduction = min(excess_time, potential_reduction)
-                drill.adjusted_duration = current_duration - actual_reduction
-                excess_time -= actual_reduction
+        if not preferences.target_skills:
+            return {}
+        skill_counts = self._calculate_skill_proportions(preferences.target_skills)
+        total_selected_skills = sum(skill_counts.values())
+        if total_selected_skills == 0:
+            return {}
+        return {
+            skill_category: max(1, round(count / total_selected_skills * max_drills))
+            for skill_category, count in skill_counts.items()
+        }
 
-    def _balance_drill_selection_by_skills(self, drill_pool: List[Dict], max_drills: int, preferences: SessionPreferences) -> List[Dict]:
+    def _balance_drill_selection_by_skills(self, drill_pool: List[Dict], max_drills: int, preferences: SessionPreferences,
+                                           drills_by_skill: Optional[Dict[str, List[Dict]]] = None) -> List[Dict]:
         """
         Balance drill selection to be proportional to user's selected skills.
         
@@ -365,51 +522,37 @@ class SessionGenerator:
             drill_pool: List of ranked drills with scores
             max_drills: Maximum number of drills to select
             preferences: User preferences containing target skills
+            drills_by_skill: Ranked drills per primary skill category (e.g. from
+                VectorizedDrillScorer.select_drills); grouped from drill_pool if omitted
             
         Returns:
             List of selected drills balanced by skill distribution
         """
-        if not preferences.target_skills:
+        skill_targets = self._skill_drill_targets(preferences, max_drills)
+        if not skill_targets:
             # If no specific skills selected, just return top drills
             return drill_pool[:max_drills]
         
-        # Group drills by their primary skill category
-        drills_by_skill = {}
-        unmatched_drills = []
-        
-        for drill_info in drill_pool:
-            primary_skill = self._get_drill_primary_skill(drill_info['drill'])
-            
-            if primary_skill:
-                if primary_skill not in drills_by_skill:
-                    drills_by_skill[primary_skill] = []
-                drills_by_skill[primary_skill].append(drill_info)
-            else:
-                unmatched_drills.append(drill_info)
-        
-        # Calculate skill proportions from user's target skills
-        skill_counts = self._calculate_skill_proportions(preferences.target_skills)
-        total_selected_skills = sum(skill_counts.values())
-        
-        if total_selected_skills == 0:
-            return drill_pool[:max_drills]
+        if drills_by_skill is None:
+            # Group drills by their primary skill category
+            drills_by_skill = {}
+            for drill_info in drill_pool:
+                primary_skill = self._get_drill_primary_skill(drill_info['drill'])
+                if primary_skill:
+                    drills_by_skill.setdefault(primary_skill, []).append(drill_info)
         
         # Allocate drills proportionally
         selected_drills = []
         allocated_count = 0
         
-        for skill_category, count in skill_counts.items():
-            if skill_category in drills_by_skill:
-                # Calculate how many drills this skill should get
-                proportion = count / total_selected_skills
-                target_drills = max(1, round(proportion * max_drills))  # At least 1 drill per selected skill
-                
+        for skill_category, target_drills in skill_targets.items():
+            if drills_by_skill.get(skill_category):
                 # Take the best drills for this skill category
                 skill_drills = drills_by_skill[skill_category][:target_drills]
                 selected_drills.extend(skill_drills)
                 allocated_count += len(skill_drills)
                 
-                logger.info(f"Allocated {len(skill_drills)} drills for skill '{skill_category}' (proportion: {proportion:.2f})")
+                logger.info("Allocated %d drills for skill '%s' (target: %d)", len(skill_drills), skill_category, target_drills)
         
         # Fill remaining slots with top-scored drills if we haven't reached max_drills
         if allocated_count < max_drills:
@@ -424,7 +567,7 @@ class SessionGenerator:
             
             # Add highest scoring remaining drills
             selected_drills.extend(remaining_drills[:remaining_slots])
-            logger.info(f"Filled {min(remaining_slots, len(remaining_drills))} remaining slots with top-scored drills")
+            logger.info("Filled %d remaining slots with top-scored drills", min(remaining_slots, len(remaining_drills)))
         
         # Sort final selection by score to maintain quality order
         selected_drills.sort(key=lambda x: x['total_score'], reverse=True)
@@ -476,6 +619,6 @@ class SessionGenerator:
                     # Single sub-skill
                     skill_counts[category] = skill_counts.get(category, 0) + 1
                     
-                logger.info(f"Skill category '{category}' has {skill_counts[category]} sub-skills")
+                logger.debug("Skill category '%s' has %d sub-skills", category, skill_counts[category])
         
         return skill_counts
\ No newline at end of file
@@ -22,6 +22,8 @@ from db import Base, get_db
 from models import User, DrillGroup, Drill, DrillCategory, DrillSkillFocus
 from main import app
 from config import UserAuth
+from services.drill_catalog import drill_catalog
+from services.drill_typeahead import custom_drill_typeahead
 
 # Use JSON type for SQLite instead of ARRAY which is not supported
 from sqlalchemy.ext.declarative import declarative_base
@@ -102,6 +104,9 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 def db():
     """Create a fresh database for each test."""
     Base.metadata.create_all(bind=engine)
+    # The shared drill catalog must not leak drills between test databases
+    drill_catalog.invalidate()
+    custom_drill_typeahead.clear()
     connection = engine.connect()
     transaction = connection.begin()
     session = TestingSessionLocal(bind=connection)
@@ -112,6 +117,8 @@ def db():
     transaction.rollback()
     connection.close()
     Base.metadata.drop_all(bind=engine)
+    drill_catalog.invalidate()
+    custom_drill_typeahead.clear()
 
 @pytest.fixture(scope="function")
 def client(db):
@@ -260,4 +267,17 @@ def test_drill_group(db, test_user):
     db.commit()
     db.refresh(group)
     
-    return group 
+    return group
+
+
+@pytest.fixture(scope="function")
+def query_counter(db):
+    """Record every SQL statement executed on the test connection."""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sa.event.listen(engine, "before_cursor_execute", _record)
+    yield statements
+    sa.event.remove(engine, "before_cursor_execute", _record)
@@ -0,0 +1,63 @@
+"""
+Tests for the drill catalog delta feed
+"""
+from fastapi import status
+
+from drills.drill_importer import upload_drills_to_db
+from services.drill_catalog import bump_catalog_version
+from services.drill_changes import record_drill_changes
+
+
+def drill_data(title, tips):
+    return {
+        "title": title,
+        "description": f"{title} description",
+        "duration": 10,
+        "intensity": "medium",
+        "training_styles": ["medium_intensity"],
+        "type": "time_based",
+        "equipment": ["ball"],
+        "suitable_locations": ["backyard"],
+        "difficulty": "beginner",
+        "instructions": ["Step 1"],
+        "tips": tips,
+        "primary_skill": {"category": "passing", "sub_skill": "short_passing"},
+        "secondary_skills": [{"category": "first_touch", "sub_skill": "ground_control"}],
+    }
+
+
+def test_changes_feed_returns_only_drills_changed_since_a_version(client, db):
+    upload_drills_to_db([drill_data("Wall Passes", ["Tip 1"]), drill_data("Gate Passing", ["Tip 1"])], db)
+
+    full = client.get("/public/drills/changes").json()
+    assert full["full"] is True and full["version"] == 1
+    assert sorted(entry["drill"]["title"] for entry in full["changes"]) == ["Gate Passing", "Wall Passes"]
+    uuids = {entry["drill"]["title"]: entry["uuid"] for entry in full["changes"]}
+
+    # Re-importing an unchanged drill bumps the version but records no change for it
+    upload_drills_to_db([drill_data("Wall Passes", ["Tip 1"]), drill_data("Gate Passing", ["Tip 2"])], db)
+    delta = client.get("/public/drills/changes", params={"since": 1}).json()
+    assert delta["full"] is False and delta["version"] == 2 and delta["count"] == 1
+    [entry] = delta["changes"]
+    assert entry["uuid"] == uuids["Gate Passing"] and entry["version"] == 2
+    assert entry["drill"]["tips"] == ["Tip 2"]
+
+    # Removals come back as tombstones, in version order after the earlier change
+    record_drill_changes(db, bump_catalog_version(db), removed=[uuids["Wall Passes"]])
+    db.commit()
+    delta = client.get("/public/drills/changes", params={"since": 1}).json()
+    assert [(entry["uuid"], entry["removed"]) for entry in delta["changes"]] == [
+        (uuids["Gate Passing"], False), (uuids["Wall Passes"], True)
+    ]
+    assert delta["changes"][1]["drill"] is None
+
+    assert client.get("/public/drills/changes", params={"since": 3}).json()["changes"] == []
+
+
+def test_changes_feed_resyncs_clients_ahead_of_the_catalog(client, db):
+    upload_drills_to_db([drill_data("Wall Passes", ["Tip 1"])], db)
+
+    response = client.get("/public/drills/changes", params={"since": 50})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["full"] is True and data["version"] == 1 and data["count"] == 1
@@ -4,9 +4,16 @@ Tests for the drill groups router - testing one endpoint at a time
 import pytest
 from fastapi import status
 import json
-from models import Drill, DrillGroup, DrillGroupItem
+from models import Drill, DrillGroup, DrillGroupItem, DrillSkillFocus, CustomDrill
 import uuid
 
+DRILL_FIELDS = dict(
+    difficulty="beginner", training_styles=["medium_intensity"], type="time_based", duration=10,
+    intensity="medium", equipment=["ball"], suitable_locations=["small_field"], instructions=["Step 1"],
+    tips=["Tip 1"], common_mistakes=["Mistake 1"], progression_steps=["Progress 1"], variations=["Variation 1"]
+)
+
+
 def test_get_user_drill_groups(client, auth_headers, test_user, test_drill_group):
     """Test getting all drill groups for a user"""
     response = client.get("/api/drill-groups/", headers=auth_headers)
@@ -239,4 +246,47 @@ def test_get_public_drill_groups(client, db, test_user, test_drill_category):
             assert len(g["drills"]) == 1
             assert g["drills"][0]["title"] == "Public Test Drill"
     
-    assert found, "Created drill group not found in response" 
\ No newline at end of file
+    assert found, "Created drill group not found in response"
+
+
+def test_drill_group_responses_use_constant_queries(client, auth_headers, db, test_user, query_counter):
+    """Skill focus for every drill in a group is loaded in one query, however many drills it holds"""
+    group = DrillGroup(name="Batch Group", description="Batch", user_id=test_user.id)
+    db.add(group)
+    db.commit()
+
+    def add_drills(count, start):
+        for i in range(start, start + count):
+            drill = Drill(title=f"Batch Drill {i}", description="Batch", is_custom=False, **DRILL_FIELDS)
+            db.add(drill)
+            db.flush()
+            db.add(DrillSkillFocus(drill_uuid=drill.uuid, category="passing", sub_skill="short_passing", is_primary=True))
+            db.add(DrillSkillFocus(drill_uuid=drill.uuid, category="dribbling", sub_skill="ball_mastery", is_primary=False))
+            db.add(DrillGroupItem(drill_group_id=group.id, drill_uuid=drill.uuid, position=i))
+        db.commit()
+
+    def count_queries():
+        db.expire_all()
+        query_counter.clear()
+        response = client.get(f"/api/drill-groups/{group.id}", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        return len(query_counter), response.json()["drills"]
+
+    add_drills(2, 0)
+    custom = CustomDrill(user_id=test_user.id, title="Custom Batch", description="Custom", is_custom=True,
+                         primary_skill={"category": "shooting", "sub_skill": "power"}, **DRILL_FIELDS)
+    db.add(custom)
+    db.flush()
+    db.add(DrillGroupItem(drill_group_id=group.id, drill_uuid=custom.uuid, position=99))
+    db.commit()
+    few_queries, few_drills = count_queries()
+
+    add_drills(8, 2)
+    many_queries, many_drills = count_queries()
+
+    assert len(few_drills) == 3 and len(many_drills) == 11
+    assert many_queries == few_queries
+    default = next(d for d in many_drills if d["title"] == "Batch Drill 5")
+    assert default["primary_skill"] == {"category": "passing", "sub_skill": "short_passing"}
+    assert default["secondary_skills"] == [{"category": "dribbling", "sub_skill": "ball_mastery"}]
+    assert next(d for d in many_drills if d["title"] == "Custom Batch")["primary_skill"]["category"] == "shooting"
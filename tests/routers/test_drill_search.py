@@ -18,7 +18,8 @@ import re
 import sys
 from typing import List, Dict, Any
 from sqlalchemy.orm import Session
-from models import Drill, DrillCategory, DrillSkillFocus
+from models import Drill, DrillCategory, DrillSkillFocus, CustomDrill
+from routers.router_utils import drills_to_response
 import logging
 logging.basicConfig(level=logging.INFO)
 
@@ -367,6 +368,177 @@ def test_search_drills_combined_filters(client, auth_headers, db):
                 difficulty = params["difficulty"].lower()
                 assert drill.get("difficulty", "").lower() == difficulty, f"Drill does not have difficulty '{difficulty}'"
 
+
+def test_autocomplete_merges_catalog_and_custom_drills(client, auth_headers, db, test_user):
+    """Autocomplete matches word prefixes of titles and sub-skills, including the user's custom drills"""
+    create_test_drills(db)
+    db.add(CustomDrill(user_id=test_user.id, title="Dribble Gates", description="Custom",
+                       primary_skill={"category": "dribbling", "sub_skill": "close_control"}))
+    db.commit()
+
+    response = client.get("/api/drills/autocomplete?query=dri&limit=3", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    suggestions = response.json()
+    assert [s["title"] for s in suggestions] == ["Dribble Gates", "Advanced Dribbling Moves", "Agility Ladder Drill"]
+    assert set(suggestions[0]) == {"uuid", "title", "category"}
+    assert suggestions[0]["category"] == "dribbling"
+
+    # Sub-skill words match too ("wall_passing"), and every query word must match
+    response = client.get("/api/drills/autocomplete?query=wall pass", headers=auth_headers)
+    assert [s["title"] for s in response.json()] == ["Wall Pass Drill"]
+    response = client.get("/api/drills/autocomplete?query=close", headers=auth_headers)
+    assert [s["title"] for s in response.json()] == ["Cone Dribbling Drill", "Dribble Gates"]
+
+
+def test_cursor_pagination_walks_merged_results_in_title_order(client, auth_headers, db, test_user):
+    """Cursor pages cover default and custom drills exactly once, ordered by (title, uuid)"""
+    create_test_drills(db)
+    for title in ["Wall Pass Drill", "Aardvark Warmup", "Zig Zag Sprint"]:
+        db.add(CustomDrill(user_id=test_user.id, title=title, description="Custom drill"))
+    db.commit()
+
+    seen, cursor = [], ""
+    while cursor is not None:
+        response = client.get(f"/api/drills/search?limit=4&cursor={cursor}", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert "total" not in data and len(data["items"]) <= 4
+        seen.extend((drill["title"], drill["uuid"]) for drill in data["items"])
+        cursor = data["next_cursor"]
+        assert data["has_next_page"] == (cursor is not None)
+
+    assert len(seen) == 13 and len(set(seen)) == 13
+    assert seen == sorted(seen)
+
+    # Page numbers keep working and totals are available on request
+    legacy = client.get("/api/drills/search?page=2&limit=4", headers=auth_headers).json()
+    assert legacy["total"] == 13 and legacy["page"] == 2
+    first = client.get("/api/drills/search?limit=4&cursor=&include_total=true", headers=auth_headers).json()
+    assert first["total"] == 13
+
+    response = client.get("/api/drills/search?cursor=not-a-cursor", headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_guest_cursor_pagination_keeps_the_guest_cap(client, db):
+    """The guest cursor counts drills served, so cursor paging stops at the guest cap"""
+    create_test_drills(db)
+    for i in range(30):
+        db.add(Drill(title=f"Extra Drill {i:02d}", description="Extra"))
+    db.commit()
+
+    served, cursor = 0, ""
+    while cursor is not None:
+        data = client.get(f"/public/drills/search/limited?limit=10&cursor={cursor}").json()
+        served += len(data["items"])
+        cursor = data["next_cursor"]
+    assert served == 28
+
+
+def test_page_search_is_one_merged_query(client, auth_headers, db, test_user, query_counter):
+    """Page-number search orders the merged result set in the database, in a fixed number of queries"""
+    create_test_drills(db)
+    for title in ["Aardvark Warmup", "Zig Zag Sprint"]:
+        db.add(CustomDrill(user_id=test_user.id, title=title, description="Custom drill",
+                           primary_skill={"category": "fitness", "sub_skill": "agility"}))
+    db.commit()
+
+    titles = []
+    for page in (1, 2, 3):
+        query_counter.clear()
+        data = client.get(f"/api/drills/search?page={page}&limit=5", headers=auth_headers).json()
+        search_statements = [s for s in query_counter if "FROM users" not in s]
+        assert len(search_statements) == 2  # UNION ALL page with its total, then skill focus
+        assert "UNION ALL" in search_statements[0]
+        assert data["total"] == 12
+        titles.extend(drill["title"] for drill in data["items"])
+
+    assert titles == sorted(titles) and len(titles) == 12
+    assert titles[0] == "Aardvark Warmup" and titles[-1] == "Zig Zag Sprint"
+    items = client.get("/api/drills/search?query=cone", headers=auth_headers).json()["items"]
+    assert items[0]["primary_skill"] == {"category": "dribbling", "sub_skill": "close_control"}
+
+    # A page past the end still reports the total
+    data = client.get("/api/drills/search?page=9&limit=5", headers=auth_headers).json()
+    assert data["items"] == [] and data["total"] == 12
+
+
+def test_public_search_splices_catalog_fragments(client, db, query_counter):
+    """Public search serves the catalog's pre-encoded drills, identical to drill_to_response output"""
+    drills = create_test_drills(db)
+    expected = {item["uuid"]: item for item in drills_to_response(drills, db)}
+
+    client.get("/public/drills/search?limit=100")  # loads the catalog snapshot
+    query_counter.clear()
+    response = client.get("/public/drills/search?limit=100")
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+
+    assert data["total"] == 10 and len(data["items"]) == 10
+    assert all(item == expected[item["uuid"]] for item in data["items"])
+    assert not any("drill_skill_focus" in statement for statement in query_counter)
+
+    # A drill added after the snapshot loaded is encoded on the fly
+    new_drill = Drill(title="Brand New Drill", description="Added later", is_custom=False)
+    db.add(new_drill)
+    db.commit()
+    items = client.get("/public/drills/search?query=brand").json()["items"]
+    assert [item["uuid"] for item in items] == [str(new_drill.uuid)]
+    assert items[0]["primary_skill"] == {}
+
+
+def test_guest_showcase_is_filtered_in_memory(client, db, query_counter):
+    """The guest showcase comes from the catalog snapshot; guest search and the limited list run no SQL"""
+    drills = create_test_drills(db)
+    expected = {item["uuid"]: item for item in drills_to_response(drills, db)}
+    client.get("/public/drills/search/limited?limit=50")  # loads the catalog snapshot
+    query_counter.clear()
+
+    def titles(params):
+        data = client.get(f"/public/drills/search/limited?limit=50&{params}").json()
+        assert all(item == expected[item["uuid"]] for item in data["items"])
+        return sorted(item["title"] for item in data["items"])
+
+    assert len(titles("")) == 10  # 2 drills in each of the 5 featured categories that exist
+    assert titles("category=Passing") == ["Passing Triangle", "Wall Pass Drill"]
+    assert titles("category=First Touch&difficulty=advanced") == ["Aerial Control Practice"]
+    assert titles("query=SHOOT") == ["Power Shooting Drill", "Shooting Practice"]
+
+    # The limited list tops the showcase up with the first catalog drills
+    limited = client.get("/public/drills/limited").json()
+    assert limited["total_count"] == 14
+    assert [drill["uuid"] for drill in limited["drills"][-4:]] == [str(drill.uuid) for drill in drills[:4]]
+    assert query_counter == []
+
+
+def test_search_facets_count_all_results_once_per_catalog_version(client, auth_headers, db, test_user, query_counter):
+    """Facet counts cover every result (default and custom drills); default counts are cached per version"""
+    create_test_drills(db)
+    db.add(CustomDrill(user_id=test_user.id, title="Passing Gates", description="Custom", difficulty="Beginner",
+                       equipment=["ball"], primary_skill={"category": "passing", "sub_skill": "short_passing"}))
+    db.commit()
+
+    data = client.get("/api/drills/search?include_facets=true&limit=2", headers=auth_headers).json()
+    assert len(data["items"]) == 2
+    assert data["facets"] == {
+        "category": {"passing": 3, "dribbling": 2, "first_touch": 2, "fitness": 2, "shooting": 2},
+        "difficulty": {"beginner": 4, "intermediate": 4, "advanced": 3},
+        "equipment": {"ball": 11, "cones": 10},
+    }
+
+    def facets(params):
+        return client.get(f"/public/drills/search?include_facets=true&{params}").json()["facets"]
+
+    assert facets("difficulty=Advanced")["category"] == {"dribbling": 1, "first_touch": 1, "fitness": 1}
+    query_counter.clear()
+    assert facets("difficulty=advanced&cursor=")["difficulty"] == {"advanced": 3}
+    assert not any(statement.startswith("SELECT drills.uuid") for statement in query_counter)
+
+    # Guest search with a high limit counts the showcase results it returns
+    guest = client.get("/public/drills/search/limited?limit=50&category=Shooting&include_facets=true").json()
+    assert guest["facets"]["category"] == {"shooting": 2}
+
+
 if __name__ == "__main__":
     # This allows running this file directly (without pytest) for debugging
     import os
@@ -4,6 +4,8 @@ Tests for the drills router
 import pytest
 from fastapi import status
 import json
+from models import MentalTrainingQuote
+from services.drill_catalog import bump_catalog_version, drill_catalog
 
 def test_get_all_drills(client, auth_headers, test_drill):
     """Test getting all drills"""
@@ -49,4 +51,55 @@ def test_filter_drills_by_category(client, auth_headers, test_drill, test_drill_
     
     # All drills should mention the category name
     for drill in data["drills"]:
-        assert drill["category"] == test_drill_category.name 
\ No newline at end of file
+        assert drill["category"] == test_drill_category.name 
+
+CATALOG_ENDPOINTS = ["/drill-categories/", "/drills/", "/public/drills/limited"]
+
+
+@pytest.mark.parametrize("path", CATALOG_ENDPOINTS)
+def test_catalog_endpoints_answer_not_modified_from_memory(client, db, test_drill, query_counter, path):
+    """A matching If-None-Match gets a 304 without any SQL, until the catalog version changes"""
+    response = client.get(path)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and "max-age" in response.headers["cache-control"]
+
+    query_counter.clear()
+    cached = client.get(path)
+    assert cached.content == response.content
+    not_modified = client.get(path, headers={"If-None-Match": etag})
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_modified.headers["etag"] == etag
+    assert query_counter == []
+
+    # An import bumps the version: the old ETag no longer matches
+    bump_catalog_version(db)
+    db.commit()
+    drill_catalog.invalidate()
+    refreshed = client.get(path, headers={"If-None-Match": etag})
+    assert refreshed.status_code == status.HTTP_200_OK
+    assert refreshed.headers["etag"] != etag
+
+
+def test_mental_training_quotes_are_shuffled_per_request_with_a_weak_etag(client, db, query_counter):
+    """Quotes keep a fresh random order on every 200, while If-None-Match still gets a 304 from memory"""
+    db.add_all(MentalTrainingQuote(content=f"Quote {i}", author="Coach", type="motivational") for i in range(20))
+    db.commit()
+
+    responses = [client.get("/api/mental-training/quotes?limit=10") for _ in range(5)]
+    etag = responses[0].headers["etag"]
+    assert etag.startswith('W/"') and all(r.headers["etag"] == etag for r in responses)
+    orders = {tuple(quote["id"] for quote in r.json()) for r in responses}
+    assert len(orders) > 1 and all(len(order) == 10 for order in orders)
+
+    query_counter.clear()
+    not_modified = client.get("/api/mental-training/quotes?limit=10", headers={"If-None-Match": etag})
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert query_counter == []
+
+    # Reseeding quotes bumps the catalog version, so the old ETag stops matching
+    bump_catalog_version(db)
+    db.commit()
+    drill_catalog.invalidate()
+    refreshed = client.get("/api/mental-training/quotes?limit=10", headers={"If-None-Match": etag})
+    assert refreshed.status_code == status.HTTP_200_OK
@@ -0,0 +1,56 @@
+"""
+Tests for guest (public) session generation
+"""
+from fastapi import status
+from models import TrainingSession, OrderedSessionDrill
+from services.drill_catalog import drill_catalog
+from services.generation_metrics import DEBUG_HEADER
+from tests.services.test_session_generator import create_catalog_drills, catalog_statements
+
+GUEST_REQUEST = {
+    "preferences": {
+        "duration": 30,
+        "available_equipment": ["ball", "cones"],
+        "training_style": "medium_intensity",
+        "training_location": "backyard",
+        "difficulty": "beginner",
+        "target_skills": ["Close control", "Ball mastery"]
+    }
+}
+
+
+def test_public_session_is_generated_without_database_writes(client, db, query_counter):
+    create_catalog_drills(db)
+    drill_catalog.load(db)
+    query_counter.clear()
+
+    response = client.post("/public/session/generate", json=GUEST_REQUEST)
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()["data"]
+    assert data["session_id"] is None
+    assert data["drills"]
+    assert data["total_duration"] == sum(drill["duration"] for drill in data["drills"])
+    assert data["drills"][0]["primary_skill"]["category"] == "dribbling"
+
+    writes = [s for s in query_counter if s.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE"))]
+    assert writes == []
+    # Drills are formatted from the in-memory catalog, not looked up one by one
+    assert catalog_statements(query_counter) == []
+    assert db.query(TrainingSession).count() == 0
+    assert db.query(OrderedSessionDrill).count() == 0
+
+
+def test_debug_header_reports_generation_metrics(client, db, monkeypatch):
+    create_catalog_drills(db)
+    drill_catalog.load(db)
+
+    response = client.post("/public/session/generate", json=GUEST_REQUEST)
+    assert DEBUG_HEADER not in response.headers
+
+    monkeypatch.setattr("routers.session.SESSION_DEBUG_HEADERS", True)
+    response = client.post("/public/session/generate", json=GUEST_REQUEST)
+    assert response.status_code == status.HTTP_200_OK
+    metrics = dict(part.split("=") for part in response.headers[DEBUG_HEADER].split(";"))
+    assert {"catalog", "score", "select", "balance", "adjust", "total", "queries"} <= set(metrics)
+    assert metrics["rows_written"] == "0"
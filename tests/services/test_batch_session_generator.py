@@ -0,0 +1,79 @@
+"""
+Tests for batch session pre-generation
+"""
+from models import User, SessionPreferences, TrainingSession, OrderedSessionDrill
+from services.batch_session_generator import BatchSessionGenerator
+from services.drill_catalog import DrillCatalog
+from tests.services.test_session_generator import create_catalog_drills
+
+
+def create_users_with_preferences(db, count):
+    users = []
+    for i in range(count):
+        user = User(email=f"batch{i}@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        db.add(SessionPreferences(
+            user_id=user.id,
+            duration=[15, 30, 45][i % 3],
+            available_equipment=["ball", "cones"],
+            training_style="medium_intensity",
+            training_location="backyard",
+            difficulty="beginner",
+            target_skills=[{"category": "dribbling", "sub_skills": ["close_control"]}]
+        ))
+        users.append(user)
+    db.commit()
+    return users
+
+
+def sessions_by_user(db):
+    return {session.user_id: session for session in db.query(TrainingSession).all()}
+
+
+def test_batch_generates_one_session_per_user(db, query_counter):
+    create_catalog_drills(db)
+    users = create_users_with_preferences(db, 7)
+    catalog = DrillCatalog()
+    catalog.load(db)
+    query_counter.clear()
+
+    result = BatchSessionGenerator(db, catalog=catalog, chunk_size=3, workers=0).run()
+
+    assert (result.users, result.chunks) == (7, 3)
+    assert result.users_per_second > 0
+    sessions = sessions_by_user(db)
+    assert set(sessions) == {user.id for user in users}
+    assert db.query(OrderedSessionDrill).count() == result.drills > 0
+    # Drill rows are written with one bulk statement per chunk, not one per drill
+    drill_writes = [s for s in query_counter if "INSERT INTO ordered_session_drills" in s]
+    assert len(drill_writes) == result.chunks
+
+
+def test_batch_reuses_existing_sessions_and_replaces_drills(db):
+    create_catalog_drills(db)
+    users = create_users_with_preferences(db, 4)
+    catalog = DrillCatalog()
+    generator = BatchSessionGenerator(db, catalog=catalog, workers=0)
+    generator.run()
+    first_ids = {user_id: session.id for user_id, session in sessions_by_user(db).items()}
+
+    result = generator.run(user_ids=[users[0].id, users[1].id])
+
+    assert result.users == 2
+    assert {user_id: session.id for user_id, session in sessions_by_user(db).items()} == first_ids
+    positions = [
+        drill.position for drill in
+        db.query(OrderedSessionDrill).filter(OrderedSessionDrill.session_id == first_ids[users[0].id])
+    ]
+    assert sorted(positions) == list(range(len(positions)))
+
+
+def test_batch_plans_in_worker_processes(db):
+    create_catalog_drills(db)
+    users = create_users_with_preferences(db, 6)
+
+    result = BatchSessionGenerator(db, catalog=DrillCatalog(), workers=2).run()
+
+    assert result.users == 6
+    assert set(sessions_by_user(db)) == {user.id for user in users}
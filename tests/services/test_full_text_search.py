@@ -0,0 +1,39 @@
+"""
+Tests for full-text drill search and its ilike fallback
+"""
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+
+from models import Drill
+from services.drill_search import (
+    apply_text_search, order_by_rank, prefix_query, search_vector_ddl, supports_full_text
+)
+
+
+def test_prefix_query_matches_every_word_as_a_prefix():
+    assert prefix_query("Drib  pass!") == "drib:* & pass:*"
+    assert prefix_query("first-touch") == "first:* & touch:*"
+    assert prefix_query(" !? ") is None
+
+
+def test_full_text_search_is_ranked_on_postgres():
+    query = order_by_rank(apply_text_search(Query(Drill), Drill, "cone drib", True), Drill, "cone drib", True)
+    sql = str(query.statement.compile(dialect=postgresql.dialect()))
+
+    assert "drills.search_vector @@ to_tsquery" in sql
+    assert "ORDER BY ts_rank(drills.search_vector, to_tsquery" in sql
+    assert "ILIKE" not in sql.upper()
+    assert any("USING GIN (search_vector)" in statement for statement in search_vector_ddl("custom_drills"))
+
+
+def test_search_falls_back_to_ilike_without_full_text(db):
+    assert not supports_full_text(db)
+    db.add_all([
+        Drill(title="Cone Dribbling", description="Weave through cones"),
+        Drill(title="Wall Passes", description="Pass against a wall"),
+    ])
+    db.flush()
+
+    query = apply_text_search(db.query(Drill), Drill, "dribbl", False)
+    assert order_by_rank(query, Drill, "dribbl", False) is query
+    assert [drill.title for drill in query.all()] == ["Cone Dribbling"]
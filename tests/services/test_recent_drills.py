@@ -0,0 +1,30 @@
+"""
+Tests for the per-user ring of recently completed drills
+"""
+from models import SessionPreferences, User
+from services.recent_drills import push_recent_drills, record_completed_drills
+
+
+def test_ring_keeps_the_most_recent_unique_drills():
+    ring = push_recent_drills(None, ["a", "b", "c"], limit=4)
+    assert ring == ["a", "b", "c"]
+
+    ring = push_recent_drills(ring, ["a", "d", "e", "d"], limit=4)
+    assert ring == ["b", "c", "a", "d", "e"][-4:]
+    assert push_recent_drills(ring, [], limit=4) == ring
+
+
+def test_completed_drills_are_recorded_on_preferences(db):
+    user = User(email="recent@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    assert record_completed_drills(db, user.id, ["a"]) is None
+
+    db.add(SessionPreferences(user_id=user.id, duration=30, available_equipment=["ball"], target_skills=[]))
+    db.flush()
+    record_completed_drills(db, user.id, ["a", "b"])
+    record_completed_drills(db, user.id, ["a"])
+    db.commit()
+
+    preferences = db.query(SessionPreferences).filter_by(user_id=user.id).one()
+    assert preferences.recent_drill_uuids == ["b", "a"]
@@ -0,0 +1,338 @@
+"""
+Tests for session generation and the in-memory drill catalog
+"""
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from models import Drill, DrillCategory, DrillSkillFocus, SessionPreferences, User, TrainingSession, OrderedSessionDrill
+from services.drill_catalog import DrillCatalog, CatalogDrill, bump_catalog_version
+from services.score_cache import ScoreCache
+from services.generation_metrics import InMemoryMetricsSink, MetricsSink, count_queries
+from services.session_generator import SessionGenerator
+
+CATALOG_DRILLS = [
+    ("Cone Weave", "dribbling", "close_control", ["ball", "cones"], "beginner", 10),
+    ("Toe Taps", "dribbling", "ball_mastery", ["ball"], "beginner", 5),
+    ("Speed Dribble", "dribbling", "speed_dribbling", ["ball", "cones"], "intermediate", 10),
+    ("Wall Passes", "passing", "wall_passing", ["ball", "wall"], "beginner", 10),
+    ("Short Pass Gates", "passing", "short_passing", ["ball", "cones"], "intermediate", 15),
+    ("Long Balls", "passing", "long_passing", ["ball"], "advanced", 15),
+    ("Finishing Reps", "shooting", "finishing", ["ball", "goals"], "intermediate", 10),
+    ("Power Strikes", "shooting", "power", ["ball", "goals"], "advanced", 10),
+    ("Ground Control", "first_touch", "ground_control", ["ball", "wall"], "beginner", 10),
+    ("Sprint Ladder", "fitness", "speed", [], "beginner", 5),
+]
+
+
+def create_catalog_drills(db: Session, drills=CATALOG_DRILLS):
+    """Create drills with a primary and a secondary skill focus each"""
+    categories = {}
+    created = []
+    for title, category, sub_skill, equipment, difficulty, duration in drills:
+        if category not in categories:
+            categories[category] = DrillCategory(name=category, description=f"{category} drills")
+            db.add(categories[category])
+            db.flush()
+        drill = Drill(
+            title=title,
+            description=f"{title} drill",
+            category_id=categories[category].id,
+            duration=duration,
+            intensity="medium",
+            training_styles=["medium_intensity"],
+            type="time_based",
+            equipment=equipment,
+            suitable_locations=["backyard", "small_field"],
+            difficulty=difficulty,
+            instructions=["Step 1"],
+            tips=["Tip 1"],
+            is_custom=False
+        )
+        db.add(drill)
+        db.flush()
+        db.add(DrillSkillFocus(drill_uuid=drill.uuid, category=category, sub_skill=sub_skill, is_primary=True))
+        db.add(DrillSkillFocus(drill_uuid=drill.uuid, category="first_touch", sub_skill="ground_control", is_primary=False))
+        created.append(drill)
+    db.commit()
+    return created
+
+
+def make_preferences(**overrides):
+    values = dict(
+        user_id=None,
+        duration=30,
+        available_equipment=["ball", "cones"],
+        training_style="medium_intensity",
+        training_location="backyard",
+        difficulty="beginner",
+        target_skills=[{"category": "dribbling", "sub_skills": ["close_control", "ball_mastery"]}]
+    )
+    values.update(overrides)
+    return SessionPreferences(**values)
+
+
+def catalog_statements(statements):
+    """Statements that read the drill catalog tables"""
+    return [s for s in statements if "FROM drills" in s or "FROM drill_skill_focus" in s]
+
+
+def test_catalog_loads_drills_with_skill_focus(db):
+    create_catalog_drills(db)
+    snapshot = DrillCatalog().load(db)
+
+    assert len(snapshot) == len(CATALOG_DRILLS)
+    drill = next(d for d in snapshot.drills if d.title == "Cone Weave")
+    assert isinstance(drill, CatalogDrill)
+    assert drill.category_name == "dribbling"
+    assert {(f.category, f.sub_skill, f.is_primary) for f in drill.skill_focus} == {
+        ("dribbling", "close_control", True),
+        ("first_touch", "ground_control", False),
+    }
+    assert snapshot.get(str(drill.uuid)) is drill
+
+
+@pytest.mark.asyncio
+async def test_generation_issues_no_catalog_queries_once_loaded(db, query_counter):
+    create_catalog_drills(db)
+    catalog = DrillCatalog()
+    catalog.load(db)
+    query_counter.clear()
+
+    session = await SessionGenerator(db, catalog=catalog).generate_session(make_preferences())
+
+    assert session.ordered_drills
+    assert catalog_statements(query_counter) == []
+
+
+@pytest.mark.asyncio
+async def test_generation_does_not_mutate_catalog_drills(db):
+    create_catalog_drills(db)
+    catalog = DrillCatalog()
+    snapshot = catalog.load(db)
+
+    await SessionGenerator(db, catalog=catalog).generate_session(make_preferences())
+
+    for drill in snapshot.drills:
+        assert not hasattr(drill, "adjusted_duration")
+
+
+def test_catalog_reloads_when_version_changes(db):
+    create_catalog_drills(db, CATALOG_DRILLS[:3])
+    catalog = DrillCatalog(version_check_interval=0)
+    first = catalog.get_snapshot(db)
+    assert catalog.get_snapshot(db) is first
+
+    create_catalog_drills(db, CATALOG_DRILLS[3:])
+    bump_catalog_version(db)
+    db.commit()
+
+    second = catalog.get_snapshot(db)
+    assert second.version == first.version + 1
+    assert len(second) == len(CATALOG_DRILLS)
+
+
+@pytest.mark.asyncio
+async def test_repeated_preferences_reuse_cached_scores(db):
+    create_catalog_drills(db)
+    catalog = DrillCatalog()
+    catalog.load(db)
+    cache = ScoreCache()
+    generator = SessionGenerator(db, catalog=catalog, cache=cache)
+
+    await generator.generate_session(make_preferences())
+    # Same preferences written differently compile to the same fingerprint
+    await generator.generate_session(make_preferences(
+        available_equipment=["cones", "ball"],
+        target_skills=[{"category": "Dribbling", "sub_skills": ["ball_mastery", "close_control"]}]
+    ))
+    await generator.generate_session(make_preferences(difficulty="advanced"))
+
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_score_cache_is_dropped_when_catalog_reloads(db):
+    create_catalog_drills(db, CATALOG_DRILLS[:3])
+    catalog = DrillCatalog(version_check_interval=0)
+    cache = ScoreCache()
+    generator = SessionGenerator(db, catalog=catalog, cache=cache)
+    await generator.generate_session(make_preferences())
+
+    create_catalog_drills(db, CATALOG_DRILLS[3:])
+    bump_catalog_version(db)
+    db.commit()
+    await generator.generate_session(make_preferences())
+
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert len(cache) == 1
+
+
+def cached_scores(name, rows=1):
+    return SimpleNamespace(name=name, features=SimpleNamespace(size=rows))
+
+
+def test_score_cache_evicts_least_recently_used():
+    cache = ScoreCache(max_entries=2)
+    snapshot = object()
+    for key in ("a", "b", "a", "c"):
+        cache.get_or_compute(snapshot, key, lambda: cached_scores(key))
+
+    assert cache.stats()["hits"] == 1
+    assert cache.get_or_compute(snapshot, "a", lambda: cached_scores("recomputed")).name == "a"
+    assert cache.get_or_compute(snapshot, "b", lambda: cached_scores("recomputed")).name == "recomputed"
+
+
+def test_score_cache_is_bounded_by_candidate_rows():
+    cache = ScoreCache(max_rows=100)
+    snapshot = object()
+    for key in ("a", "b", "c"):
+        cache.get_or_compute(snapshot, key, lambda: cached_scores(key, rows=40))
+
+    # "a" was evicted to keep the cache within 100 rows; an entry over the budget is not stored
+    assert [len(cache), cache.stats()["rows"]] == [2, 80]
+    cache.get_or_compute(snapshot, "huge", lambda: cached_scores("huge", rows=101))
+    assert [len(cache), cache.stats()["rows"]] == [2, 80]
+    assert cache.get_or_compute(snapshot, "a", lambda: cached_scores("recomputed", rows=40)).name == "recomputed"
+
+
+@pytest.mark.asyncio
+async def test_session_is_replaced_in_one_transaction(db, query_counter):
+    create_catalog_drills(db)
+    user = User(email="persist@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    catalog = DrillCatalog()
+    catalog.load(db)
+    generator = SessionGenerator(db, catalog=catalog, cache=ScoreCache())
+    first = await generator.generate_session(make_preferences(user_id=user_id))
+    first_id = first.id
+    query_counter.clear()
+
+    session = await generator.generate_session(make_preferences(user_id=user_id, duration=45))
+
+    # UPDATE ... RETURNING, bulk DELETE and one multi-row INSERT ... RETURNING
+    statements = [s.split()[0].upper() for s in query_counter]
+    assert statements == ["UPDATE", "DELETE", "INSERT"]
+    assert session.id == first_id
+    assert session.total_duration <= 45
+    positions = [osd.position for osd in session.ordered_drills]
+    assert positions == list(range(len(positions)))
+    assert all(osd.id is not None for osd in session.ordered_drills)
+    assert db.query(TrainingSession).count() == 1
+    assert db.query(OrderedSessionDrill).count() == len(positions)
+
+
+@pytest.mark.asyncio
+async def test_first_session_for_user_is_created(db, query_counter):
+    create_catalog_drills(db)
+    user = User(email="first@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    catalog = DrillCatalog()
+    catalog.load(db)
+    query_counter.clear()
+
+    session = await SessionGenerator(db, catalog=catalog, cache=ScoreCache()).generate_session(make_preferences(user_id=user_id))
+
+    statements = [s.split()[0].upper() for s in query_counter]
+    assert statements == ["UPDATE", "INSERT", "INSERT"]
+    assert session.user_id == user_id
+    assert len(session.ordered_drills) == db.query(OrderedSessionDrill).filter_by(session_id=session.id).count()
+
+
+@pytest.mark.asyncio
+async def test_seeded_generation_is_reproducible(db):
+    create_catalog_drills(db)
+    catalog = DrillCatalog()
+    catalog.load(db)
+
+    def drill_plan(session):
+        return [(str(osd.drill_uuid), osd.duration) for osd in session.ordered_drills]
+
+    plans = []
+    for _ in range(2):
+        generator = SessionGenerator(db, catalog=catalog, cache=ScoreCache(), rng=42)
+        plans.append([
+            drill_plan(await generator.generate_ephemeral_session(make_preferences(duration=duration)))
+            for duration in (15, 30, 60)
+        ])
+
+    assert plans[0] == plans[1]
+    generator = SessionGenerator(db, catalog=catalog, rng=42)
+    await generator.generate_ephemeral_session(make_preferences())
+    assert set(generator.metrics.stages) == {"catalog", "score", "select", "balance", "adjust"}
+
+
+@pytest.mark.asyncio
+async def test_generation_metrics_are_emitted(db):
+    create_catalog_drills(db)
+    user = User(email="metrics@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    catalog = DrillCatalog()
+    catalog.load(db)
+    sink = InMemoryMetricsSink()
+    generator = SessionGenerator(db, catalog=catalog, cache=ScoreCache(), metrics_sink=sink)
+
+    session = await generator.generate_session(make_preferences(user_id=user_id))
+    await generator.generate_ephemeral_session(make_preferences(user_id=user_id))
+
+    persisted, ephemeral = sink.records
+    assert persisted.mode == "persisted"
+    assert list(persisted.stages) == ["catalog", "score", "select", "balance", "adjust", "persist"]
+    assert persisted.total_seconds >= sum(persisted.stages.values())
+    assert persisted.catalog_size == len(catalog.get_snapshot(db))
+    assert persisted.drills_scored > 0 and not persisted.score_cache_hit
+    assert persisted.drills_in_session == len(session.ordered_drills)
+    assert persisted.rows_written == 1 + len(session.ordered_drills)
+    assert persisted.queries == 3
+    # Same preferences: the second generation reuses the cached scores and writes nothing
+    assert ephemeral.mode == "ephemeral"
+    assert ephemeral.score_cache_hit and ephemeral.drills_scored == 0
+    assert ephemeral.queries == 0 and ephemeral.rows_written == 0
+    assert "queries=3" in persisted.header_value()
+
+
+def test_query_count_spans_commits_and_sinks_must_emit(db):
+    with count_queries(db) as queries:
+        db.execute(text("SELECT 1"))
+        db.commit()
+        db.execute(text("SELECT 1"))
+    assert queries.count == 2
+    with pytest.raises(TypeError):
+        MetricsSink()
+
+
+@pytest.mark.asyncio
+async def test_plan_scores_once_and_never_repeats_drills(db, query_counter):
+    create_catalog_drills(db)
+    user = User(email="plan@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    catalog = DrillCatalog()
+    catalog.load(db)
+    cache = ScoreCache()
+    generator = SessionGenerator(db, catalog=catalog, cache=cache, rng=3)
+    current = await generator.generate_session(make_preferences(user_id=user_id, duration=15))
+    query_counter.clear()
+
+    plan = await generator.generate_plan(make_preferences(user_id=user_id, duration=15), days=3)
+    statements = [s.split()[0].upper() for s in query_counter]
+    assert statements == ["DELETE", "DELETE", "INSERT", "INSERT"]
+
+    assert cache.misses == 2  # the current session, then the whole plan
+    assert [session.plan_day for session in plan] == [0, 1, 2]
+    drill_uuids = [osd.drill_uuid for session in plan for osd in session.ordered_drills]
+    assert drill_uuids and len(drill_uuids) == len(set(drill_uuids))
+    assert all(session.total_duration <= 15 for session in plan)
+
+    # A new plan replaces the previous one and leaves the current session alone
+    await generator.generate_plan(make_preferences(user_id=user_id, duration=15), days=2)
+    assert db.query(TrainingSession).filter(TrainingSession.plan_day.isnot(None)).count() == 2
+    assert db.query(TrainingSession).filter(TrainingSession.plan_day.is_(None)).one().id == current.id
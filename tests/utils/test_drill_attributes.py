@@ -0,0 +1,46 @@
+"""
+Tests for the enum-indexed drill attribute bitmasks
+"""
+import uuid
+from models import SessionPreferences
+from services.drill_catalog import CatalogDrill
+from utils.drill_attributes import EQUIPMENT_BITS, LOCATION_BITS, OTHER, encode
+from utils.drill_scorer import DrillScorer
+
+
+def catalog_drill(equipment, locations=None, styles=None):
+    return CatalogDrill(
+        id=1, uuid=uuid.UUID(int=1), title="Drill", description="", category_id=None, category_name=None,
+        duration=10, intensity="medium", training_styles=styles, type="time_based", sets=None, reps=None,
+        rest=None, equipment=equipment, suitable_locations=locations, difficulty="beginner", instructions=[],
+        tips=[], common_mistakes=[], progression_steps=[], variations=[], video_url=None, thumbnail_url=None
+    )
+
+
+def test_values_are_canonicalized_into_enum_bits():
+    assert encode(["BALL", " ball", "Cones"], EQUIPMENT_BITS) == EQUIPMENT_BITS["ball"] | EQUIPMENT_BITS["cones"]
+    assert encode(["ladder", None], EQUIPMENT_BITS) == OTHER
+    assert encode(["Soccer ball", "training_cones", "2 cones"], EQUIPMENT_BITS) == (
+        EQUIPMENT_BITS["ball"] | EQUIPMENT_BITS["cones"]
+    )
+    assert encode(None, LOCATION_BITS) == encode([], LOCATION_BITS) == 0
+
+    drill = catalog_drill(["BALL"], ["Backyard"], ["MEDIUM_INTENSITY"])
+    assert drill.equipment_bits == EQUIPMENT_BITS["ball"]
+    assert drill.location_bits == LOCATION_BITS["backyard"]
+
+
+def test_equipment_rules_ignore_casing():
+    scorer = DrillScorer(SessionPreferences(
+        duration=30, available_equipment=["Ball"], training_style="medium_intensity",
+        training_location="backyard", difficulty="beginner", target_skills=[]
+    ))
+
+    def equipment_score(equipment):
+        return scorer._score_equipment(catalog_drill(equipment).equipment_bits)
+
+    assert equipment_score(["ball"]) == equipment_score(["BALL"]) == 0.8
+    assert equipment_score(["ball", "cones"]) == equipment_score(["BALL", "CONES"]) == 0.6
+    assert equipment_score(["ball", "goals"]) == 0.0
+    assert equipment_score(["ball", "ladder"]) == 0.0
+    assert scorer.score_drill(catalog_drill([], ["BACKYARD"], ["Medium_Intensity"]))["location"] == scorer.weights["location"]
@@ -0,0 +1,58 @@
+"""
+Tests for the drill attribute index used to prefilter candidates
+"""
+import random
+import numpy as np
+from models import SessionPreferences
+from utils.drill_index import DrillAttributeIndex
+from utils.drill_scorer import CompiledPreferences
+from utils.vectorized_scorer import DrillFeatureMatrix, VectorizedDrillScorer, SCORE_COMPONENTS
+from tests.utils.test_drill_scorer import make_drill, PROFILES
+
+
+def build(count=300, seed=23):
+    rng = random.Random(seed)
+    features = DrillFeatureMatrix([make_drill(rng, i) for i in range(count)])
+    return features, DrillAttributeIndex(features)
+
+
+def test_candidates_satisfy_every_filter():
+    features, index = build()
+    compiled = CompiledPreferences.from_preferences(SessionPreferences(**PROFILES[0]))
+
+    rows = index.candidates(compiled, 1)
+
+    assert 0 < len(rows) < features.size
+    for i in rows:
+        drill = features.drills[i]
+        primary = next(f for f in drill.skill_focus if f.is_primary)
+        assert primary.category in {"dribbling", "passing"}
+        assert "goals" not in {item.lower() for item in drill.equipment}
+        assert drill.duration is None or drill.duration <= 30
+        assert not drill.suitable_locations or "backyard" in drill.suitable_locations
+        assert (drill.difficulty or "").lower() != "advanced"
+
+
+def test_candidates_widen_until_enough_drills():
+    features, index = build()
+    compiled = CompiledPreferences.from_preferences(SessionPreferences(**PROFILES[0]))
+    strict = index.candidates(compiled, 1)
+
+    widened = index.candidates(compiled, len(strict) + 1)
+    assert len(widened) > len(strict)
+    assert set(strict) <= set(widened)
+
+    assert len(index.candidates(compiled, features.size + 1)) == features.size
+
+
+def test_take_scores_match_full_matrix():
+    features, index = build()
+    preferences = SessionPreferences(**PROFILES[1])
+    scorer = VectorizedDrillScorer(preferences)
+    rows = index.candidates(scorer.compiled, 1)
+
+    full = scorer.score_components(features)
+    subset = scorer.score_components(features.take(rows))
+
+    for key in SCORE_COMPONENTS:
+        np.testing.assert_allclose(subset[key], full[key][rows])
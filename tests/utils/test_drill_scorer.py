@@ -0,0 +1,189 @@
+"""
+Tests for drill scoring
+"""
+import random
+import uuid
+import numpy as np
+import pytest
+from models import SessionPreferences
+from services.drill_catalog import CatalogDrill, CatalogSkillFocus
+from utils.drill_scorer import DrillScorer, CompiledPreferences
+from utils.vectorized_scorer import DrillFeatureMatrix, VectorizedDrillScorer, SCORE_COMPONENTS
+
+CATEGORIES = {
+    "passing": ["short_passing", "long_passing", "wall_passing"],
+    "dribbling": ["ball_mastery", "close_control", "speed_dribbling"],
+    "shooting": ["power", "finishing"],
+    "first_touch": ["ground_control", "aerial_control"],
+}
+EQUIPMENT = ["ball", "BALL", "cones", "CONES", "wall", "WALL", "goals", "GOALS"]
+LOCATIONS = ["full_field", "small_field", "backyard", "small_room"]
+STYLES = ["low_intensity", "MEDIUM_INTENSITY", "high_intensity", None]
+INTENSITIES = ["low", "medium", "HIGH", "high_intensity", "extreme", None]
+DIFFICULTIES = ["beginner", "Intermediate", "advanced", "expert", None]
+
+
+def make_drill(rng: random.Random, idx: int) -> CatalogDrill:
+    """A drill with random (including messy) attribute values"""
+    skill_focus = []
+    if rng.random() > 0.05:
+        category = rng.choice(list(CATEGORIES))
+        skill_focus.append(CatalogSkillFocus(category, rng.choice(CATEGORIES[category]), True))
+    for _ in range(rng.randint(0, 3)):
+        category = rng.choice(list(CATEGORIES))
+        skill_focus.append(CatalogSkillFocus(category, rng.choice(CATEGORIES[category] + [None]), False))
+    return CatalogDrill(
+        id=idx, uuid=uuid.UUID(int=idx), title=f"Drill {idx}", description="", category_id=None,
+        category_name=None, duration=rng.choice([None, 0, 2, 5, 10, 15, 20, 40]),
+        intensity=rng.choice(INTENSITIES),
+        training_styles=rng.sample(STYLES, rng.randint(0, 2)), type="time_based",
+        sets=None, reps=None, rest=None,
+        equipment=rng.sample(EQUIPMENT, rng.randint(0, 3)),
+        suitable_locations=rng.sample(LOCATIONS, rng.randint(0, 2)),
+        difficulty=rng.choice(DIFFICULTIES), instructions=[], tips=[], common_mistakes=[],
+        progression_steps=[], variations=[], video_url=None, thumbnail_url=None,
+        skill_focus=tuple(skill_focus)
+    )
+
+
+PROFILES = [
+    dict(duration=30, available_equipment=["ball", "cones"], training_style="medium_intensity",
+         training_location="backyard", difficulty="beginner",
+         target_skills=[{"category": "dribbling", "sub_skills": ["close_control", "ball_mastery"]},
+                        {"category": "passing", "sub_skills": ["wall_passing"]}]),
+    dict(duration=15, available_equipment=["BALL"], training_style="high_intensity",
+         training_location="small_room", difficulty="advanced",
+         target_skills=[{"category": "First_Touch", "sub_skills": "Ground_Control"}]),
+    dict(duration=90, available_equipment=["ball", "cones", "goals", "wall"], training_style=None,
+         training_location="full_field", difficulty=None, target_skills=[]),
+    dict(duration=60, available_equipment=[], training_style="low_intensity",
+         training_location="small_field", difficulty="professional",
+         target_skills=[{"category": "shooting", "sub_skills": ["power"]},
+                        {"category": "shooting", "sub_skills": ["finishing"]}, "passing"]),
+]
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_vectorized_scores_match_drill_scorer(profile):
+    rng = random.Random(7)
+    drills = [make_drill(rng, i) for i in range(300)]
+    preferences = SessionPreferences(**profile)
+
+    scalar = DrillScorer(preferences)
+    scalar.jitter_factor = 0
+    vectorized = VectorizedDrillScorer(preferences)
+    vectorized.jitter_factor = 0
+
+    expected = [scalar.score_drill(drill) for drill in drills]
+    actual = vectorized.score_totals(DrillFeatureMatrix(drills))
+
+    for i, scores in enumerate(expected):
+        for key in SCORE_COMPONENTS + ("total",):
+            assert actual[key][i] == pytest.approx(scores[key], abs=1e-12), (i, key)
+
+
+def test_vectorized_rank_drills_is_sorted_and_complete():
+    rng = random.Random(11)
+    drills = [make_drill(rng, i) for i in range(50)]
+    ranked = VectorizedDrillScorer(SessionPreferences(**PROFILES[0])).rank_drills(drills)
+
+    assert len(ranked) == len(drills)
+    totals = [entry["total_score"] for entry in ranked]
+    assert totals == sorted(totals, reverse=True)
+    assert {entry["drill"].id for entry in ranked} == {drill.id for drill in drills}
+    assert set(ranked[0]["scores"]) == set(SCORE_COMPONENTS) | {"total"}
+
+
+def test_compiled_preferences_merges_target_skills():
+    compiled = CompiledPreferences.from_preferences(SessionPreferences(**PROFILES[3]))
+
+    assert compiled.sub_skills_by_category == {"shooting": frozenset({"power", "finishing"})}
+    assert compiled.first_sub_skills_by_category == {"shooting": frozenset({"power"})}
+    assert compiled.intensity_level == "low"
+    assert compiled.difficulty_index is None
+    assert compiled.available_equipment == frozenset()
+    assert not compiled.has_ball
+
+
+def test_top_k_matches_full_ranking_prefix():
+    rng = random.Random(13)
+    features = DrillFeatureMatrix([make_drill(rng, i) for i in range(400)])
+    scorer = VectorizedDrillScorer(SessionPreferences(**PROFILES[0]))
+
+    scorer.rng = np.random.default_rng(5)
+    full = scorer.rank_drills(features)
+    scorer.rng = np.random.default_rng(5)
+    top = scorer.rank_drills(features, top_k=15)
+
+    assert [entry["drill"].id for entry in top] == [entry["drill"].id for entry in full[:15]]
+    assert top[0]["scores"] == full[0]["scores"]
+
+
+def test_select_drills_returns_pool_and_per_skill_top_k():
+    rng = random.Random(17)
+    features = DrillFeatureMatrix([make_drill(rng, i) for i in range(400)])
+    scorer = VectorizedDrillScorer(SessionPreferences(**PROFILES[0]))
+
+    scorer.rng = np.random.default_rng(9)
+    full = scorer.rank_drills(features)
+    scorer.rng = np.random.default_rng(9)
+    pool, by_skill = scorer.select_drills(features, 20, {"dribbling": 3, "passing": 2, "juggling": 1})
+
+    assert [entry["drill"].id for entry in pool] == [entry["drill"].id for entry in full[:20]]
+    assert set(by_skill) == {"dribbling", "passing"}
+    for category, limit in (("dribbling", 3), ("passing", 2)):
+        expected = [
+            entry["drill"].id for entry in full
+            if any(f.is_primary and f.category == category for f in entry["drill"].skill_focus)
+        ][:limit]
+        assert [entry["drill"].id for entry in by_skill[category]] == expected
+
+
+def test_drill_scorer_top_k_uses_heap_selection():
+    rng = random.Random(19)
+    drills = [make_drill(rng, i) for i in range(60)]
+    scorer = DrillScorer(SessionPreferences(**PROFILES[1]))
+    scorer.jitter_factor = 0
+
+    full = scorer.rank_drills(drills)
+    top = scorer.rank_drills(drills, top_k=5)
+
+    assert [entry["total_score"] for entry in top] == [entry["total_score"] for entry in full[:5]]
+
+
+def test_seeded_drill_scorer_jitter_is_reproducible():
+    rng = random.Random(29)
+    drills = [make_drill(rng, i) for i in range(30)]
+    preferences = SessionPreferences(**PROFILES[0])
+
+    first = [entry["total_score"] for entry in DrillScorer(preferences, rng=3).rank_drills(drills)]
+    second = [entry["total_score"] for entry in DrillScorer(preferences, rng=3).rank_drills(drills)]
+    vectorized = [VectorizedDrillScorer(preferences, rng=3).rank_drills(drills)[0]["total_score"] for _ in range(2)]
+
+    assert first == second
+    assert vectorized[0] == vectorized[1]
+
+
+def test_recent_drills_are_penalized_by_both_scorers():
+    rng = random.Random(31)
+    drills = [make_drill(rng, i) for i in range(60)]
+    recent = [str(drill.uuid) for drill in drills[::7]]
+    preferences = SessionPreferences(**PROFILES[0], recent_drill_uuids=recent)
+    features = DrillFeatureMatrix(drills)
+
+    scalar = DrillScorer(preferences)
+    scalar.jitter_factor = 0
+    vectorized = VectorizedDrillScorer(preferences)
+    vectorized.jitter_factor = 0
+    plain = VectorizedDrillScorer(SessionPreferences(**PROFILES[0]))
+    plain.jitter_factor = 0
+
+    totals = vectorized.score_totals(features)["total"]
+    baseline = plain.score_totals(features)["total"]
+    for i, drill in enumerate(drills):
+        penalty = scalar.recent_drill_penalty if str(drill.uuid) in recent else 0.0
+        assert totals[i] == pytest.approx(baseline[i] - penalty)
+        assert totals[i] == pytest.approx(scalar.score_drill(drill)["total"])
+    # Cached pre-jitter scores stay shared between users with and without recent drills
+    assert vectorized.compiled.fingerprint == plain.compiled.fingerprint
+    assert list(features.take(np.arange(7, 60)).rows_of(recent)) == [0, 7, 14, 21, 28, 35, 42, 49]
@@ -0,0 +1,66 @@
+"""
+Tests for the dynamic-programming duration fitter
+"""
+import itertools
+import random
+import time
+import pytest
+from utils.duration_fitter import DrillSlot, fit_durations
+
+
+def random_slots(rng, count):
+    slots = []
+    for _ in range(count):
+        longest = rng.randint(3, 25)
+        slots.append(DrillSlot(score=rng.uniform(0, 5), min_duration=rng.randint(1, longest), max_duration=longest))
+    return slots
+
+
+def brute_force(slots, session_duration):
+    options = [[None] + list(range(slot.min_duration, slot.max_duration + 1)) for slot in slots]
+    best = 0.0
+    for durations in itertools.product(*options):
+        used = sum(d for d in durations if d)
+        if used <= session_duration:
+            best = max(best, sum(slot.value(d) for slot, d in zip(slots, durations) if d))
+    return best
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_fit_matches_exhaustive_search(seed):
+    rng = random.Random(seed)
+    slots = random_slots(rng, rng.randint(1, 4))
+    session_duration = rng.choice([15, 30, 45])
+
+    fit = fit_durations(slots, session_duration, time_budget=float("inf"))
+
+    assert fit.complete
+    assert fit.total_duration == sum(d for d in fit.durations if d) <= session_duration
+    for slot, duration in zip(slots, fit.durations):
+        assert duration is None or slot.min_duration <= duration <= slot.max_duration
+    assert fit.value == pytest.approx(brute_force(slots, session_duration))
+
+
+def test_fit_trims_before_dropping_drills():
+    slots = [DrillSlot(score=3.0, min_duration=5, max_duration=20)] * 3
+    fit = fit_durations(slots, 30)
+    assert all(fit.durations)
+    assert fit.total_duration == 30
+
+
+def test_first_drill_is_kept_when_nothing_fits():
+    fit = fit_durations([DrillSlot(score=1.0, min_duration=10, max_duration=20)], 5)
+    assert fit.durations == [5]
+
+
+def test_fit_stays_within_time_budget():
+    rng = random.Random(7)
+    slots = random_slots(rng, 7)
+    started = time.perf_counter()
+    fit = fit_durations(slots, 120)
+    assert time.perf_counter() - started < 0.05
+    assert fit.total_duration <= 120
+
+    partial = fit_durations(slots, 120, time_budget=0)
+    assert not partial.complete
+    assert partial.durations[1:] == [None] * 6
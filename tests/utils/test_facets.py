@@ -0,0 +1,32 @@
+"""
+Tests for search facet counts
+"""
+from models import Drill, DrillCategory
+from utils.drill_attributes import EQUIPMENT_BITS, encode
+from utils.facets import FacetCounts
+
+
+def test_equipment_facets_use_the_canonical_equipment_names():
+    counts = FacetCounts()
+    counts.add("passing", "Beginner", ["Soccer ball", "training_cones", "2 cones"])
+    counts.add("passing", "beginner", ["BALL", "soccer_ball", " Wall "])
+    counts.add("shooting", "ADVANCED", ["goal", "Training cones", "partner"])
+
+    facets = counts.as_dict()
+    assert facets["equipment"] == {"ball": 2, "cones": 2, "goals": 1, "partner": 1, "wall": 1}
+    assert facets["difficulty"] == {"beginner": 2, "advanced": 1}
+    assert facets["category"] == {"passing": 2, "shooting": 1}
+
+    # The buckets a drill is counted in are exactly the bits the equipment filter sees
+    raw = ["Soccer ball", "training_cones", "2 cones", "goal"]
+    single = FacetCounts()
+    single.add(None, None, raw)
+    assert encode(raw, EQUIPMENT_BITS) == sum(EQUIPMENT_BITS[name] for name in single.as_dict()["equipment"])
+
+
+def test_drill_rows_are_counted_by_their_category():
+    counts = FacetCounts()
+    counts.add_catalog_drill(Drill(category=DrillCategory(name="dribbling"), difficulty="Beginner", equipment=["ball"]))
+    counts.add_catalog_drill(Drill(difficulty="beginner", equipment=[]))
+
+    assert counts.as_dict() == {"category": {"dribbling": 1}, "difficulty": {"beginner": 2}, "equipment": {"ball": 1}}
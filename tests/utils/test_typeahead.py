@@ -0,0 +1,33 @@
+"""
+Tests for the in-memory autocomplete prefix index
+"""
+from utils.typeahead import TypeaheadEntry, TypeaheadIndex, search_indexes
+
+
+def entry(title, sub_skills=(), is_custom=False):
+    return TypeaheadEntry(uuid=title, title=title, category="passing", is_custom=is_custom, sub_skills=sub_skills)
+
+
+def test_ranks_title_prefix_then_title_word_then_sub_skill():
+    index = TypeaheadIndex([
+        entry("Wall Passes"),
+        entry("Pass and Move"),
+        entry("Triangle Passing", ("one_touch_passing",)),
+        entry("Rondo", ("passing_accuracy",)),
+        entry("Passing Gates"),
+    ])
+
+    assert [e.title for e in index.search("pass")] == [
+        "Pass and Move", "Passing Gates", "Triangle Passing", "Wall Passes", "Rondo"
+    ]
+    assert [e.title for e in index.search("pass", limit=2)] == ["Pass and Move", "Passing Gates"]
+    assert [e.title for e in index.search("acc PASS")] == ["Rondo"]
+    assert index.search("passx") == [] and index.search("  ") == []
+
+
+def test_merges_indexes_by_rank():
+    catalog = TypeaheadIndex([entry("Cone Weave"), entry("Dribble Box")])
+    custom = TypeaheadIndex([entry("Cone Sprints", is_custom=True)])
+
+    merged = search_indexes([catalog, custom], "cone")
+    assert [(e.title, e.is_custom) for e in merged] == [("Cone Sprints", True), ("Cone Weave", False)]
@@ -0,0 +1,82 @@
+"""
+drill_attributes.py
+Enum-indexed bitmasks for drill equipment, locations and training styles.
+
+Drill.equipment, suitable_locations and training_styles are JSON string lists
+with inconsistent casing and spelling ("BALL" vs "ball", "Soccer ball" vs
+"soccer_ball", "MEDIUM_INTENSITY" vs "medium_intensity"). Each value is
+canonicalized (stripped, lowercased, spaces as underscores, known aliases
+resolved) and mapped to one bit of the matching enum in models.py (Equipment,
+TrainingLocation, TrainingStyle); values outside the enum, including empty
+ones, set the OTHER bit, which no preference ever has. A drill's list becomes
+one small int, 0 only when the list is empty, so equipment availability,
+critical-equipment and location/style checks are single bitwise operations.
+"""
+
+from typing import Iterable, Mapping, Optional
+
+from models import Equipment, TrainingLocation, TrainingStyle
+
+
+def _enum_bits(enum) -> Mapping[str, int]:
+    return {member.value: 1 << position for position, member in enumerate(enum)}
+
+
+EQUIPMENT_BITS = _enum_bits(Equipment)
+LOCATION_BITS = _enum_bits(TrainingLocation)
+STYLE_BITS = _enum_bits(TrainingStyle)
+
+# Set for any value that is not a member of the enum (never matches a preference)
+OTHER = 1 << 15
+
+# Other spellings of enum values found in the drill files, after canonicalization
+ALIASES = {
+    "soccer_ball": Equipment.BALL.value,
+    "training_cones": Equipment.CONES.value,
+    "2_cones": Equipment.CONES.value,
+    "4_cones": Equipment.CONES.value,
+    "goal": Equipment.GOALS.value,
+    "wall_or_rebounder": Equipment.WALL.value,
+}
+
+BALL = EQUIPMENT_BITS[Equipment.BALL.value]
+# Equipment without which a drill cannot be run
+CRITICAL_EQUIPMENT = BALL | EQUIPMENT_BITS[Equipment.GOALS.value]
+# Equipment that can be substituted with household items
+ADAPTABLE_EQUIPMENT = EQUIPMENT_BITS[Equipment.CONES.value] | EQUIPMENT_BITS[Equipment.WALL.value]
+
+
+def canonical(value) -> Optional[str]:
+    """Canonical spelling of an attribute value ("Soccer ball" -> "ball"); None if it is not a non-empty string"""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    key = "_".join(value.strip().lower().split())
+    return ALIASES.get(key, key)
+
+
+def encode(values: Optional[Iterable[str]], bits: Mapping[str, int]) -> int:
+    """Bitmask of a list of attribute values (0 for None or an empty list)"""
+    mask = 0
+    for value in values or ():
+        mask |= bits.get(canonical(value), OTHER)
+    return mask
+
+
+def preference_bit(value: Optional[str], bits: Mapping[str, int]) -> int:
+    """Bit of a single preference value (0 if unset or not in the enum)"""
+    return bits.get(canonical(value), 0)
+
+
+def attribute_masks(drill) -> tuple:
+    """
+    (equipment, location, style) bitmasks of a drill. Catalog drills carry them
+    precomputed; they are encoded on the fly for Drill rows.
+    """
+    equipment = getattr(drill, "equipment_bits", None)
+    if equipment is not None:
+        return equipment, drill.location_bits, drill.style_bits
+    return (
+        encode(drill.equipment, EQUIPMENT_BITS),
+        encode(drill.suitable_locations, LOCATION_BITS),
+        encode(drill.training_styles, STYLE_BITS),
+    )
@@ -0,0 +1,117 @@
+"""
+drill_index.py
+Inverted indexes over a drill catalog used to prefilter drills before scoring.
+
+Most drills score near zero for a given user because they need critical
+equipment the user does not have, train a skill the user did not pick, or
+run longer than the session. DrillAttributeIndex maps primary skill category
+and difficulty to the catalog rows that carry them and tests required
+equipment and location against the catalog's attribute bitmasks, so
+generation can intersect a few row sets and score only the candidates. When
+the intersection is too small the filters are relaxed one at a time (see
+WIDENING_STEPS) until enough drills remain.
+"""
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from utils.drill_attributes import CRITICAL_EQUIPMENT
+from utils.drill_scorer import CompiledPreferences
+from utils.vectorized_scorer import DrillFeatureMatrix, NO_VALUE, UNKNOWN
+
+# Filters applied to the candidate set, most to least selective. Each step drops one.
+WIDENING_STEPS = (
+    ("category", "equipment", "duration", "location", "difficulty"),
+    ("category", "equipment", "duration", "location"),
+    ("category", "equipment", "duration"),
+    ("category", "equipment"),
+    ("equipment",),
+    (),
+)
+
+
+def _rows(rows: List[int]) -> np.ndarray:
+    return np.array(rows, dtype=np.intp)
+
+
+class DrillAttributeIndex:
+    """
+    Attribute -> catalog rows indexes for one DrillFeatureMatrix.
+
+    Row numbers are positions in the feature matrix (and therefore in the
+    catalog snapshot), so candidate rows can be passed to DrillFeatureMatrix.take.
+    Equipment and location filters are bitwise tests on the matrix's attribute
+    bitmasks and need no index of their own.
+    """
+
+    def __init__(self, features: DrillFeatureMatrix):
+        self.size = features.size
+        by_category: Dict[str, List[int]] = {}
+
+        categories = {idx: name for name, idx in features.category_vocab.ids.items()}
+        for i in np.flatnonzero(features.has_primary).tolist():
+            by_category.setdefault(categories[features.primary_category[i]], []).append(i)
+
+        self.by_category = {key: _rows(rows) for key, rows in by_category.items()}
+        self.equipment_bits = features.equipment_bits
+        self.location_bits = features.location_bits
+        # Drills with no or an unrecognised difficulty are indexed under their marker
+        self.by_difficulty = {
+            int(level): np.flatnonzero(features.difficulty == level)
+            for level in np.unique(features.difficulty)
+        }
+        self.duration = features.duration
+
+    def _mask(self, row_sets: Iterable[np.ndarray]) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        for rows in row_sets:
+            mask[rows] = True
+        return mask
+
+    def filter_masks(self, compiled: CompiledPreferences) -> Dict[str, np.ndarray]:
+        """Boolean mask over the catalog for every filter in WIDENING_STEPS"""
+        masks = {}
+
+        # Primary skill in one of the target categories (no filter without targets)
+        if compiled.target_categories:
+            masks["category"] = self._mask(
+                self.by_category[category] for category in compiled.target_categories if category in self.by_category
+            )
+
+        # Exclude drills that need critical equipment the user does not have
+        missing = CRITICAL_EQUIPMENT & ~compiled.available_equipment_bits
+        masks["equipment"] = (self.equipment_bits & np.uint16(missing)) == 0
+
+        # Drills no longer than the session (unknown durations are kept)
+        if compiled.duration:
+            with np.errstate(invalid="ignore"):
+                masks["duration"] = ~(self.duration > compiled.duration)
+
+        # Suitable for the user's location, or not tied to any location
+        masks["location"] = (self.location_bits == 0) | ((self.location_bits & np.uint16(compiled.location_bit)) != 0)
+
+        # Within one level of the user's difficulty, or without a recognised difficulty
+        if compiled.difficulty_index is not None:
+            levels = {NO_VALUE, UNKNOWN, compiled.difficulty_index - 1, compiled.difficulty_index, compiled.difficulty_index + 1}
+            masks["difficulty"] = self._mask(rows for level, rows in self.by_difficulty.items() if level in levels)
+
+        return masks
+
+    def candidates(self, compiled: CompiledPreferences, min_candidates: int) -> np.ndarray:
+        """
+        Catalog rows worth scoring for these preferences, in catalog order.
+
+        Starts from the intersection of every filter and widens (see WIDENING_STEPS)
+        until at least min_candidates rows remain; the last step is the whole catalog.
+        """
+        masks = self.filter_masks(compiled)
+        for step in WIDENING_STEPS:
+            mask = np.ones(self.size, dtype=bool)
+            for name in step:
+                if name in masks:
+                    mask &= masks[name]
+            rows = np.flatnonzero(mask)
+            if rows.size >= min_candidates:
+                return rows
+        return rows
@@ -0,0 +1,47 @@
+"""
+drill_response.py
+The DrillResponse dict shape shared by the API and the drill catalog.
+
+build_drill_response works on anything with the Drill attribute names: Drill
+rows, CatalogDrill copies and merged search rows. Skill focus is passed in so
+callers can load it in bulk (router_utils.load_skill_focus) or take it from
+the catalog.
+"""
+
+
+def build_drill_response(drill, primary_skill, secondary_skills) -> dict:
+    """DrillResponse dict of a drill; primary_skill may be None"""
+    return {
+        "uuid": str(drill.uuid),  # Use UUID as primary identifier
+        "title": drill.title,
+        "description": drill.description,
+        "type": drill.type,
+        "duration": drill.duration,
+        "sets": drill.sets,
+        "reps": drill.reps,
+        "rest": drill.rest,
+        "equipment": drill.equipment,
+        "suitable_locations": drill.suitable_locations,
+        "intensity": drill.intensity,
+        "training_styles": drill.training_styles,
+        "difficulty": drill.difficulty,
+        "primary_skill": {
+            "category": primary_skill.category,
+            "sub_skill": primary_skill.sub_skill
+        } if primary_skill else {},
+        "secondary_skills": [
+            {
+                "category": skill.category,
+                "sub_skill": skill.sub_skill
+            }
+            for skill in secondary_skills
+        ],
+        "instructions": drill.instructions,
+        "tips": drill.tips,
+        "common_mistakes": drill.common_mistakes,
+        "progression_steps": drill.progression_steps,
+        "variations": drill.variations,
+        "video_url": drill.video_url,
+        "thumbnail_url": drill.thumbnail_url,
+        "is_custom": drill.is_custom  # ✅ NEW: Custom drill identifier (Boolean)
+    }
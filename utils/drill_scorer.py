@@ -1,19 +1,137 @@
-from typing import List, Dict, Any
+from dataclasses import dataclass
+from typing import List, Dict, Any, FrozenSet, Optional, Union
 from models import Drill, SessionPreferences, DrillSkillFocus
+from utils.drill_attributes import (
+    ADAPTABLE_EQUIPMENT, BALL, CRITICAL_EQUIPMENT, EQUIPMENT_BITS, LOCATION_BITS, STYLE_BITS,
+    OTHER, attribute_masks, encode, preference_bit
+)
 from db import SessionLocal
+import heapq
 import random
 import logging
 
 logging.basicConfig(level=logging.INFO)
 
+DIFFICULTY_LEVELS = ["beginner", "intermediate", "advanced"]
+
+# Map intensity levels to their variations
+INTENSITY_VARIATIONS = {
+    "low": ["LOW_INTENSITY", "low_intensity", "low"],
+    "medium": ["MEDIUM_INTENSITY", "medium_intensity", "medium"],
+    "high": ["HIGH_INTENSITY", "high_intensity", "high"]
+}
+
+# Lowercased variation -> intensity level, for O(1) lookups
+INTENSITY_LEVEL_BY_VARIATION = {
+    variation.lower(): level
+    for level, variations in INTENSITY_VARIATIONS.items()
+    for variation in variations
+}
+
+
+@dataclass(frozen=True)
+class CompiledPreferences:
+    """
+    Everything DrillScorer derives from SessionPreferences, computed once per generation
+    so scoring a drill is only set and dict lookups.
+
+    sub_skills_by_category merges every target with the same category (a primary skill
+    matches if any of them lists its sub-skill), while first_sub_skills_by_category keeps
+    only the first such target, which is the one secondary skills are compared against.
+
+    recent_drills holds the UUIDs of drills the user completed recently (see
+    services/recent_drills.py). Their penalty is applied to the total, after any
+    cached components, so it is not part of the fingerprint.
+    """
+    duration: Optional[int]
+    training_location: Optional[str]
+    training_style: str                      # lowercased, "" if unset
+    intensity_level: Optional[str]           # "low" / "medium" / "high" derived from training_style
+    difficulty_index: Optional[int]          # index into DIFFICULTY_LEVELS, None if unknown
+    available_equipment: FrozenSet[str]
+    available_equipment_bits: int            # see utils/drill_attributes.py
+    location_bit: int
+    style_bit: int
+    has_ball: bool
+    has_target_skills: bool
+    target_categories: FrozenSet[str]
+    sub_skills_by_category: Dict[str, FrozenSet[str]]
+    first_sub_skills_by_category: Dict[str, FrozenSet[str]]
+    recent_drills: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def from_preferences(cls, preferences: SessionPreferences) -> "CompiledPreferences":
+        sub_skills_by_category: Dict[str, FrozenSet[str]] = {}
+        first_sub_skills_by_category: Dict[str, FrozenSet[str]] = {}
+        for target in preferences.target_skills or []:
+            if isinstance(target, dict) and "category" in target and "sub_skills" in target:
+                category = target["category"].lower()
+                sub_skills = target["sub_skills"] if isinstance(target["sub_skills"], list) else [target["sub_skills"]]
+                sub_skills = frozenset(sub.lower() for sub in sub_skills)
+                sub_skills_by_category[category] = sub_skills_by_category.get(category, frozenset()) | sub_skills
+                first_sub_skills_by_category.setdefault(category, sub_skills)
+
+        training_style = preferences.training_style.lower() if preferences.training_style else ""
+        difficulty = preferences.difficulty.lower() if preferences.difficulty else "beginner"
+        available_equipment = frozenset(preferences.available_equipment or [])
+        # Unknown items are dropped: the OTHER bit never counts as available
+        available_bits = encode(available_equipment, EQUIPMENT_BITS) & ~OTHER
+
+        return cls(
+            duration=preferences.duration,
+            training_location=preferences.training_location,
+            training_style=training_style,
+            intensity_level=INTENSITY_LEVEL_BY_VARIATION.get(training_style),
+            difficulty_index=DIFFICULTY_LEVELS.index(difficulty) if difficulty in DIFFICULTY_LEVELS else None,
+            available_equipment=available_equipment,
+            available_equipment_bits=available_bits,
+            location_bit=preference_bit(preferences.training_location, LOCATION_BITS),
+            style_bit=preference_bit(training_style, STYLE_BITS),
+            has_ball=bool(available_bits & BALL),
+            has_target_skills=bool(preferences.target_skills),
+            target_categories=frozenset(sub_skills_by_category),
+            sub_skills_by_category=sub_skills_by_category,
+            first_sub_skills_by_category=first_sub_skills_by_category,
+            recent_drills=frozenset(getattr(preferences, "recent_drill_uuids", None) or [])
+        )
+
+    @property
+    def fingerprint(self) -> tuple:
+        """
+        Hashable key of everything that affects pre-jitter scores; preferences that
+        compile to the same fingerprint score every drill identically.
+        """
+        def skills(by_category):
+            return tuple(sorted((category, tuple(sorted(subs))) for category, subs in by_category.items()))
+
+        return (
+            self.duration,
+            self.training_location,
+            self.training_style,
+            self.difficulty_index,
+            tuple(sorted(self.available_equipment)),
+            self.has_target_skills,
+            skills(self.sub_skills_by_category),
+            skills(self.first_sub_skills_by_category),
+        )
+
+
 class DrillScorer:
     """
     Scores drills based on how well they match user preferences and requirements.
     Higher scores indicate better matches.
     """
 
-    def __init__(self, preferences: SessionPreferences):
+    DIFFICULTY_LEVELS = DIFFICULTY_LEVELS
+    INTENSITY_VARIATIONS = INTENSITY_VARIATIONS
+
+    def __init__(self, preferences: SessionPreferences, compiled: CompiledPreferences = None,
+                 rng: Union[int, random.Random, None] = None):
         self.preferences = preferences
+        # Source of jitter: a seed or random.Random makes scores reproducible (global random by default)
+        self.rng = random.Random(rng) if isinstance(rng, int) else (rng or random)
+        # Preference-derived lookups, built once per generation
+        self.compiled = compiled or CompiledPreferences.from_preferences(preferences)
         # Weights for different scoring factors (can be adjusted)
         self.weights = {
             "primary_skill": 8.0,     # Primary skill match is most important
@@ -25,48 +143,47 @@ class DrillScorer:
             "duration": 1.0,           # Duration fit
             "training_style": 2.0      # Training style match
         }
-        self.ADAPTABLE_EQUIPMENT = {"CONES", "WALL"}
-        self.CRITICAL_EQUIPMENT = {"GOALS", "BALL"}
         # Jitter factor (0.25 = ±25% variation) in drill score. Use this in MVP to avoid repeating session orders.
         self.jitter_factor = 0.25
+        # Subtracted from the total score of recently completed drills (about one secondary skill match)
+        self.recent_drill_penalty = 6.0
 
     def score_drill(self, drill: Drill) -> Dict[str, float]:
         """
         Calculate a detailed score for a drill based on how well it matches preferences.
         Returns a dictionary with individual scores and total.
         """
+        skill_scores = self._score_skills(drill.skill_focus)
+        equipment_bits, location_bits, style_bits = attribute_masks(drill)
+        weights = self.weights
         scores = {
-            key: self._calculate_score(key, drill) * weight
-            for key, weight in self.weights.items()
+            "primary_skill": skill_scores["primary"] * weights["primary_skill"],
+            "secondary_skill": skill_scores["secondary"] * weights["secondary_skill"],
+            "equipment": self._score_equipment(equipment_bits) * weights["equipment"],
+            "location": self._score_location(location_bits) * weights["location"],
+            "difficulty": self._score_difficulty(drill.difficulty) * weights["difficulty"],
+            "intensity": self._score_intensity(drill.intensity) * weights["intensity"],
+            "duration": self._score_duration(drill.duration) * weights["duration"],
+            "training_style": self._score_training_style(style_bits) * weights["training_style"]
         }
-        
+
         # Special handling for equipment score
         equipment_score = scores["equipment"] / self.weights["equipment"]
         if 0 < equipment_score < 1:
             scores["equipment"] *= 0.8
-        
+
         # Calculate total score
         total_score = sum(scores.values())
-        
+
+        # Push recently completed drills down the ranking (one set lookup)
+        if self.compiled.recent_drills and str(drill.uuid) in self.compiled.recent_drills:
+            total_score -= self.recent_drill_penalty
+
         # Apply jitter to total score
-        jitter = random.uniform(1 - self.jitter_factor, 1 + self.jitter_factor)
+        jitter = self.rng.uniform(1 - self.jitter_factor, 1 + self.jitter_factor)
         scores["total"] = total_score * jitter
-        
-        return scores
 
-    def _calculate_score(self, score_type: str, drill: Drill) -> float:
-        """Calculate individual score components"""
-        score_methods = {
-            "primary_skill": lambda: self._score_skills(drill.skill_focus)["primary"],
-            "secondary_skill": lambda: self._score_skills(drill.skill_focus)["secondary"],
-            "equipment": lambda: self._score_equipment(drill.equipment),
-            "location": lambda: self._score_location(drill.suitable_locations),
-            "difficulty": lambda: self._score_difficulty(drill.difficulty),
-            "intensity": lambda: self._score_intensity(drill.intensity),
-            "duration": lambda: self._score_duration(drill.duration),
-            "training_style": lambda: self._score_training_style(drill.training_styles)
-        }
-        return score_methods[score_type]()
+        return scores
 
     def _score_skills(self, skill_focus: List[DrillSkillFocus]) -> Dict[str, float]:
         """Score based on skill matches"""
@@ -78,51 +195,35 @@ class DrillScorer:
             primary_skill = next((focus for focus in skill_focus if focus.is_primary), None)
             if not primary_skill:
                 return {"primary": 0.0, "secondary": 0.0}  # No score if no primary skill found
-            
+
             # Handle case where target_skills might be None
-            if not self.preferences.target_skills:
+            if not self.compiled.has_target_skills:
                 return {"primary": 0.0, "secondary": 0.0}  # No score if no target skills
-            
+
             # Score primary skill - normalize to lowercase for comparison
             primary_category = primary_skill.category.lower() if primary_skill.category else ""
             primary_sub_skill = primary_skill.sub_skill.lower() if primary_skill.sub_skill else ""
-            
-            # Check if the drill's primary skill matches any target skill
+
+            # Exact match gets highest score, category match but no sub-skill match gets lower score
             primary_score = 0.0
-            for target in self.preferences.target_skills:
-                if isinstance(target, dict) and "category" in target and "sub_skills" in target:
-                    target_category = target["category"].lower()
-                    target_sub_skills = [sub.lower() for sub in target["sub_skills"]] if isinstance(target["sub_skills"], list) else [target["sub_skills"].lower()]
-                    
-                    # Exact match gets highest score
-                    if primary_category == target_category and primary_sub_skill in target_sub_skills:
-                        primary_score = 1.0
-                        break
-                    # Category match but no sub-skill match gets lower score
-                    elif primary_category == target_category:
-                        primary_score = 0.3
-            
-            # Score secondary skills
-            secondary_skills = [focus for focus in skill_focus if not focus.is_primary]
-            secondary_score = 0.0
-            if secondary_skills:
-                matches = 0
-                for skill in secondary_skills:
-                    for target in self.preferences.target_skills:
-                        if isinstance(target, dict) and "category" in target and "sub_skills" in target:
-                            target_category = target["category"].lower()
-                            target_sub_skills = [sub.lower() for sub in target["sub_skills"]] if isinstance(target["sub_skills"], list) else [target["sub_skills"].lower()]
-                            
-                            # Exact match gets higher score
-                            if (skill.category and skill.category.lower() == target_category and 
-                                skill.sub_skill and skill.sub_skill.lower() in target_sub_skills):
-                                matches += 1
-                                break
-                            # Category match but no sub-skill match gets lower score
-                            elif skill.category and skill.category.lower() == target_category:
-                                matches += 0.3
-                                break
-                secondary_score = min(matches * 0.5, 0.5)  # Cap at 0.5
+            target_sub_skills = self.compiled.sub_skills_by_category.get(primary_category)
+            if target_sub_skills is not None:
+                primary_score = 1.0 if primary_sub_skill in target_sub_skills else 0.3
+
+            # Score secondary skills against the first target with the same category
+            matches = 0
+            for skill in skill_focus:
+                if skill.is_primary or not skill.category:
+                    continue
+                target_sub_skills = self.compiled.first_sub_skills_by_category.get(skill.category.lower())
+                if target_sub_skills is None:
+                    continue
+                # Exact match gets higher score, category match but no sub-skill match gets lower score
+                if skill.sub_skill and skill.sub_skill.lower() in target_sub_skills:
+                    matches += 1
+                else:
+                    matches += 0.3
+            secondary_score = min(matches * 0.5, 0.5)  # Cap at 0.5
 
             return {"primary": primary_score, "secondary": secondary_score}
         except (AttributeError, TypeError, IndexError) as e:
@@ -130,9 +231,10 @@ class DrillScorer:
             logging.error(f"Error in skill scoring: {str(e)}")
             return {"primary": 0.0, "secondary": 0.0}
 
-    def _score_equipment(self, required_equipment: List[str]) -> float:
+    def _score_equipment(self, required_equipment: int) -> float:
         """
         Score based on equipment availability with flexibility for limited equipment scenarios.
+        required_equipment is the drill's equipment bitmask (utils/drill_attributes.py).
         Returns:
         - 1.0: All equipment available
         - 0.8: Only basic equipment needed (just ball)
@@ -141,105 +243,81 @@ class DrillScorer:
         """
         if not required_equipment:  # No equipment needed or None
             return 1.0
-            
+
         # Check if only ball is required
-        if set(required_equipment) == {"BALL"} or set(required_equipment) == {"ball"}:
-            return 0.8 if "ball" in self.preferences.available_equipment or "BALL" in self.preferences.available_equipment else 0.0
-            
+        if required_equipment == BALL:
+            return 0.8 if self.compiled.has_ball else 0.0
+
         # Check available equipment
-        missing_equipment = set(required_equipment) - set(self.preferences.available_equipment)
+        missing_equipment = required_equipment & ~self.compiled.available_equipment_bits
         if not missing_equipment:  # Has all equipment
             return 1.0
-            
+
         # Check if missing equipment is adaptable
-        if missing_equipment & self.CRITICAL_EQUIPMENT:  # Missing critical equipment
+        if missing_equipment & CRITICAL_EQUIPMENT:  # Missing critical equipment
             return 0.0
-            
+
         # If only missing adaptable equipment, give partial score
-        if missing_equipment <= self.ADAPTABLE_EQUIPMENT:
+        if not missing_equipment & ~ADAPTABLE_EQUIPMENT:
             return 0.6
-            
+
         return 0.0
 
-    def _score_location(self, suitable_locations: List[str]) -> float:
-        """Score based on location match"""
+    def _score_location(self, suitable_locations: int) -> float:
+        """Score based on location match (suitable_locations is the drill's location bitmask)"""
         if not suitable_locations:  # Handles both None and empty list
             return 0.5  # Default score for drills with no location specified
-        return float(self.preferences.training_location in suitable_locations)
+        return float(bool(suitable_locations & self.compiled.location_bit))
 
     def _score_difficulty(self, difficulty: str) -> float:
         """Score based on difficulty match"""
         if not difficulty:  # Handle None value
             return 0.5  # Default score for drills with no difficulty
-            
-        difficulties = ["beginner", "intermediate", "advanced"]
+
         try:
-            # Normalize difficulty to lowercase
-            normalized_difficulty = difficulty.lower()
-            normalized_preference = self.preferences.difficulty.lower() if self.preferences.difficulty else "beginner"
-            
-            if normalized_difficulty not in difficulties:
-                return 0.5  # Unknown difficulty, give average score
-                
-            drill_idx = difficulties.index(normalized_difficulty)
-            pref_idx = difficulties.index(normalized_preference)
-            
-            # Exact match gets full score
-            if drill_idx == pref_idx:
-                return 1.0
-                
-            # One level difference gets partial score
-            if abs(drill_idx - pref_idx) == 1:
-                return 0.5
-                
-            # Two level difference gets low score
-            return 0.2
-        except (ValueError, AttributeError):
-            return 0.5  # Default score for invalid difficulty values
+            drill_idx = DIFFICULTY_LEVELS.index(difficulty.lower())
+        except ValueError:
+            return 0.5  # Unknown difficulty, give average score
+
+        pref_idx = self.compiled.difficulty_index
+        if pref_idx is None:
+            return 0.5  # Default score for invalid preference values
+
+        # Exact match gets full score
+        if drill_idx == pref_idx:
+            return 1.0
+
+        # One level difference gets partial score
+        if abs(drill_idx - pref_idx) == 1:
+            return 0.5
+
+        # Two level difference gets low score
+        return 0.2
 
     def _score_intensity(self, intensity: str) -> float:
         """Score based on intensity match"""
         if not intensity:  # Handle None value
             return 0.5  # Default score for drills with no intensity
-        
-        # Map intensity levels to their variations
-        intensities = {
-            "low": ["LOW_INTENSITY", "low_intensity", "low"],
-            "medium": ["MEDIUM_INTENSITY", "medium_intensity", "medium"],
-            "high": ["HIGH_INTENSITY", "high_intensity", "high"]
-        }
-        
-        # Find which intensity level the drill belongs to
-        drill_intensity_level = None
-        for level, variations in intensities.items():
-            if intensity.lower() in [v.lower() for v in variations]:
-                drill_intensity_level = level
-                break
-        
-        # Find which intensity level the preference belongs to
-        pref_intensity_level = None
-        if self.preferences.training_style:
-            pref_style = self.preferences.training_style.lower()
-            for level, variations in intensities.items():
-                if pref_style in [v.lower() for v in variations]:
-                    pref_intensity_level = level
-                    break
-        
+
+        # Find which intensity level the drill and the preference belong to
+        drill_intensity_level = INTENSITY_LEVEL_BY_VARIATION.get(intensity.lower())
+        pref_intensity_level = self.compiled.intensity_level
+
         # Score based on match
         if drill_intensity_level and pref_intensity_level:
             return 1.0 if drill_intensity_level == pref_intensity_level else 0.5
-        
+
         return 0.5  # Default score if intensity levels can't be determined
 
     def _score_duration(self, duration: int) -> float:
         """Score how well the drill duration fits within session time"""
         if duration is None:
             return 0.5  # Default score for drills with no duration
-            
-        if duration > self.preferences.duration:
+
+        if duration > self.compiled.duration:
             return 0.0
-            
-        portion = duration / self.preferences.duration
+
+        portion = duration / self.compiled.duration
         if portion < 0.1:  # Too short
             return 0.5
         elif portion > 0.5:  # Too long
@@ -247,32 +325,30 @@ class DrillScorer:
         else:  # Just right
             return 1.0
 
-    def _score_training_style(self, training_styles: List[str]) -> float:
-        """Score based on training style match"""
+    def _score_training_style(self, training_styles: int) -> float:
+        """Score based on training style match (training_styles is the drill's style bitmask)"""
         if not training_styles:  # Handles both None and empty list
             return 0.5  # Default score for drills with no training style
-        
-        # Normalize training styles to lowercase for comparison
-        normalized_styles = [style.lower() if style else "" for style in training_styles]
-        normalized_preference = self.preferences.training_style.lower() if self.preferences.training_style else ""
-        
-        return float(normalized_preference in normalized_styles)
-
-    def rank_drills(self, drills: List[Drill]) -> List[Dict[str, Any]]:
+        return float(bool(training_styles & self.compiled.style_bit))
+
+    def rank_drills(self, drills: List[Drill], top_k: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Rank a list of drills based on their scores.
         Returns list of dicts with drill and score information, sorted by total score.
+        With top_k only the best top_k drills are kept (heap selection instead of a full sort).
         """
         # Score all drills first
-        scored_drills = [
+        scored_drills = (
             {
                 "drill": drill,
                 "scores": (scores := self.score_drill(drill)),
                 "total_score": scores["total"]
             }
             for drill in drills
-        ]
-        
+        )
+
+        if top_k is not None:
+            return heapq.nlargest(top_k, scored_drills, key=lambda x: x["total_score"])
+
         # Sort by total score
-        return sorted(scored_drills, key=lambda x: x["total_score"], reverse=True) 
-    
\ No newline at end of file
+        return sorted(scored_drills, key=lambda x: x["total_score"], reverse=True)
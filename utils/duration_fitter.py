@@ -0,0 +1,97 @@
+"""
+duration_fitter.py
+Chooses the drills of a session and their durations in one pass.
+
+Given the balanced drill selection (at most 7 drills), each with a score and a
+range of effective durations, fit_durations solves a small knapsack by dynamic
+programming over whole minutes: it picks the drills and the duration of each
+that maximize the session value without exceeding the session length. A drill
+earns BASE_VALUE of its score just for being included and the rest in
+proportion to how much of its full duration it keeps, so the fitter prefers
+trimming long drills over dropping good ones, and keeps longer durations for
+higher-scored drills.
+
+The search has a hard time budget. Drills are added to the DP in selection
+order, so if the budget runs out the drills not yet considered are left out
+and the result is still the best fit of the ones that were.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+# Share of a drill's value earned by including it at all (the rest scales with duration)
+BASE_VALUE = 0.5
+# Floor for drill scores so low-scored drills still fill unused time
+MIN_SCORE = 0.01
+# Default wall-clock budget for one fit, in seconds
+TIME_BUDGET = 0.003
+
+
+@dataclass(frozen=True)
+class DrillSlot:
+    """One candidate drill: its score and the durations (minutes) it can run for"""
+    score: float
+    min_duration: int
+    max_duration: int
+
+    def value(self, duration: int) -> float:
+        return max(self.score, MIN_SCORE) * (BASE_VALUE + (1 - BASE_VALUE) * duration / self.max_duration)
+
+
+@dataclass
+class DurationFit:
+    durations: List[Optional[int]]  # per slot, None when the drill is left out
+    total_duration: int
+    value: float
+    complete: bool                  # False when the time budget stopped the search early
+
+
+def fit_durations(slots: Sequence[DrillSlot], session_duration: int,
+                  time_budget: float = TIME_BUDGET) -> DurationFit:
+    """
+    Pick drills and durations maximizing the total value within session_duration minutes.
+
+    At least one drill is kept: if no drill fits even at its shortest, the first
+    one runs for the whole session.
+    """
+    started = time.perf_counter()
+    budget = max(int(session_duration or 0), 0)
+    durations: List[Optional[int]] = [None] * len(slots)
+
+    # best[t]: highest value of a selection using exactly t minutes
+    best = np.full(budget + 1, -np.inf)
+    best[0] = 0.0
+    choices = []
+    complete = True
+    for i, slot in enumerate(slots):
+        if i and time.perf_counter() - started > time_budget:
+            complete = False
+            break
+        updated = best.copy()
+        choice = np.zeros(budget + 1, dtype=np.int16)
+        for duration in range(max(slot.min_duration, 1), min(slot.max_duration, budget) + 1):
+            candidate = best[:budget + 1 - duration] + slot.value(duration)
+            better = candidate > updated[duration:]
+            updated[duration:][better] = candidate[better]
+            choice[duration:][better] = duration
+        best = updated
+        choices.append(choice)
+
+    total = int(np.argmax(best))
+    value = float(best[total])
+    remaining = total
+    for i in range(len(choices) - 1, -1, -1):
+        duration = int(choices[i][remaining])
+        if duration:
+            durations[i] = duration
+            remaining -= duration
+
+    if total == 0 and slots:
+        first = slots[0]
+        durations[0] = max(min(first.max_duration, budget), 1)
+        total = durations[0]
+        value = first.value(total)
+    return DurationFit(durations=durations, total_duration=total, value=value, complete=complete)
@@ -0,0 +1,87 @@
+"""
+facets.py
+Facet counts (category, difficulty, equipment) for drill search results.
+
+The filter sheet shows how many results carry each category, difficulty and
+piece of equipment. FacetCounts tallies them in one pass over the matching
+drills. For default drills the pass runs over the in-memory catalog, and the
+counts for a search are kept in the snapshot's FacetCache, so they are reused
+until the catalog version changes (see services/drill_facets.py).
+"""
+
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Hashable, Iterable, Optional
+
+from utils.drill_attributes import canonical
+
+FACETS = ("category", "difficulty", "equipment")
+
+
+class FacetCounts:
+    """Number of drills per value of each facet"""
+
+    def __init__(self):
+        self.counts: Dict[str, Counter] = {facet: Counter() for facet in FACETS}
+
+    def add(self, category: Optional[str], difficulty: Optional[str], equipment: Optional[Iterable[str]]):
+        """
+        Count one drill. Difficulty is case-insensitive, as the filter is; equipment
+        is canonicalized like the equipment bitmasks ("Soccer ball" counts as "ball")
+        and each item counts once per drill.
+        """
+        if category:
+            self.counts["category"][category] += 1
+        if difficulty:
+            self.counts["difficulty"][difficulty.lower()] += 1
+        for item in set(filter(None, map(canonical, equipment or ()))):
+            self.counts["equipment"][item] += 1
+
+    def add_catalog_drill(self, drill):
+        """Count a CatalogDrill or Drill row by its drill category"""
+        if hasattr(drill, "category_name"):
+            category = drill.category_name
+        else:
+            category = drill.category.name if drill.category else None
+        self.add(category, drill.difficulty, drill.equipment)
+
+    def __add__(self, other: "FacetCounts") -> "FacetCounts":
+        total = FacetCounts()
+        for facet in FACETS:
+            total.counts[facet] = self.counts[facet] + other.counts[facet]
+        return total
+
+    def as_dict(self) -> Dict[str, Dict[str, int]]:
+        """{facet: {value: count}}, most common values first, ties alphabetical"""
+        return {
+            facet: dict(sorted(counter.items(), key=lambda item: (-item[1], item[0])))
+            for facet, counter in self.counts.items()
+        }
+
+
+class FacetCache:
+    """Thread-safe LRU of FacetCounts by search key"""
+
+    MAX_ENTRIES = 512
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._counts: "OrderedDict[Hashable, FacetCounts]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._counts)
+
+    def get(self, key: Hashable) -> Optional[FacetCounts]:
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is not None:
+                self._counts.move_to_end(key)
+            return counts
+
+    def put(self, key: Hashable, counts: FacetCounts):
+        with self._lock:
+            self._counts[key] = counts
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
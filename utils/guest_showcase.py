@@ -0,0 +1,84 @@
+"""
+guest_showcase.py
+The fixed set of drills shown to guest (signed-out) users.
+
+Guests see up to 4 drills from each featured category. The selection only
+depends on the catalog, so it is built once per DrillCatalogSnapshot
+(DrillCatalogSnapshot.guest_showcase) from drills already in memory, together
+with their encoded responses. /public/drills/limited and guest search with a
+high limit read it without touching the database; a new catalog version
+builds a new snapshot and with it a new showcase.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+from utils.json_fragments import JSONFragments
+from utils.skill_mapper import map_frontend_category_to_backend
+
+FEATURED_CATEGORIES = ["Passing", "Dribbling", "Shooting", "First Touch", "Defending", "Goalkeeping", "Fitness"]
+DRILLS_PER_CATEGORY = 4
+SHOWCASE_SIZE = len(FEATURED_CATEGORIES) * DRILLS_PER_CATEGORY  # 28
+
+
+class GuestShowcase:
+    """
+    Guest drills picked from a catalog (drills in id order) with their encoded responses.
+
+    drills holds the first DRILLS_PER_CATEGORY drills whose category name
+    contains each featured category. limited_drills is what /public/drills/limited
+    lists: the same drills, topped up with the first drills of the catalog when
+    some category is short.
+    """
+
+    def __init__(self, drills: Sequence, fragments: Dict[str, bytes]):
+        picks = []
+        for category_name in FEATURED_CATEGORIES:
+            backend_category = map_frontend_category_to_backend(category_name).lower()
+            matching = [drill for drill in drills if backend_category in (drill.category_name or "").lower()]
+            picks.extend(matching[:DRILLS_PER_CATEGORY])
+        self.drills = tuple(picks)
+
+        limited = list(picks)
+        if len(limited) < SHOWCASE_SIZE:
+            limited.extend(drills[:DRILLS_PER_CATEGORY])
+        self.limited_drills = tuple(limited)
+
+        self._fragments = {str(drill.uuid): fragments[str(drill.uuid)] for drill in limited}
+        self.limited_fragments = self.fragments(self.limited_drills)
+
+    def __len__(self):
+        return len(self.drills)
+
+    def fragments(self, drills: Sequence) -> JSONFragments:
+        """Encoded responses of showcase drills, in order"""
+        return JSONFragments(self._fragments[str(drill.uuid)] for drill in drills)
+
+    def search(self, query: str = "", category: Optional[str] = None,
+               difficulty: Optional[str] = None) -> List:
+        """
+        Showcase drills matching a guest search: query in the title or description,
+        category as the primary or a secondary skill category, and difficulty.
+        """
+        results = list(self.drills)
+        if query:
+            text = query.lower()
+            results = [
+                drill for drill in results
+                if text in (drill.title or "").lower() or text in (drill.description or "").lower()
+            ]
+        if category:
+            backend_category = map_frontend_category_to_backend(category).lower()
+            results = [
+                drill for drill in results
+                if any((focus.category or "").lower() == backend_category for focus in _response_skills(drill))
+            ]
+        if difficulty:
+            results = [drill for drill in results if (drill.difficulty or "").lower() == difficulty.lower()]
+        return results
+
+
+def _response_skills(drill) -> list:
+    """The skill focus a drill's response lists: its first primary skill and every secondary one"""
+    primary = next((focus for focus in drill.skill_focus if focus.is_primary), None)
+    secondary = [focus for focus in drill.skill_focus if not focus.is_primary]
+    return ([primary] if primary else []) + secondary
@@ -0,0 +1,75 @@
+"""
+http_cache.py
+ETags and in-memory response bodies for catalog endpoints.
+
+Drill categories, the default drill listing, the guest drill selection and
+the mental training quotes only change when the catalog version is bumped
+(drills/drill_importer.py, DrillManager, quote seeding). A response is
+therefore fully determined by the catalog version and the request (path and
+query string), and its ETag is derived from exactly those two things. Any
+worker can answer a matching If-None-Match with 304 Not Modified without
+building the body, and built bodies are kept in a ResponseCache per catalog
+snapshot, so they are dropped as soon as a new version loads.
+
+Responses whose bytes differ between requests for the same data (the quotes
+come back in a new random order each time) get a weak ETag instead and are not
+cached: any of those bodies is an equally valid copy for the client to keep.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+# Clients may reuse a catalog response this long before revalidating it
+CATALOG_MAX_AGE = 300  # seconds
+CATALOG_CACHE_CONTROL = f"public, max-age={CATALOG_MAX_AGE}, must-revalidate"
+
+
+def request_key(path: str, query_items: Iterable[Tuple[str, str]]) -> str:
+    """Canonical form of a request: path plus sorted query parameters"""
+    query = "&".join(f"{name}={value}" for name, value in sorted(query_items))
+    return f"{path}?{query}"
+
+
+def make_etag(version: int, key: str, weak: bool = False) -> str:
+    """ETag for the response to request `key` at a catalog version, strong unless weak"""
+    digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    return f'{"W/" if weak else ""}"v{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header lists etag (weak comparison, as RFC 9110 requires) or is *"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    opaque = etag.removeprefix("W/")
+    return "*" in candidates or opaque in (value.removeprefix("W/") for value in candidates)
+
+
+class ResponseCache:
+    """Thread-safe LRU of encoded response bodies by request key"""
+
+    MAX_ENTRIES = 256
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._bodies: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._bodies)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+            return body
+
+    def put(self, key: str, body: bytes):
+        with self._lock:
+            self._bodies[key] = body
+            self._bodies.move_to_end(key)
+            while len(self._bodies) > self.max_entries:
+                self._bodies.popitem(last=False)
@@ -0,0 +1,48 @@
+"""
+json_fragments.py
+JSON responses assembled from pre-encoded fragments.
+
+Default drill responses are encoded once per catalog snapshot (see
+DrillCatalogSnapshot.response_fragments). List endpoints put those bytes in a
+JSONFragments list and return a FragmentJSONResponse: the fragments are
+spliced into the body as they are, and only the small envelope around them
+(totals, page metadata) is encoded per request. Nothing passes through
+jsonable_encoder or pydantic validation.
+"""
+
+from typing import Any, Iterable, Mapping
+
+import orjson
+from fastapi.responses import Response
+
+
+class JSONFragments(list):
+    """List of already encoded JSON values (bytes), rendered as a JSON array"""
+
+    def __init__(self, fragments: Iterable[bytes] = ()):
+        super().__init__(fragments)
+
+    def encode(self) -> bytes:
+        return b"[" + b",".join(self) + b"]"
+
+
+def dumps(value: Any) -> bytes:
+    """Compact JSON bytes; non-str keys, UUIDs and datetimes are handled by orjson"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+def render(payload: Mapping[str, Any]) -> bytes:
+    """Encode a top-level object, splicing any JSONFragments values in unchanged"""
+    members = [
+        dumps(key) + b":" + (value.encode() if isinstance(value, JSONFragments) else dumps(value))
+        for key, value in payload.items()
+    ]
+    return b"{" + b",".join(members) + b"}"
+
+
+class FragmentJSONResponse(Response):
+    """JSON response whose content is a dict that may hold JSONFragments"""
+    media_type = "application/json"
+
+    def render(self, content: Mapping[str, Any]) -> bytes:
+        return render(content)
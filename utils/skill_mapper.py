@@ -106,4 +106,22 @@ def format_skills_for_session(skills: Set[str]) -> List[Dict[str, List[str]]]:
     
     # Format into required structure
     return [{"category": category, "sub_skills": sub_skills} 
-            for category, sub_skills in categories.items()] 
\ No newline at end of file
+            for category, sub_skills in categories.items()] 
+
+def map_frontend_category_to_backend(frontend_category: str) -> str:
+    """
+    Map frontend category names (with spaces) to backend database category names.
+    Handles multiple variations to ensure consistent searching.
+    """
+    category_mapping = {
+        "Passing": "passing",
+        "Shooting": "shooting", 
+        "Dribbling": "dribbling",
+        "First Touch": "first_touch",  # ✅ CRITICAL: Map "First Touch" to "first_touch"
+        "Defending": "defending",
+        "Goalkeeping": "goalkeeping",  # ✅ Primary goalkeeping mapping
+        "Goalkeeper": "goalkeeping",   # ✅ Handle goalkeeper variation
+        "Fitness": "fitness",
+    }
+    
+    return category_mapping.get(frontend_category, frontend_category.lower().replace(" ", "_"))
@@ -0,0 +1,124 @@
+"""
+typeahead.py
+In-memory prefix index over drill titles and sub-skills for autocomplete.
+
+Every word of a drill's title and of its sub-skills ("close_control" gives
+"close" and "control") becomes a key. The keys are kept in one sorted array,
+which plays the role of a compact trie: all keys starting with a prefix form a
+contiguous range found with two binary searches, and the entries are stored in
+title order so title-prefix matches are a contiguous range too. A query
+matches a drill when each of its words is a prefix of one of the drill's
+words, so "cone dri" finds "Cone Dribbling Drill". Lookups touch only the
+matching range and never the database.
+
+Results are ranked by how closely the title matches the query (title starts
+with the query, then a title word starts with the first query word, then
+matches on sub-skills only) and then alphabetically by title.
+"""
+
+import heapq
+import re
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Ranks of a match, best first
+TITLE_PREFIX = 0
+TITLE_WORD = 1
+SUB_SKILL = 2
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def words(text: Optional[str]) -> List[str]:
+    """Lowercased words of text; underscores separate words ("first_touch" -> first, touch)"""
+    return _WORD.findall((text or "").lower())
+
+
+@dataclass(frozen=True)
+class TypeaheadEntry:
+    """One suggestion: the fields returned by the autocomplete endpoint"""
+    uuid: str
+    title: str
+    category: Optional[str]
+    is_custom: bool = False
+    sub_skills: Tuple[str, ...] = field(default=(), compare=False, repr=False)
+
+    def as_dict(self) -> dict:
+        return {"uuid": self.uuid, "title": self.title, "category": self.category}
+
+
+class TypeaheadIndex:
+    """Sorted-key prefix index over a fixed set of entries"""
+
+    def __init__(self, entries: Iterable[TypeaheadEntry]):
+        # Entries are kept in title order, so sorting matches by position sorts them by title
+        keyed = sorted((" ".join(words(entry.title)), entry.uuid, entry) for entry in entries if entry.title)
+        self.entries: Tuple[TypeaheadEntry, ...] = tuple(entry for _, _, entry in keyed)
+        self._titles = [title for title, _, _ in keyed]
+        self._title_keys, self._title_positions = self._key_arrays(
+            (word, position) for position, title in enumerate(self._titles) for word in set(title.split())
+        )
+        self._keys, self._positions = self._key_arrays(
+            (word, position)
+            for position, entry in enumerate(self.entries)
+            for word in set(self._titles[position].split()).union(*(words(skill) for skill in entry.sub_skills))
+        )
+
+    @staticmethod
+    def _key_arrays(pairs) -> Tuple[List[str], np.ndarray]:
+        pairs = sorted(pairs)
+        return [word for word, _ in pairs], np.array([position for _, position in pairs], dtype=np.intp)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _matching(keys: List[str], positions: np.ndarray, prefix: str) -> np.ndarray:
+        """Sorted positions of entries with a key starting with prefix"""
+        start = bisect_left(keys, prefix)
+        end = bisect_left(keys, prefix + "\uffff", start)
+        return np.unique(positions[start:end])
+
+    def ranked(self, query: str, limit: int) -> List[Tuple[int, str, TypeaheadEntry]]:
+        """Best `limit` matches as (rank, normalized title, entry), best first"""
+        query_words = words(query)
+        if not query_words or limit <= 0:
+            return []
+        # Narrow with the longest (usually most selective) word first
+        matches = None
+        for word in sorted(set(query_words), key=len, reverse=True):
+            found = self._matching(self._keys, self._positions, word)
+            matches = found if matches is None else np.intersect1d(matches, found, assume_unique=True)
+            if not len(matches):
+                return []
+
+        # Titles starting with the whole query are one contiguous range
+        phrase = " ".join(query_words)
+        start = bisect_left(self._titles, phrase)
+        end = bisect_left(self._titles, phrase + "\uffff", start)
+        title_prefix = np.arange(start, end, dtype=np.intp)
+        title_word = np.intersect1d(
+            matches, self._matching(self._title_keys, self._title_positions, query_words[0]), assume_unique=True
+        )
+        title_word = title_word[(title_word < start) | (title_word >= end)]
+        sub_skill = np.setdiff1d(matches, np.concatenate([title_prefix, title_word]), assume_unique=True)
+
+        results = []
+        for rank, positions in ((TITLE_PREFIX, title_prefix), (TITLE_WORD, title_word), (SUB_SKILL, sub_skill)):
+            for position in positions[:limit - len(results)]:
+                results.append((rank, self._titles[position], self.entries[position]))
+            if len(results) >= limit:
+                break
+        return results
+
+    def search(self, query: str, limit: int = 10) -> List[TypeaheadEntry]:
+        return [entry for _, _, entry in self.ranked(query, limit)]
+
+
+def search_indexes(indexes: Iterable[TypeaheadIndex], query: str, limit: int = 10) -> List[TypeaheadEntry]:
+    """Merge the best matches of several indexes (e.g. the catalog and a user's custom drills)"""
+    matches = [match for index in indexes for match in index.ranked(query, limit)]
+    return [entry for _, _, entry in heapq.nsmallest(limit, matches, key=lambda match: match[:2])]
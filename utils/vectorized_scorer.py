@@ -0,0 +1,364 @@
+"""
+vectorized_scorer.py
+Batched NumPy implementation of DrillScorer.
+
+DrillFeatureMatrix encodes a drill catalog once as arrays (difficulty level,
+intensity level, duration, equipment/location/style membership and skill ids).
+VectorizedDrillScorer then scores every drill against one user's preferences
+in a handful of array operations instead of one Python call chain per drill.
+Scores match DrillScorer.score_drill component for component; only the jitter
+draw differs (one random vector instead of one random.uniform call per drill).
+"""
+
+import copy
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from models import Drill, SessionPreferences
+from utils.drill_scorer import DrillScorer, CompiledPreferences, INTENSITY_LEVEL_BY_VARIATION
+from utils.drill_attributes import ADAPTABLE_EQUIPMENT, BALL, CRITICAL_EQUIPMENT, attribute_masks
+
+# Component order used by DrillScorer.weights (and therefore by the total score sum)
+SCORE_COMPONENTS = (
+    "primary_skill",
+    "secondary_skill",
+    "equipment",
+    "location",
+    "difficulty",
+    "intensity",
+    "duration",
+    "training_style",
+)
+
+NO_VALUE = -2   # attribute missing on the drill (None / empty)
+UNKNOWN = -1    # attribute present but not one of the known levels
+
+
+class _Vocabulary:
+    """Assigns a stable integer id to each distinct string"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+
+    def add(self, value: str) -> int:
+        if value not in self.ids:
+            self.ids[value] = len(self.ids)
+        return self.ids[value]
+
+    def get(self, value, default: int = UNKNOWN) -> int:
+        return self.ids.get(value, default)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class DrillFeatureMatrix:
+    """
+    Column-oriented encoding of a list of drills.
+
+    Equipment, locations and training styles are enum-indexed bitmasks (see
+    utils/drill_attributes.py); skills are lowercased vocabulary ids.
+    """
+
+    # Per-drill arrays (first axis is the drill row)
+    _ROW_ARRAYS = (
+        "difficulty", "intensity", "duration",
+        "primary_category", "primary_sub_skill", "has_primary",
+        "equipment_bits", "location_bits", "style_bits",
+    )
+
+    def __init__(self, drills: Sequence[Drill]):
+        self.drills = list(drills)
+        n = len(self.drills)
+        self.size = n
+        self._row_by_uuid: Optional[Dict[str, int]] = None  # built on first rows_of call
+
+        difficulty_ids = {level: idx for idx, level in enumerate(DrillScorer.DIFFICULTY_LEVELS)}
+        self.intensity_level_ids = {level: idx for idx, level in enumerate(DrillScorer.INTENSITY_VARIATIONS)}
+        intensity_ids = {
+            variation: self.intensity_level_ids[level]
+            for variation, level in INTENSITY_LEVEL_BY_VARIATION.items()
+        }
+
+        self.difficulty = np.full(n, NO_VALUE, dtype=np.int8)
+        self.intensity = np.full(n, UNKNOWN, dtype=np.int8)
+        self.duration = np.full(n, np.nan, dtype=np.float64)
+
+        self.category_vocab = _Vocabulary()
+        self.sub_skill_vocab = _Vocabulary()
+
+        self.equipment_bits = np.zeros(n, dtype=np.uint16)
+        self.location_bits = np.zeros(n, dtype=np.uint16)
+        self.style_bits = np.zeros(n, dtype=np.uint16)
+        self.primary_category = np.full(n, UNKNOWN, dtype=np.int32)
+        self.primary_sub_skill = np.full(n, UNKNOWN, dtype=np.int32)
+        self.has_primary = np.zeros(n, dtype=bool)
+        secondary_owner, secondary_category, secondary_sub_skill = [], [], []
+
+        for i, drill in enumerate(self.drills):
+            if drill.difficulty:
+                self.difficulty[i] = difficulty_ids.get(drill.difficulty.lower(), UNKNOWN)
+            if drill.intensity:
+                self.intensity[i] = intensity_ids.get(drill.intensity.lower(), UNKNOWN)
+            if drill.duration is not None:
+                self.duration[i] = drill.duration
+
+            self.equipment_bits[i], self.location_bits[i], self.style_bits[i] = attribute_masks(drill)
+
+            skill_focus = drill.skill_focus or []
+            primary = next((focus for focus in skill_focus if focus.is_primary), None)
+            if primary is None:
+                continue
+            self.has_primary[i] = True
+            self.primary_category[i] = self.category_vocab.add(primary.category.lower() if primary.category else "")
+            self.primary_sub_skill[i] = self.sub_skill_vocab.add(primary.sub_skill.lower() if primary.sub_skill else "")
+            for focus in skill_focus:
+                if focus.is_primary:
+                    continue
+                secondary_owner.append(i)
+                # Falsy categories / sub-skills never match in DrillScorer
+                secondary_category.append(self.category_vocab.add(focus.category.lower()) if focus.category else UNKNOWN)
+                secondary_sub_skill.append(self.sub_skill_vocab.add(focus.sub_skill.lower()) if focus.sub_skill else UNKNOWN)
+
+        self.secondary_owner = np.array(secondary_owner, dtype=np.intp)
+        self.secondary_category = np.array(secondary_category, dtype=np.int32)
+        self.secondary_sub_skill = np.array(secondary_sub_skill, dtype=np.int32)
+
+    def take(self, rows: np.ndarray) -> "DrillFeatureMatrix":
+        """
+        Feature matrix of the given catalog rows (ascending), sharing this matrix's
+        vocabularies. Used to score only a prefiltered candidate set.
+        """
+        subset = copy.copy(self)
+        subset.drills = [self.drills[i] for i in rows]
+        subset.size = len(subset.drills)
+        subset._row_by_uuid = None
+        for name in self._ROW_ARRAYS:
+            setattr(subset, name, getattr(self, name)[rows])
+
+        position = np.full(self.size, UNKNOWN, dtype=np.intp)
+        position[rows] = np.arange(subset.size)
+        owner = position[self.secondary_owner]
+        kept = owner >= 0
+        subset.secondary_owner = owner[kept]
+        subset.secondary_category = self.secondary_category[kept]
+        subset.secondary_sub_skill = self.secondary_sub_skill[kept]
+        return subset
+
+    def rows_of(self, uuids) -> np.ndarray:
+        """Rows of the drills with the given UUIDs (UUIDs not in the matrix are skipped)"""
+        if self._row_by_uuid is None:
+            self._row_by_uuid = {str(drill.uuid): i for i, drill in enumerate(self.drills)}
+        rows = [self._row_by_uuid[uuid] for uuid in uuids if uuid in self._row_by_uuid]
+        return np.array(rows, dtype=np.intp)
+
+
+class VectorizedDrillScorer(DrillScorer):
+    """
+    DrillScorer that scores a whole DrillFeatureMatrix at once.
+    Weights, equipment rules and jitter factor are inherited from DrillScorer.
+    """
+
+    def __init__(self, preferences: SessionPreferences, compiled: CompiledPreferences = None,
+                 rng: Union[int, np.random.Generator, None] = None):
+        super().__init__(preferences, compiled)
+        # Seed or numpy Generator for the jitter vector (fresh entropy if None)
+        self.rng = np.random.default_rng(rng)
+
+    def score_components(self, features: DrillFeatureMatrix) -> Dict[str, np.ndarray]:
+        """Return the weighted (pre-jitter) score of every component for every drill"""
+        raw = {
+            "equipment": self._score_equipment_vector(features),
+            "location": self._score_location_vector(features),
+            "difficulty": self._score_difficulty_vector(features),
+            "intensity": self._score_intensity_vector(features),
+            "duration": self._score_duration_vector(features),
+            "training_style": self._score_training_style_vector(features),
+        }
+        raw["primary_skill"], raw["secondary_skill"] = self._score_skills_vector(features)
+
+        scores = {key: raw[key] * self.weights[key] for key in SCORE_COMPONENTS}
+        # Special handling for equipment score (same as score_drill)
+        partial_equipment = (raw["equipment"] > 0) & (raw["equipment"] < 1)
+        scores["equipment"] = np.where(partial_equipment, scores["equipment"] * 0.8, scores["equipment"])
+        return scores
+
+    def score_totals(self, features: DrillFeatureMatrix,
+                     components: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """
+        Component scores plus the jittered "total" for every drill.
+        Pass components (from score_components) to reuse previously computed scores.
+        """
+        scores = dict(components) if components is not None else self.score_components(features)
+        total = np.zeros(features.size, dtype=np.float64)
+        for key in SCORE_COMPONENTS:  # same summation order as score_drill
+            total = total + scores[key]
+        if self.compiled.recent_drills:
+            total[features.rows_of(self.compiled.recent_drills)] -= self.recent_drill_penalty
+        jitter = self.rng.uniform(1 - self.jitter_factor, 1 + self.jitter_factor, features.size)
+        scores["total"] = total * jitter
+        return scores
+
+    def rank_drills(self, drills: Union[DrillFeatureMatrix, List[Drill]], top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Rank drills (or a pre-built DrillFeatureMatrix) by total score.
+        Returns the same structure as DrillScorer.rank_drills; with top_k only the
+        best top_k drills are selected (argpartition) and turned into entries.
+        """
+        features = drills if isinstance(drills, DrillFeatureMatrix) else DrillFeatureMatrix(drills)
+        scores = self.score_totals(features)
+        if top_k is None:
+            # Stable descending order keeps ties in catalog order, like sorted(reverse=True)
+            order = np.argsort(-scores["total"], kind="stable")
+        else:
+            order = self.top_k_indices(scores["total"], top_k)
+        return self._ranked_entries(features, scores, order)
+
+    def select_drills(self, features: DrillFeatureMatrix, pool_size: int, skill_limits: Dict[str, int],
+                      components: Optional[Dict[str, np.ndarray]] = None
+                      ) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+        """
+        Score the catalog once and select only what session balancing needs.
+
+        Returns (pool, by_skill): the best pool_size drills overall, and for each
+        primary skill category in skill_limits its best drills (up to the limit),
+        taken from the whole catalog. Both are ordered best first. Cached
+        pre-jitter components can be passed in; jitter is still drawn per call.
+        """
+        scores = self.score_totals(features, components)
+        totals = scores["total"]
+        pool = self._ranked_entries(features, scores, self.top_k_indices(totals, pool_size))
+
+        by_skill = {}
+        for category, limit in skill_limits.items():
+            c = features.category_vocab.get(category)
+            if c < 0:
+                continue
+            mask = features.primary_category == c
+            by_skill[category] = self._ranked_entries(features, scores, self.top_k_indices(totals, limit, mask))
+        return pool, by_skill
+
+    @staticmethod
+    def top_k_indices(totals: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Indices of the k highest totals (optionally only where mask is True), best first.
+        Selection is O(n) with argpartition; only the k selected drills are sorted.
+        """
+        candidates = np.arange(totals.size) if mask is None else np.flatnonzero(mask)
+        if k <= 0:
+            return candidates[:0]
+        if k < candidates.size:
+            candidates = candidates[np.argpartition(-totals[candidates], k - 1)[:k]]
+        # Best first, ties in catalog order like the full stable sort
+        return candidates[np.lexsort((candidates, -totals[candidates]))]
+
+    @staticmethod
+    def _ranked_entries(features: DrillFeatureMatrix, scores: Dict[str, np.ndarray], order: np.ndarray) -> List[Dict[str, Any]]:
+        keys = SCORE_COMPONENTS + ("total",)
+        columns = {key: scores[key][order].tolist() for key in keys}
+        return [
+            {
+                "drill": features.drills[i],
+                "scores": {key: columns[key][row] for key in keys},
+                "total_score": columns["total"][row]
+            }
+            for row, i in enumerate(order.tolist())
+        ]
+
+    def _target_skill_tables(self, features: DrillFeatureMatrix):
+        """
+        Encode target skills as lookup tables over the catalog's skill vocabularies.
+
+        Returns (category_match, primary_exact, secondary_exact):
+        - category_match[c]: any target has category c
+        - primary_exact[c, s]: any target with category c lists sub-skill s
+        - secondary_exact[c, s]: the first target with category c lists sub-skill s
+          (DrillScorer stops at the first category match for secondary skills)
+        """
+        n_categories = len(features.category_vocab)
+        n_sub_skills = len(features.sub_skill_vocab)
+        category_match = np.zeros(n_categories + 1, dtype=bool)
+        primary_exact = np.zeros((n_categories + 1, n_sub_skills + 1), dtype=bool)
+        secondary_exact = np.zeros((n_categories + 1, n_sub_skills + 1), dtype=bool)
+
+        for category, sub_skills in self.compiled.sub_skills_by_category.items():
+            c = features.category_vocab.get(category)
+            if c < 0:
+                continue
+            category_match[c] = True
+            for sub_skill in sub_skills:
+                s = features.sub_skill_vocab.get(sub_skill)
+                if s >= 0:
+                    primary_exact[c, s] = True
+            for sub_skill in self.compiled.first_sub_skills_by_category[category]:
+                s = features.sub_skill_vocab.get(sub_skill)
+                if s >= 0:
+                    secondary_exact[c, s] = True
+
+        # Index -1 (UNKNOWN) lands on the extra trailing row/column, which is always False
+        return category_match, primary_exact, secondary_exact
+
+    def _score_skills_vector(self, features: DrillFeatureMatrix):
+        primary = np.zeros(features.size, dtype=np.float64)
+        secondary = np.zeros(features.size, dtype=np.float64)
+        if not self.compiled.has_target_skills:
+            return primary, secondary
+
+        category_match, primary_exact, secondary_exact = self._target_skill_tables(features)
+
+        pc, ps = features.primary_category, features.primary_sub_skill
+        primary = np.where(primary_exact[pc, ps], 1.0, np.where(category_match[pc], 0.3, 0.0))
+
+        sc, ss = features.secondary_category, features.secondary_sub_skill
+        contribution = np.where(secondary_exact[sc, ss], 1.0, np.where(category_match[sc], 0.3, 0.0))
+        matches = np.bincount(features.secondary_owner, weights=contribution, minlength=features.size)
+        secondary = np.minimum(matches * 0.5, 0.5)
+
+        # Drills without a primary skill score nothing for skills
+        primary = np.where(features.has_primary, primary, 0.0)
+        secondary = np.where(features.has_primary, secondary, 0.0)
+        return primary, secondary
+
+    def _score_equipment_vector(self, features: DrillFeatureMatrix) -> np.ndarray:
+        required = features.equipment_bits
+        missing = required & np.uint16(~self.compiled.available_equipment_bits & 0xFFFF)
+
+        score = np.where(missing & np.uint16(~ADAPTABLE_EQUIPMENT & 0xFFFF), 0.0, 0.6)
+        score = np.where(missing & np.uint16(CRITICAL_EQUIPMENT), 0.0, score)
+        score = np.where(missing != 0, score, 1.0)
+        score = np.where(required == BALL, 0.8 if self.compiled.has_ball else 0.0, score)
+        return np.where(required != 0, score, 1.0)
+
+    def _score_location_vector(self, features: DrillFeatureMatrix) -> np.ndarray:
+        matched = (features.location_bits & np.uint16(self.compiled.location_bit)) != 0
+        return np.where(features.location_bits != 0, matched.astype(np.float64), 0.5)
+
+    def _score_difficulty_vector(self, features: DrillFeatureMatrix) -> np.ndarray:
+        pref_idx = self.compiled.difficulty_index
+        if pref_idx is None:
+            return np.full(features.size, 0.5)
+        known = features.difficulty >= 0
+        gap = np.abs(features.difficulty.astype(np.int16) - pref_idx)
+        score = np.select([gap == 0, gap == 1], [1.0, 0.5], default=0.2)
+        return np.where(known, score, 0.5)
+
+    def _score_intensity_vector(self, features: DrillFeatureMatrix) -> np.ndarray:
+        if self.compiled.intensity_level is None:
+            return np.full(features.size, 0.5)
+        pref_level = features.intensity_level_ids[self.compiled.intensity_level]
+        known = features.intensity >= 0
+        return np.where(known & (features.intensity == pref_level), 1.0, 0.5)
+
+    def _score_duration_vector(self, features: DrillFeatureMatrix) -> np.ndarray:
+        session_duration = self.compiled.duration
+        duration = features.duration
+        with np.errstate(invalid="ignore"):
+            portion = duration / session_duration
+            score = np.select([portion < 0.1, portion > 0.5], [0.5, 0.7], default=1.0)
+            score = np.where(duration > session_duration, 0.0, score)
+        return np.where(np.isnan(duration), 0.5, score)
+
+    def _score_training_style_vector(self, features: DrillFeatureMatrix) -> np.ndarray:
+        matched = (features.style_bits & np.uint16(self.compiled.style_bit)) != 0
+        return np.where(features.style_bits != 0, matched.astype(np.float64), 0.5)